@@ -0,0 +1,118 @@
+"""Object access benchmark: GitPython vs the persistent batch backend.
+
+Times the two git calls the pipeline makes, once with each backend:
+
+* analyze_recent_commits: list commits with per-file line counts, and
+* get_commit_diff: the ranked per-commit diff sent to Copilot.
+
+Runs against --repo, or against a generated repository (--commits commits
+touching --files files, built with `git fast-import`). Also checks that
+both backends return identical results. Exits non-zero on any mismatch.
+
+Usage:
+    python benchmarks/bench_git_backend.py [--repo PATH] [--commits 2000]
+        [--files 200] [--limit 500] [--diffs 200] [--repeat 3]
+"""
+
+import argparse
+import asyncio
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from docweave.features.commit_analysis import (  # noqa: E402
+    GIT_BACKENDS,
+    analyze_recent_commits,
+    get_commit_diff,
+)
+
+
+def build_repo(path: Path, commits: int, files: int, seed: int = 7) -> None:
+    """Create a linear history where each commit edits a few files."""
+    rng = random.Random(seed)
+    subprocess.run(["git", "init", "-q", str(path)], check=True)
+    contents = {
+        f"pkg{i % 10}/mod{i}.py": [f"line {n}\n" for n in range(40)] for i in range(files)
+    }
+    stream: list[bytes] = []
+    for n in range(commits):
+        touched = rng.sample(sorted(contents), k=min(len(contents), rng.randint(1, 5)))
+        message = f"change {n}\n".encode()
+        stream.append(b"commit refs/heads/main\n")
+        who = f"Dev{n % 7} <dev{n % 7}@example.com> {1_700_000_000 + n * 600} +0000"
+        stream.append(f"committer {who}\n".encode())
+        stream.append(b"data %d\n%s" % (len(message), message))
+        for name in touched:
+            lines = contents[name]
+            lines.insert(rng.randrange(len(lines) + 1), f"added {n}\n")
+            if len(lines) > 5 and rng.random() < 0.5:
+                del lines[rng.randrange(len(lines))]
+            blob = "".join(lines).encode()
+            stream.append(b"M 100644 inline %s\ndata %d\n%s\n" % (name.encode(), len(blob), blob))
+    subprocess.run(
+        ["git", "-C", str(path), "fast-import", "--quiet"], input=b"".join(stream), check=True
+    )
+    subprocess.run(["git", "-C", str(path), "symbolic-ref", "HEAD", "refs/heads/main"], check=True)
+
+
+def run_backend(repo: Path, backend: str, limit: int, diffs: int) -> tuple:
+    """Time one listing and `diffs` diff calls; return (list s, diff s, commits, texts)."""
+    started = time.perf_counter()
+    commits = asyncio.run(analyze_recent_commits(repo, limit=limit, backend=backend))
+    listed = time.perf_counter() - started
+
+    async def diff_all() -> list[str]:
+        return [await get_commit_diff(repo, c.sha, backend=backend) for c in commits[:diffs]]
+
+    started = time.perf_counter()
+    texts = asyncio.run(diff_all())
+    return listed, time.perf_counter() - started, commits, texts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repo", type=Path, default=None)
+    parser.add_argument("--commits", type=int, default=2000)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--diffs", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = args.repo
+        if repo is None:
+            repo = Path(tmp) / "repo"
+            build_repo(repo, args.commits, args.files)
+        repo = repo.resolve()
+
+        best: dict[str, tuple[float, float]] = {}
+        results: dict[str, tuple[list, list]] = {}
+        for _ in range(args.repeat):
+            for backend in GIT_BACKENDS:
+                listed, diffed, commits, texts = run_backend(repo, backend, args.limit, args.diffs)
+                prev = best.get(backend, (float("inf"), float("inf")))
+                best[backend] = (min(prev[0], listed), min(prev[1], diffed))
+                results[backend] = (commits, texts)
+
+    commits, texts = results["gitpython"]
+    print(f"repo={repo} commits listed={len(commits)} diffs={len(texts)} (best of {args.repeat})")
+    print(f"{'backend':<10} {'list':>10} {'diffs':>10} {'per diff':>10}")
+    for backend, (listed, diffed) in best.items():
+        per_diff = diffed / max(1, len(texts)) * 1000
+        print(f"{backend:<10} {listed:>9.3f}s {diffed:>9.3f}s {per_diff:>8.2f}ms")
+    base, fast = best["gitpython"], best["batch"]
+    print(f"speed-up: list x{base[0] / fast[0]:.1f}, diffs x{base[1] / max(fast[1], 1e-9):.1f}")
+
+    ok = results["batch"] == results["gitpython"]
+    print("ok" if ok else "FAILED: backends returned different results")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
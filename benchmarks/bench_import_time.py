@@ -0,0 +1,158 @@
+"""Import-time regression benchmark for the DocWeave CLI.
+
+Runs the CLI under `python -X importtime` and checks two things:
+
+* the total import time stays within a budget, and
+* commands do not pull in modules they have no use for (for example,
+  `docweave --help` must not import GitPython or asyncio).
+
+Usage:
+    python benchmarks/bench_import_time.py [--help-budget-ms 150]
+        [--analyze-budget-ms 450] [--repeat 5]
+
+Exits non-zero when a command fails, a budget is exceeded or a forbidden
+module is imported.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Modules each scenario must not import
+HELP_FORBIDDEN = (
+    "asyncio",
+    "git",
+    "fastapi",
+    "pydantic",
+    "docweave.components",
+    "docweave.features",
+)
+ANALYZE_FORBIDDEN = ("fastapi", "pydantic", "uvicorn", "starlette")
+
+
+def parse_importtime(stderr: str) -> tuple[float, set[str]]:
+    """
+    Parse `-X importtime` output.
+
+    Returns:
+        (total import time in milliseconds, set of imported module names)
+    """
+    total_us = 0
+    modules: set[str] = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        modules.add(name.strip())
+        # Top-level imports have no nesting indentation; their cumulative
+        # times add up to the total without double counting.
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def run_cli(args: list[str], cwd: Path) -> tuple[float, set[str]]:
+    """
+    Run `python -X importtime -m docweave.cli <args>` once.
+
+    Raises:
+        RuntimeError: If the command fails (e.g. crashes on import), with its
+            output other than the import times
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "docweave.cli", *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if proc.returncode != 0:
+        errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        output = "\n".join([*proc.stdout.splitlines()[-10:], *errors[-20:]])
+        raise RuntimeError(f"`docweave {' '.join(args)}` exited with {proc.returncode}:\n{output}")
+    return parse_importtime(proc.stderr)
+
+
+def make_repo(root: Path) -> Path:
+    """Create a throwaway git repository with a single commit."""
+    repo = root / "repo"
+    repo.mkdir()
+    env = {
+        **os.environ,
+        "GIT_AUTHOR_NAME": "bench",
+        "GIT_AUTHOR_EMAIL": "bench@example.com",
+        "GIT_COMMITTER_NAME": "bench",
+        "GIT_COMMITTER_EMAIL": "bench@example.com",
+    }
+    subprocess.run(["git", "init", "-q"], cwd=repo, check=True, env=env)
+    (repo / "main.py").write_text("print('hello')\n")
+    subprocess.run(["git", "add", "."], cwd=repo, check=True, env=env)
+    subprocess.run(["git", "commit", "-qm", "feat: initial"], cwd=repo, check=True, env=env)
+    return repo
+
+
+def check(
+    label: str,
+    args: list[str],
+    cwd: Path,
+    budget_ms: float,
+    forbidden: tuple[str, ...],
+    repeat: int,
+) -> bool:
+    """Run one scenario `repeat` times and report the best import time."""
+    best_ms = float("inf")
+    modules: set[str] = set()
+    for _ in range(repeat):
+        try:
+            total_ms, modules = run_cli(args, cwd)
+        except RuntimeError as e:
+            print(f"{label:<28} FAIL\n  {str(e).replace(chr(10), chr(10) + '  ')}")
+            return False
+        best_ms = min(best_ms, total_ms)
+
+    leaked = sorted(
+        m for m in modules if any(m == f or m.startswith(f + ".") for f in forbidden)
+    )
+    ok = best_ms <= budget_ms and not leaked
+    status = "ok" if ok else "FAIL"
+    print(f"{label:<28} {best_ms:8.1f} ms  (budget {budget_ms:.0f} ms)  {status}")
+    if leaked:
+        print(f"  unexpected imports: {', '.join(leaked[:10])}")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--help-budget-ms", type=float, default=150.0)
+    parser.add_argument("--analyze-budget-ms", type=float, default=450.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    opts = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = make_repo(Path(tmp))
+        results = [
+            check(
+                "docweave --help",
+                ["--help"],
+                repo,
+                opts.help_budget_ms,
+                HELP_FORBIDDEN,
+                opts.repeat,
+            ),
+            check(
+                "docweave analyze --last",
+                ["analyze", "--last", "--path", str(repo)],
+                repo,
+                opts.analyze_budget_ms,
+                ANALYZE_FORBIDDEN,
+                opts.repeat,
+            ),
+        ]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""Memory budget benchmark: peak RSS of a large-history run with --max-memory.
+
+Documents --limit commits of --repo, or of a generated repository (--commits
+commits touching --files files, plus a --huge-mb generated file added every
+--huge-every commits, built with `git fast-import`), once without a budget
+and once with --max-memory. Each run happens in a child process with
+Copilot treated as unavailable, so only DocWeave's own memory is measured.
+Exits non-zero if the budgeted run's peak RSS is over the cap.
+
+Usage:
+    python benchmarks/bench_memory_budget.py [--repo PATH] [--commits 5000]
+        [--files 200] [--huge-every 1000] [--huge-mb 20] [--limit 5000]
+        [--max-memory 256M]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+from docweave.components.memory_budget import (  # noqa: E402
+    MAX_MEMORY_ENV,
+    format_size,
+    parse_size,
+)
+
+
+def build_repo(path: Path, commits: int, files: int, huge_every: int, huge_mb: int) -> None:
+    """
+    Create a linear history of small edits with a huge generated file now and then.
+
+    The fast-import stream is written to git as it is generated, so building
+    the repository never holds more than one huge file in memory.
+    """
+    rng = random.Random(11)
+    subprocess.run(["git", "init", "-q", str(path)], check=True)
+    contents = {
+        f"pkg{i % 10}/mod{i}.py": [f"line {n}\n" for n in range(40)] for i in range(files)
+    }
+    importer = subprocess.Popen(
+        ["git", "-C", str(path), "fast-import", "--quiet"], stdin=subprocess.PIPE
+    )
+    stream = importer.stdin
+    for n in range(commits):
+        message = f"change {n}\n".encode()
+        stream.write(b"commit refs/heads/main\n")
+        who = f"Dev{n % 7} <dev{n % 7}@example.com> {1_700_000_000 + n * 600} +0000"
+        stream.write(f"committer {who}\n".encode())
+        stream.write(b"data %d\n%s" % (len(message), message))
+        for name in rng.sample(sorted(contents), k=min(len(contents), rng.randint(1, 5))):
+            lines = contents[name]
+            lines.insert(rng.randrange(len(lines) + 1), f"added {n}\n")
+            blob = "".join(lines).encode()
+            stream.write(b"M 100644 inline %s\ndata %d\n%s\n" % (name.encode(), len(blob), blob))
+        if huge_every and n % huge_every == huge_every - 1:
+            row = f"{n},{'x' * 90}\n".encode()
+            blob = row * (huge_mb * (1 << 20) // len(row))
+            stream.write(b"M 100644 inline data/generated_%d.csv\n" % n)
+            stream.write(b"data %d\n%s\n" % (len(blob), blob))
+    stream.close()
+    if importer.wait() != 0:
+        raise subprocess.CalledProcessError(importer.returncode, importer.args)
+    subprocess.run(["git", "-C", str(path), "symbolic-ref", "HEAD", "refs/heads/main"], check=True)
+
+
+def child(repo: Path, limit: int, output: Path) -> None:
+    """Document the repository in this process; print the memory report and peak RSS."""
+    from docweave.components.memory_budget import max_memory, peak_rss
+    from docweave.features.pipeline import run_documentation
+
+    run = asyncio.run(run_documentation(repo, limit, None, False, "benchmark", output_path=output))
+    for line in run.memory_stats.report(max_memory(), detail=False):
+        print(f"  {line}")
+    print(peak_rss() or 0)
+
+
+def run_child(repo: Path, limit: int, output: Path, budget: str = "") -> tuple[float, int]:
+    """Run one documentation pass in a child; return (seconds, peak RSS in bytes)."""
+    env = {**os.environ, "PYTHONPATH": str(SRC), MAX_MEMORY_ENV: budget}
+    args = [sys.executable, __file__, "--child", "--repo", str(repo), "--limit", str(limit)]
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [*args, "--output", str(output)], env=env, check=True, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - started
+    *report, peak = proc.stdout.splitlines()
+    print("\n".join(report))
+    return elapsed, int(peak)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repo", type=Path, default=None)
+    parser.add_argument("--commits", type=int, default=5000)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--huge-every", type=int, default=1000)
+    parser.add_argument("--huge-mb", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=5000)
+    parser.add_argument("--max-memory", default="256M")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.repo, args.limit, args.output)
+        return 0
+
+    cap = parse_size(args.max_memory)
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = args.repo
+        if repo is None:
+            repo = Path(tmp) / "repo"
+            build_repo(repo, args.commits, args.files, args.huge_every, args.huge_mb)
+        repo = repo.resolve()
+
+        print(f"repo={repo} limit={args.limit} cap={format_size(cap)}")
+        print("without budget:")
+        free_s, free_peak = run_child(repo, args.limit, Path(tmp) / "free")
+        print("with budget:")
+        capped_s, capped_peak = run_child(repo, args.limit, Path(tmp) / "capped", args.max_memory)
+
+    print(f"{'run':<16} {'time':>9} {'peak RSS':>12}")
+    print(f"{'unlimited':<16} {free_s:>8.1f}s {format_size(free_peak):>12}")
+    print(f"{'--max-memory':<16} {capped_s:>8.1f}s {format_size(capped_peak):>12}")
+
+    ok = capped_peak <= cap
+    print("ok" if ok else f"FAILED: peak RSS {format_size(capped_peak)} over the cap")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Status-poll throughput benchmark for the shared state store.
+
+Simulates a multi-worker web service on one host: writer processes update
+job progress as fast as they can (like analysis jobs reporting per-commit
+progress) while reader processes poll job status (like clients hitting
+GET /api/jobs/{id}). All processes share one SQLite database in WAL mode.
+
+Reports poll throughput, write latency percentiles and errors. Exits
+non-zero if any operation failed (e.g. "database is locked") or throughput
+falls below --min-polls-per-sec.
+
+Usage:
+    python benchmarks/bench_state_store.py [--writers 4] [--readers 8]
+        [--seconds 5] [--min-polls-per-sec 2000]
+"""
+
+import argparse
+import multiprocessing as mp
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from docweave.components.state_store import SQLiteStateStore  # noqa: E402
+
+
+def writer(db_path: str, job_id: str, stop_at: float, out: mp.Queue) -> None:
+    """Update one job's progress in a loop; report write latencies."""
+    store = SQLiteStateStore(Path(db_path))
+    latencies, errors, i = [], 0, 0
+    while time.monotonic() < stop_at:
+        i += 1
+        started = time.perf_counter()
+        try:
+            store.update_job(job_id, status="running", progress=(i % 100) / 100, message=f"{i}")
+        except Exception:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    out.put(("writer", latencies, errors))
+
+
+def reader(db_path: str, job_ids: list[str], stop_at: float, out: mp.Queue) -> None:
+    """Poll job status in a loop; report the number of polls."""
+    store = SQLiteStateStore(Path(db_path))
+    polls, errors = 0, 0
+    while time.monotonic() < stop_at:
+        try:
+            if store.get_job(job_ids[polls % len(job_ids)]) is None:
+                errors += 1
+        except Exception:
+            errors += 1
+        polls += 1
+    out.put(("reader", polls, errors))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--min-polls-per-sec", type=float, default=2000.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "state.sqlite")
+        store = SQLiteStateStore(Path(db_path))
+        job_ids = [store.create_job().job_id for _ in range(max(1, args.writers))]
+
+        out: mp.Queue = mp.Queue()
+        stop_at = time.monotonic() + args.seconds
+        procs = [
+            mp.Process(target=writer, args=(db_path, job_ids[i], stop_at, out))
+            for i in range(args.writers)
+        ] + [
+            mp.Process(target=reader, args=(db_path, job_ids, stop_at, out))
+            for _ in range(args.readers)
+        ]
+        for p in procs:
+            p.start()
+        results = [out.get() for _ in procs]
+        for p in procs:
+            p.join()
+
+    write_latencies = sorted(x for kind, lat, _ in results if kind == "writer" for x in lat)
+    polls = sum(n for kind, n, _ in results if kind == "reader")
+    errors = sum(e for _, _, e in results)
+    polls_per_sec = polls / args.seconds
+
+    print(f"writers={args.writers} readers={args.readers} duration={args.seconds:g}s")
+    print(f"status polls:   {polls} ({polls_per_sec:,.0f}/s)")
+    if write_latencies:
+        p99 = write_latencies[min(len(write_latencies) - 1, int(len(write_latencies) * 0.99))]
+        print(
+            f"progress writes: {len(write_latencies)} "
+            f"({len(write_latencies) / args.seconds:,.0f}/s), "
+            f"p50 {statistics.median(write_latencies) * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms"
+        )
+    print(f"errors:         {errors}")
+
+    ok = errors == 0 and polls_per_sec >= args.min_polls_per_sec
+    print("ok" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
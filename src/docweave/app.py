@@ -1,21 +1,32 @@
 """FastAPI web application for DocWeave."""
 
 import asyncio
+import json
+import re
+from dataclasses import asdict
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, Request
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
-from docweave.components.copilot_integration import analyze_with_copilot
-from docweave.components.doc_generator import generate_documentation, save_documentation
-from docweave.features.commit_analysis import analyze_recent_commits, get_commit_diff
+from docweave.components.asset_cache import asset_cache, negotiate
+from docweave.components.commit_index import read_index, shard_name
+from docweave.components.copilot_integration import copilot_breaker, copilot_latency
+from docweave.components.state_store import HEARTBEAT_SECONDS, StateStore, open_state_store
+from docweave.features.churn_index import ChurnIndex
+from docweave.features.commit_analysis import analyze_recent_commits
+from docweave.features.ndjson_stream import stream_documentation, to_ndjson
+from docweave.features.pipeline import run_documentation
+from docweave.features.repo_location import docs_location, find_repo_root
+from docweave.features.search_index import SearchIndex
+from docweave.features.single_flight import SingleFlight, analysis_key
 from docweave.lib.copilot_check import check_copilot_cli_installed, get_copilot_installation_instructions
 from docweave.lib.repo_utils import is_github_url, get_github_clone_instructions
 from docweave.types.models import (
-    AnalysisProgress,
     CodeAnalysis,
     CommitInfo,
     DocumentationResult,
@@ -27,10 +38,31 @@ app = FastAPI(
     version="0.1.0",
 )
 
-# Mount static files (frontend)
-static_path = Path(__file__).parent.parent.parent / "static"
-if static_path.exists():
-    app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
+# Frontend assets, served from the in-memory asset cache
+static_path = (Path(__file__).parent.parent.parent / "static").resolve()
+STATIC_CACHE_CONTROL = "public, max-age=300"
+# Generated docs change whenever DocWeave runs: always revalidate (cheap via ETag)
+DOCS_CACHE_CONTROL = "no-cache"
+# Top-level documents, and commit shards of the sharded layout (commits/<sha>.md)
+_DOC_NAME_RE = re.compile(r"^(commits/)?[A-Za-z0-9_-][A-Za-z0-9_.-]*\.md$")
+# Largest page of /api/commit-index
+MAX_COMMITS_PAGE = 500
+
+
+def _cached_file_response(path: Path, request: Request, cache_control: str) -> Response:
+    """Serve a file from the asset cache with ETag and compression negotiation."""
+    asset = asset_cache.get(path)
+    if asset is None:
+        raise HTTPException(status_code=404, detail=f"Not found: {path.name}")
+    status, body, headers = negotiate(
+        asset,
+        request.headers.get("accept-encoding", ""),
+        request.headers.get("if-none-match"),
+        cache_control,
+    )
+    if status == 304:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=asset.media_type, headers=headers)
 
 
 class AnalyzeRequest(BaseModel):
@@ -39,6 +71,13 @@ class AnalyzeRequest(BaseModel):
     repo_path: str
     limit: int = 10
     days_back: Optional[int] = None
+    # Where to write the docs (default: <repo>/DocweaveDocs; required for
+    # bare repositories)
+    output_path: Optional[str] = None
+
+    def output_dir(self) -> Optional[Path]:
+        """The requested output directory, resolved, if any."""
+        return Path(self.output_path).expanduser().resolve() if self.output_path else None
 
 
 class AnalyzeResponse(BaseModel):
@@ -50,16 +89,30 @@ class AnalyzeResponse(BaseModel):
     documentation_path: Optional[str] = None
 
 
-# In-memory storage for progress (in production, use Redis or similar)
-analysis_progress: dict[str, AnalysisProgress] = {}
+# How long a job stays joinable by identical requests (if it never finishes)
+JOB_FLIGHT_TTL_SECONDS = 3600
+
+
+@lru_cache(maxsize=1)
+def get_state_store() -> StateStore:
+    """
+    Job and cache state shared by all workers (see components/state_store.py).
+
+    Configured with DOCWEAVE_STATE_URL; defaults to a local SQLite database.
+    Jobs left queued or running by a worker that stopped are marked failed.
+    """
+    store = open_state_store()
+    store.purge()
+    store.fail_stale_jobs()
+    return store
 
 
 @app.get("/", response_class=HTMLResponse)
-async def root() -> HTMLResponse:
+async def root(request: Request) -> Response:
     """Serve the main application page."""
-    html_path = Path(__file__).parent.parent.parent / "static" / "index.html"
+    html_path = static_path / "index.html"
     if html_path.exists():
-        return HTMLResponse(content=html_path.read_text())
+        return _cached_file_response(html_path, request, "no-cache")
     return HTMLResponse(
         content="""
         <!DOCTYPE html>
@@ -74,6 +127,33 @@ async def root() -> HTMLResponse:
     )
 
 
+@app.get("/static/{asset_path:path}")
+async def static_asset(asset_path: str, request: Request) -> Response:
+    """Serve a frontend asset (cached, pre-compressed, with ETag)."""
+    path = (static_path / asset_path).resolve()
+    if not path.is_relative_to(static_path) or not path.is_file():
+        raise HTTPException(status_code=404, detail=f"Not found: {asset_path}")
+    return _cached_file_response(path, request, STATIC_CACHE_CONTROL)
+
+
+# In-flight /api/analyze runs, keyed by analysis_key()
+analysis_flights = SingleFlight()
+
+
+async def _analyze_and_document(repo_path: Path, request: AnalyzeRequest):
+    """Run the full pipeline once; returns (run, copilot_available, copilot_error)."""
+    copilot_available, copilot_error = await check_copilot_cli_installed()
+    run = await run_documentation(
+        repo_path,
+        limit=request.limit,
+        days_back=request.days_back,
+        copilot_available=copilot_available,
+        copilot_error=copilot_error,
+        output_path=request.output_dir(),
+    )
+    return run, copilot_available, copilot_error
+
+
 @app.post("/api/analyze", response_model=AnalyzeResponse)
 async def analyze_repository(
     request: AnalyzeRequest, background_tasks: BackgroundTasks
@@ -100,77 +180,188 @@ async def analyze_repository(
                 detail=f"GitHub URLs are not supported directly. {instructions}"
             )
         
-        # Resolve the path
+        # Resolve the path; any directory inside a repository names its root
         repo_path = Path(request.repo_path).expanduser().resolve()
-        
-        # Analyze commits
-        commits = await analyze_recent_commits(
-            repo_path, limit=request.limit, days_back=request.days_back
+        repo_path = find_repo_root(repo_path) or repo_path
+
+        # Identical concurrent requests (same repo, HEAD and selection) share one run
+        key = analysis_key(repo_path, request.limit, request.days_back, request.output_dir())
+        (run, copilot_available, copilot_error), shared = await analysis_flights.run(
+            key, lambda: _analyze_and_document(repo_path, request)
         )
 
-        if not commits:
+        if not run.commits:
             return AnalyzeResponse(
                 success=False,
                 message="No recent commits found in the repository",
                 commits_count=0,
             )
 
-        # Check if Copilot CLI is available
-        copilot_available, copilot_error = await check_copilot_cli_installed()
-        
-        # Analyze each commit
-        # Note: Copilot CLI is interactive, so we use enhanced heuristic analysis
-        # when it's available to demonstrate integration
-        analyses: list[CodeAnalysis] = []
-        
-        for commit in commits:
-            try:
-                diff = await get_commit_diff(repo_path, commit.sha)
-                
-                if copilot_available:
-                    # Use enhanced analysis (Copilot CLI is available but interactive)
-                    analysis = await analyze_with_copilot(diff, commit.message)
-                else:
-                    # Use fallback analysis if Copilot is not available
-                    from docweave.components.copilot_integration import _create_fallback_analysis
-                    analysis = _create_fallback_analysis(commit.message, diff, copilot_error or "Copilot CLI not available")
-                
-                analyses.append(analysis)
-            except Exception as e:
-                # Continue with fallback analysis if anything fails
-                from docweave.components.copilot_integration import _create_fallback_analysis
-                analysis = _create_fallback_analysis(commit.message, "", str(e))
-                analyses.append(analysis)
-
-        # Generate documentation (Copilot-powered when available)
-        repo_name = repo_path.name or "repository"
-        doc_result = await generate_documentation(
-            commits, analyses, repo_name, copilot_available=copilot_available
-        )
-
-        # Save documentation to DocweaveDocs
-        output_path = repo_path / "DocweaveDocs"
-        await save_documentation(doc_result, output_path, repo_name)
-
+        commits = run.commits
         message = f"Successfully analyzed {len(commits)} commit(s) and generated documentation"
         if copilot_available:
             message += f" (Enhanced analysis with Copilot CLI integration - {len(commits)} commits analyzed)"
         else:
             message += f" (Using fallback analysis - Copilot CLI not available: {copilot_error})"
+        if shared:
+            message += " (shared with an identical request already in progress)"
         
         return AnalyzeResponse(
             success=True,
             message=message,
             commits_count=len(commits),
-            documentation_path=str(output_path),
+            documentation_path=str(run.output_path),
         )
 
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing repository: {str(e)}")
 
 
+@app.post("/api/analyze/stream")
+async def analyze_repository_stream(request: AnalyzeRequest) -> StreamingResponse:
+    """
+    Analyze a repository, streaming results as NDJSON.
+
+    Sends one `commit` record per commit as soon as it is analyzed, then a
+    `summary` record with the narrative, diagrams and next steps (or an
+    `error` record if the run fails). Documentation is also written to
+    DocweaveDocs/, as with /api/analyze.
+    """
+    if is_github_url(request.repo_path):
+        instructions = get_github_clone_instructions(request.repo_path)
+        raise HTTPException(
+            status_code=400,
+            detail=f"GitHub URLs are not supported directly. {instructions}"
+        )
+    repo_path = Path(request.repo_path).expanduser().resolve()
+    if not repo_path.is_dir():
+        raise HTTPException(status_code=400, detail=f"Path is not a directory: {repo_path}")
+
+    copilot_available, copilot_error = await check_copilot_cli_installed()
+
+    async def lines():
+        async for record in stream_documentation(
+            repo_path,
+            request.limit,
+            request.days_back,
+            copilot_available,
+            copilot_error,
+            output_path=request.output_dir(),
+        ):
+            yield to_ndjson(record)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+async def _heartbeat(store: StateStore, job_id: str) -> None:
+    """Keep a job from looking abandoned while this worker runs it."""
+    while True:
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        store.update_job(job_id)
+
+
+async def _run_analysis_job(job_id: str, request: AnalyzeRequest, repo_path: Path) -> None:
+    """Run an analysis job in this worker, recording progress in the state store."""
+    store = get_state_store()
+    heartbeat = asyncio.create_task(_heartbeat(store, job_id))
+    try:
+        copilot_available, copilot_error = await check_copilot_cli_installed()
+        store.update_job(job_id, status="running", stage="analyzing", message="Analyzing commits")
+
+        def on_commit(i, total, commit, analysis, used_fallback, position) -> None:
+            store.update_job(
+                job_id,
+                progress=0.9 * i / total,
+                message=f"Analyzed {i}/{total}: {commit.sha[:7]}",
+            )
+
+        run = await run_documentation(
+            repo_path,
+            limit=request.limit,
+            days_back=request.days_back,
+            copilot_available=copilot_available,
+            copilot_error=copilot_error,
+            output_path=request.output_dir(),
+            on_commit=on_commit,
+        )
+        store.update_job(
+            job_id,
+            status="succeeded",
+            stage="done",
+            progress=1.0,
+            message=f"Documented {len(run.commits)} commit(s)",
+            result={
+                "commits_count": len(run.commits),
+                "documentation_path": str(run.output_path) if run.commits else None,
+                "written": [str(p) for p in run.written],
+                "copilot_used": copilot_available,
+            },
+        )
+    except Exception as e:
+        store.update_job(job_id, status="failed", stage="error", error=str(e))
+    finally:
+        heartbeat.cancel()
+
+
+@app.post("/api/jobs", status_code=202)
+async def create_analysis_job(
+    request: AnalyzeRequest, background_tasks: BackgroundTasks
+) -> dict:
+    """
+    Start an analysis in the background and return its job id.
+
+    Poll GET /api/jobs/{job_id}; job state lives in the shared state store,
+    so any worker can answer.
+    """
+    if is_github_url(request.repo_path):
+        instructions = get_github_clone_instructions(request.repo_path)
+        raise HTTPException(
+            status_code=400,
+            detail=f"GitHub URLs are not supported directly. {instructions}"
+        )
+    repo_path = Path(request.repo_path).expanduser().resolve()
+    if not repo_path.is_dir():
+        raise HTTPException(status_code=400, detail=f"Path is not a directory: {repo_path}")
+    repo_path = find_repo_root(repo_path) or repo_path
+
+    # A job for the same repo, HEAD and selection that is still running (in
+    # any worker) is returned instead of starting a duplicate
+    key = analysis_key(repo_path, request.limit, request.days_back, request.output_dir())
+    job, created = get_state_store().create_or_join_job(
+        "job:" + json.dumps(key),
+        stage="queued",
+        message="Waiting to start",
+        ttl=JOB_FLIGHT_TTL_SECONDS,
+    )
+    if created:
+        background_tasks.add_task(_run_analysis_job, job.job_id, request, repo_path)
+    return {"job_id": job.job_id, "status": job.status, "shared": not created}
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_analysis_job(job_id: str) -> dict:
+    """Status, progress and (when finished) result of an analysis job."""
+    job = get_state_store().get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "stage": job.stage,
+        "message": job.message,
+        "progress": job.progress,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+        "owner": job.owner,
+    }
+
+
 @app.get("/api/commits")
 async def get_commits(repo_path: str, limit: int = 10) -> list[dict]:
     """Get recent commits from a repository."""
@@ -218,6 +409,203 @@ async def get_commits(repo_path: str, limit: int = 10) -> list[dict]:
         )
 
 
+@app.get("/api/hotspots")
+async def get_hotspots(
+    repo_path: str,
+    limit: int = 20,
+    path_prefix: Optional[str] = None,
+    include_generated: bool = False,
+) -> dict:
+    """
+    Get the highest-risk files from the repository's churn index.
+
+    Reads only the persisted index (built by `docweave analyze` or
+    `docweave index`), and never creates it: before it is built, there are
+    no hotspots. Git history is not walked. Generated and vendored
+    files are left out, as in HOTSPOTS.md, unless include_generated is set.
+    """
+    try:
+        path = Path(repo_path).expanduser().resolve()
+        if not path.exists():
+            raise HTTPException(status_code=400, detail=f"Path does not exist: {path}")
+
+        try:
+            index = ChurnIndex.for_repo(path, read_only=True)
+        except FileNotFoundError:
+            return {"indexed": False, "indexed_sha": None, "hotspots": []}
+        try:
+            hotspots = index.top_hotspots(
+                limit=max(1, min(limit, 500)),
+                path_prefix=path_prefix,
+                exclude_generated=not include_generated,
+            )
+            indexed_sha = index.last_indexed_sha
+        finally:
+            index.close()
+
+        return {
+            "indexed": indexed_sha is not None,
+            "indexed_sha": indexed_sha,
+            "hotspots": [
+                {
+                    "path": h.path,
+                    "commits": h.commits,
+                    "additions": h.additions,
+                    "deletions": h.deletions,
+                    "authors": h.authors,
+                    "last_touched": h.last_touched.isoformat(),
+                    "score": round(h.score, 3),
+                }
+                for h in hotspots
+            ],
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading hotspots: {str(e)}")
+
+
+@app.get("/api/search")
+async def search_analyses(
+    repo_path: str,
+    q: str = "",
+    importance: Optional[list[str]] = Query(None),
+    author: Optional[str] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    path_prefix: Optional[str] = None,
+    limit: int = 20,
+) -> dict:
+    """
+    Ranked full-text search over the repository's analyzed commits.
+
+    Reads only the persisted search index, which documentation runs update
+    as they analyze commits, and never creates it: before any run, there
+    are no hits. since/until are inclusive UTC dates (YYYY-MM-DD).
+    """
+    try:
+        path = Path(repo_path).expanduser().resolve()
+        if not path.exists():
+            raise HTTPException(status_code=400, detail=f"Path does not exist: {path}")
+
+        try:
+            index = SearchIndex.for_repo(path, read_only=True)
+        except FileNotFoundError:
+            return {"query": q, "indexed": 0, "hits": []}
+        try:
+            hits = index.search(
+                q,
+                importance=importance,
+                author=author,
+                since=datetime.combine(since, time()) if since else None,
+                until=datetime.combine(until, time()) + timedelta(days=1) if until else None,
+                path_prefix=path_prefix,
+                limit=max(1, min(limit, 500)),
+            )
+            indexed = index.count()
+        finally:
+            index.close()
+
+        return {
+            "query": q,
+            "indexed": indexed,
+            "hits": [
+                {**asdict(h), "date": h.date.isoformat(), "score": round(h.score, 3)}
+                for h in hits
+            ],
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching analyses: {str(e)}")
+
+
+def _docs_dir(repo_path: str, output_path: Optional[str] = None) -> Path:
+    """
+    Resolve a repository's docs directory, or raise 404.
+
+    output_path names it; otherwise it is where the repository's last run
+    wrote its docs, else <repo>/DocweaveDocs (see docs_location).
+    """
+    path = Path(repo_path).expanduser().resolve()
+    if output_path:
+        docs = Path(output_path).expanduser().resolve()
+    else:
+        root = find_repo_root(path) if path.exists() else None
+        if root is None:
+            raise HTTPException(status_code=404, detail=f"Not a git repository: {path}")
+        try:
+            docs = docs_location(root)
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+    if not docs.is_dir():
+        raise HTTPException(
+            status_code=404,
+            detail=f"No generated documentation in {docs}; run `docweave analyze` first",
+        )
+    return docs
+
+
+@app.get("/api/docs")
+async def list_docs(repo_path: str, output_path: Optional[str] = None) -> dict:
+    """List the generated documents of a repository with their ETags."""
+    docs = _docs_dir(repo_path, output_path)
+    documents = []
+    for path in sorted(docs.glob("*.md")):
+        asset = asset_cache.get(path)
+        if asset is not None:
+            documents.append({"name": path.name, "size": len(asset.content), "etag": asset.etag})
+    return {
+        "repo_path": str(Path(repo_path).expanduser().resolve()),
+        "docs_path": str(docs),
+        "documents": documents,
+    }
+
+
+@app.get("/api/commit-index")
+async def commit_index(
+    repo_path: str, offset: int = 0, limit: int = 50, output_path: Optional[str] = None
+) -> dict:
+    """
+    Page through the commit index of the sharded docs layout, newest first.
+
+    Only the index is read; each entry's document is served at
+    /api/docs/commits/<sha>.md.
+    """
+    if offset < 0 or not 1 <= limit <= MAX_COMMITS_PAGE:
+        raise HTTPException(
+            status_code=400, detail=f"offset must be >= 0 and limit 1..{MAX_COMMITS_PAGE}"
+        )
+    total, entries = read_index(_docs_dir(repo_path, output_path), offset, limit)
+    return {
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "commits": [{**asdict(e), "document": shard_name(e.sha)} for e in entries],
+    }
+
+
+@app.get("/api/docs/{name:path}")
+async def get_doc(
+    name: str, repo_path: str, request: Request, output_path: Optional[str] = None
+) -> Response:
+    """
+    Serve one generated document (e.g. CHANGES.md) of a repository.
+
+    Served from memory with gzip/brotli encoding and an ETag; the cached
+    copy is dropped whenever save_documentation rewrites the file.
+    """
+    if not _DOC_NAME_RE.match(name):
+        raise HTTPException(status_code=400, detail=f"Invalid document name: {name}")
+    return _cached_file_response(
+        _docs_dir(repo_path, output_path) / name, request, DOCS_CACHE_CONTROL
+    )
+
+
 @app.get("/api/health")
 async def health() -> dict:
     """Health check endpoint."""
@@ -228,6 +616,8 @@ async def health() -> dict:
         "copilot_cli_available": copilot_available,
         "copilot_cli_error": copilot_error,
         "installation_instructions": get_copilot_installation_instructions() if not copilot_available else None,
+        "copilot_circuit": copilot_breaker.snapshot(),
+        "copilot_latency": copilot_latency.snapshot(),
     }
 
 
@@ -1,17 +1,21 @@
-"""CLI entrypoint for DocWeave."""
+"""CLI entrypoint for DocWeave.
+
+Only click is imported at module load. Each subcommand imports asyncio,
+GitPython, the Copilot integration and the doc generator inside its own
+body, so `docweave --help` and git-hook invocations stay fast. Keep new
+heavy imports inside the command that needs them.
+"""
 
-import asyncio
 import sys
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import click
 
-from docweave.components.copilot_integration import analyze_with_copilot
-from docweave.components.doc_generator import generate_documentation, save_documentation
-from docweave.features.commit_analysis import analyze_recent_commits, get_commit_diff
-from docweave.lib.copilot_check import check_copilot_cli_installed
-from docweave.lib.repo_utils import is_github_url
+if TYPE_CHECKING:
+    from docweave.components.deadline import Deadline
+    from docweave.types.models import CommitAnalyzed, DocumentationRun
 
 
 def print_step(message: str, icon: str = "📊") -> None:
@@ -39,10 +43,78 @@ def print_info(message: str) -> None:
     click.echo(click.style(f"ℹ️  {message}", fg="blue"))
 
 
+def _check_max_memory(value: Optional[str]) -> None:
+    """Reject a --max-memory value that is not a size."""
+    if value:
+        from docweave.components.memory_budget import parse_size
+
+        try:
+            parse_size(value)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--max-memory")
+
+
 @click.group()
-def cli() -> None:
+@click.option(
+    "--git-backend",
+    type=click.Choice(["gitpython", "batch"]),
+    default=None,
+    help="How git objects are read: GitPython objects, or persistent "
+    "cat-file/diff-tree processes (default: $DOCWEAVE_GIT_BACKEND or gitpython)",
+)
+@click.option(
+    "--docs-layout",
+    type=click.Choice(["single", "sharded"]),
+    default=None,
+    help="single: all commits in CHANGES.md; sharded: commits/<sha>.md plus "
+    "commits/index.tsv (default: $DOCWEAVE_DOCS_LAYOUT or single)",
+)
+@click.option(
+    "--similarity-threshold",
+    default=None,
+    metavar="FLOAT|off",
+    help="Diff similarity at which commits share one Copilot analysis, or off "
+    "(default: $DOCWEAVE_SIMILARITY_THRESHOLD or 0.7)",
+)
+@click.option(
+    "--max-memory",
+    default=None,
+    metavar="SIZE",
+    help="Memory budget such as 512M; runs use smaller diffs, spill to disk and "
+    "analyze one commit at a time as they near it (default: $DOCWEAVE_MAX_MEMORY)",
+)
+@click.option(
+    "--search-index/--no-search-index",
+    default=None,
+    help="Add analyzed commits to the search index used by `docweave search` "
+    "(default: $DOCWEAVE_SEARCH_INDEX or on)",
+)
+@click.pass_context
+def cli(
+    ctx: click.Context,
+    git_backend: Optional[str],
+    docs_layout: Optional[str],
+    similarity_threshold: Optional[str],
+    max_memory: Optional[str],
+    search_index: Optional[bool],
+) -> None:
     """DocWeave - Documentation companion powered by GitHub Copilot CLI."""
-    pass
+    from docweave.components.run_settings import RunSettings, use_settings
+
+    if similarity_threshold:
+        from docweave.components.near_duplicates import similarity_threshold as resolve
+
+        try:
+            resolve(similarity_threshold)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--similarity-threshold")
+    _check_max_memory(max_memory)
+    # Current until the subcommand finishes (see components/run_settings.py),
+    # rather than environment variables that would outlive it
+    settings = RunSettings(
+        git_backend, docs_layout, similarity_threshold, max_memory, search_index
+    )
+    ctx.obj = ctx.with_resource(use_settings(settings))
 
 
 @cli.command()
@@ -73,16 +145,116 @@ def cli() -> None:
     default=None,
     help="Only analyze commits from the last N days",
 )
+@click.option(
+    "--deadline",
+    type=click.FloatRange(min=1),
+    default=None,
+    help="Finish within this many seconds, using heuristics for what Copilot cannot reach",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["text", "ndjson"]),
+    default="text",
+    show_default=True,
+    help="ndjson: emit one JSON record per commit as it is analyzed, then a summary",
+)
+@click.option(
+    "--ndjson-file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="With --format ndjson, write records to this file instead of stdout",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Directory to write the documentation to (default: <repo>/DocweaveDocs; "
+    "required for bare repositories)",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    help="Reuse the analyses an interrupted run already finished",
+)
+@click.option(
+    "--memory-profile",
+    is_flag=True,
+    default=False,
+    help="Trace allocations; report memory per stage and the top allocation sites",
+)
+@click.option(
+    "--max-memory",
+    "memory_budget",
+    default=None,
+    metavar="SIZE",
+    help="Memory budget such as 512M for this run (same as `docweave --max-memory`)",
+)
 def analyze(
-    path: Optional[Path], limit: Optional[int], last: bool, days: Optional[int]
+    path: Optional[Path],
+    limit: Optional[int],
+    last: bool,
+    days: Optional[int],
+    deadline: Optional[float],
+    output_format: str,
+    ndjson_file: Optional[Path],
+    output: Optional[Path],
+    resume: bool,
+    memory_profile: bool,
+    memory_budget: Optional[str],
 ) -> None:
     """
     Analyze a git repository and generate documentation.
     
     By default, analyzes the last 5 commits in the current directory.
     Use --last to analyze only the most recent commit.
-    Documentation will be saved to DocweaveDocs/ folder in the repository root.
+    Documentation will be saved to DocweaveDocs/ folder in the repository root,
+    or to --output (required for bare repositories such as mirrors).
+    With --deadline, the most important and largest commits are analyzed
+    first and the run finishes in time with the best analysis it reached.
+    With --format ndjson, records go to stdout (or --ndjson-file) and
+    messages to stderr. Every commit analysis is journaled as it completes;
+    after an interruption, --resume analyzes only the commits still missing.
+    With --max-memory (here or before the command) or --memory-profile,
+    peak memory is reported at the end.
     """
+    import asyncio
+    from contextlib import aclosing
+    from dataclasses import replace
+
+    from docweave.components.run_settings import current_settings, use_settings
+
+    if ndjson_file and output_format != "ndjson":
+        raise click.UsageError("--ndjson-file requires --format ndjson")
+    _check_max_memory(memory_budget)
+    if memory_budget:
+        # Overrides the group option until this command finishes
+        settings = replace(current_settings(), max_memory=memory_budget)
+        click.get_current_context().with_resource(use_settings(settings))
+
+    if memory_profile:
+        import tracemalloc
+
+        tracemalloc.start()
+
+    from docweave.components.deadline import Deadline
+    from docweave.components.memory_budget import max_memory
+    from docweave.features.history_reports import LONG_UPDATE_COMMITS, pending_index_commits
+    from docweave.features.pipeline import pipeline_events
+    from docweave.features.repo_location import (
+        default_output_path,
+        find_repo_root,
+        repo_display_name,
+    )
+    from docweave.features.run_journal import RunJournal
+    from docweave.lib.repo_utils import is_github_url
+    from docweave.types.models import DocumentationWritten
+
+    # The deadline counts from here, after the imports
+    run_deadline = Deadline(deadline) if deadline else None
+
     # Determine repository path
     if path is None:
         repo_path = Path.cwd()
@@ -99,127 +271,128 @@ def analyze(
         )
         sys.exit(1)
 
+    if output_format == "ndjson":
+        commit_limit = 1 if last else (limit if limit is not None else 5)
+        _analyze_ndjson(
+            repo_path, commit_limit, days, run_deadline, ndjson_file, output, resume, memory_profile
+        )
+        return
+
     click.echo("\n" + "=" * 60)
     click.echo(click.style("🔗 DocWeave - Documentation Companion", bold=True))
     click.echo("=" * 60 + "\n")
 
+    journal = None
     try:
         # Check if it's a git repository
         print_step("Detecting git repository...")
-        if not (repo_path / ".git").exists():
-            # Try parent directories
-            current = repo_path
-            found_git = False
-            for _ in range(5):
-                if (current / ".git").exists():
-                    repo_path = current
-                    found_git = True
-                    break
-                if current.parent == current:
-                    break
-                current = current.parent
-
-            if not found_git:
-                print_error(
-                    f"{repo_path} is not a git repository.\n"
-                    "Please ensure you're in a directory with a .git folder, "
-                    "or initialize with: git init"
-                )
-                sys.exit(1)
+        root = find_repo_root(repo_path)
+        if root is None:
+            print_error(
+                f"{repo_path} is not a git repository.\n"
+                "Please ensure you're in a git work tree or a bare repository, "
+                "or initialize with: git init"
+            )
+            sys.exit(1)
+        repo_path = root
+        output_path = output.resolve() if output else default_output_path(repo_path)
 
-        repo_name = repo_path.name or "repository"
+        repo_name = repo_display_name(repo_path)
         print_success(f"Detected git repository: {repo_name}")
         print_info(f"Repository path: {repo_path}\n")
 
-        # Check Copilot CLI status
-        print_step("Checking GitHub Copilot CLI...")
-        copilot_available, copilot_error = asyncio.run(check_copilot_cli_installed())
-        if copilot_available:
-            print_success("GitHub Copilot CLI is available - using enhanced analysis")
-        else:
-            print_warning(f"GitHub Copilot CLI not available: {copilot_error}")
-            print_info("Using fallback analysis (still generates great docs!)\n")
-
         # Determine commit limit
         if last:
             commit_limit = 1
-            print_step("Analyzing last commit...")
         elif limit is not None:
             commit_limit = limit
-            print_step(f"Analyzing recent commits (limit: {commit_limit})...")
         else:
             commit_limit = 5  # Default to 5 commits
-            print_step(f"Analyzing recent commits (limit: {commit_limit})...")
 
-        commits = asyncio.run(
-            analyze_recent_commits(repo_path, limit=commit_limit, days_back=days)
-        )
+        journal = RunJournal.for_repo(repo_path, replay=resume)
+        # The history indexes behind HOTSPOTS.md and the co-change diagram
+        # are updated before the docs are generated; the first update reads
+        # the whole history, so say so rather than appear stuck
+        pending_index = pending_index_commits(repo_path)
 
-        if not commits:
-            print_warning("No recent commits found in the repository.")
-            sys.exit(0)
+        def report_commit(event: "CommitAnalyzed") -> None:
+            commit = event.commit
+            title = commit.message.split(chr(10))[0][:50]
+            total = event.total or commit_limit
+            click.echo(f"  [{event.index}/{total}] {commit.sha[:7]} - {title}...", nl=False)
+            if event.used_fallback:
+                print_warning(" ⚠ (using fallback)")
+            else:
+                print_success(" ✓")
 
-        print_success(f"Found {len(commits)} commit(s) to analyze\n")
-
-        # Analyze each commit
-        print_step("Analyzing commits with AI-powered insights...")
-        analyses = []
-        
-        async def analyze_commits():
-            commit_analyses = []
-            for i, commit in enumerate(commits, 1):
-                try:
-                    diff = await get_commit_diff(repo_path, commit.sha)
-                    if copilot_available:
-                        analysis = await analyze_with_copilot(diff, commit.message)
-                    else:
-                        from docweave.components.copilot_integration import (
-                            _create_fallback_analysis,
-                        )
-
-                        analysis = _create_fallback_analysis(
-                            commit.message, diff, copilot_error or "Copilot CLI not available"
-                        )
-
-                    commit_analyses.append(analysis)
-                    click.echo(f"  [{i}/{len(commits)}] {commit.sha[:7]} - {commit.message.split(chr(10))[0][:50]}...", nl=False)
-                    print_success(" ✓")
-                except Exception as e:
-                    from docweave.components.copilot_integration import (
-                        _create_fallback_analysis,
-                    )
-
-                    analysis = _create_fallback_analysis(commit.message, "", str(e))
-                    commit_analyses.append(analysis)
-                    click.echo(f"  [{i}/{len(commits)}] {commit.sha[:7]} - {commit.message.split(chr(10))[0][:50]}...", nl=False)
-                    print_warning(" ⚠ (using fallback)")
-            return commit_analyses
-        
-        analyses = asyncio.run(analyze_commits())
-        click.echo()
-
-        # Generate documentation (with Copilot for diagrams/narrative when available)
-        print_step("Generating documentation...")
-        doc_result = asyncio.run(
-            generate_documentation(
-                commits, analyses, repo_name, copilot_available=copilot_available
-            )
-        )
+        async def run_pipeline() -> tuple[bool, "DocumentationRun", int]:
+            # Check Copilot CLI status
+            print_step("Checking GitHub Copilot CLI...")
+            copilot_available, copilot_error = await _check_copilot(run_deadline)
+            if copilot_available:
+                print_success("GitHub Copilot CLI is available - using enhanced analysis")
+            else:
+                print_warning(f"GitHub Copilot CLI not available: {copilot_error}")
+                print_info("Using fallback analysis (still generates great docs!)\n")
 
-        # Save documentation
-        output_path = repo_path / "DocweaveDocs"
-        asyncio.run(save_documentation(doc_result, output_path, repo_name))
+            if last:
+                print_step("Analyzing last commit...")
+            else:
+                print_step(f"Analyzing recent commits (limit: {commit_limit})...")
+            # Commits are read, diffed and analyzed as they stream in
+            replayed = 0
+            events = pipeline_events(
+                repo_path,
+                commit_limit,
+                days,
+                copilot_available,
+                copilot_error,
+                output_path=output_path,
+                deadline=run_deadline,
+                journal=journal,
+            )
+            async with aclosing(events):
+                async for event in events:
+                    if isinstance(event, DocumentationWritten):
+                        return copilot_available, event.run, replayed
+                    report_commit(event)
+                    replayed += event.reused == "journal"
+                    if event.index == event.total:
+                        click.echo()
+                        if pending_index >= LONG_UPDATE_COMMITS:
+                            print_info(
+                                f"Indexing {pending_index} commit(s) of history for hotspots "
+                                "and co-change diagrams (later runs only read new commits)"
+                                + (", unless the deadline passes first" if run_deadline else "")
+                            )
+                        # Generate documentation (Copilot diagrams/narrative when available)
+                        print_step("Generating documentation...")
+            raise RuntimeError("pipeline ended without documentation")
 
+        copilot_available, run, replayed = asyncio.run(run_pipeline())
+        if not run.commits:
+            print_warning("No recent commits found in the repository.")
+            sys.exit(0)
+        commits, doc_result = run.commits, run.documentation
+        if resume:
+            print_info(f"Resumed: {replayed} of {len(commits)} commit(s) were already analyzed")
         print_success(f"Documentation generated successfully!\n")
 
         # Show summary
         click.echo(click.style("📁 Generated Files:", bold=True))
+        if doc_result.commit_documents:
+            shards = len(doc_result.commit_documents)
+            changes = f"commits/ - {shards} commit document(s) + index.tsv"
+        else:
+            changes = "CHANGES.md - Detailed commit analysis"
         files_created = [
-            "CHANGES.md - Detailed commit analysis",
+            changes,
             "NARRATIVE.md - Development narrative",
             "DIAGRAMS.md - Mermaid diagrams",
             "NEXT_STEPS.md - Suggested next steps",
         ]
+        if doc_result.hotspots:
+            files_created.append("HOTSPOTS.md - Most changed, highest-risk files")
         if doc_result.integration_insights:
             files_created.append("INTEGRATION.md - Integration & architecture insights")
         for file_info in files_created:
@@ -233,6 +406,28 @@ def analyze(
                     fg="green",
                 )
             )
+            prompt_stats = run.prompt_stats
+            if prompt_stats and prompt_stats.total_dropped:
+                dropped = ", ".join(
+                    f"{name} ~{tokens}" for name, tokens in prompt_stats.tokens_dropped.items()
+                )
+                print_info(
+                    f"Prompt budget: {prompt_stats.prompts} prompt(s), "
+                    f"~{prompt_stats.tokens_sent} tokens sent; trimmed {dropped} tokens"
+                )
+            cluster_stats = run.cluster_stats
+            if cluster_stats and cluster_stats.members:
+                print_info(
+                    f"Near-duplicates: {cluster_stats.members} commit(s) in "
+                    f"{cluster_stats.clusters} cluster(s) reused an analysis "
+                    f"({cluster_stats.members} Copilot call(s) saved)"
+                )
+        budget = max_memory()
+        if (memory_profile or budget) and run.memory_stats:
+            report = run.memory_stats.report(budget, detail=memory_profile)
+            print_info(f"Memory: {report[0]}")
+            for line in report[1:]:
+                click.echo(f"  {line}")
 
         click.echo("\n" + "=" * 60)
         print_success("Analysis complete!")
@@ -243,6 +438,8 @@ def analyze(
         sys.exit(1)
     except KeyboardInterrupt:
         click.echo("\n\n⚠️  Analysis interrupted by user")
+        if journal:
+            print_info("Run `docweave analyze --resume` with the same options to continue")
         sys.exit(130)
     except Exception as e:
         print_error(f"Unexpected error: {str(e)}")
@@ -251,6 +448,658 @@ def analyze(
         if "--debug" in sys.argv:
             traceback.print_exc()
         sys.exit(1)
+    finally:
+        if journal:
+            journal.close()
+
+
+async def _check_copilot(deadline: Optional["Deadline"]) -> tuple[bool, Optional[str]]:
+    """
+    Check for Copilot CLI within a run's deadline.
+
+    Copilot counts as unavailable when too little time is left for a call,
+    or when the check itself does not finish in that time.
+    """
+    import asyncio
+
+    from docweave.lib.copilot_check import check_copilot_cli_installed
+
+    if deadline is None:
+        return await check_copilot_cli_installed()
+    timeout = deadline.call_timeout(deadline.seconds)
+    if timeout is None:
+        return False, "deadline reached before checking for Copilot CLI"
+    try:
+        return await asyncio.wait_for(check_copilot_cli_installed(), timeout)
+    except asyncio.TimeoutError:
+        return False, "Copilot CLI check did not finish before the deadline"
+
+
+def _analyze_ndjson(
+    repo_path: Path,
+    limit: int,
+    days: Optional[int],
+    deadline: Optional["Deadline"],
+    ndjson_file: Optional[Path],
+    output: Optional[Path],
+    resume: bool,
+    memory_profile: bool = False,
+) -> None:
+    """Run `analyze` emitting NDJSON records; stdout carries only records."""
+    import asyncio
+
+    from docweave.components.memory_budget import MemoryStats, current_memory_stats, max_memory
+    from docweave.features.ndjson_stream import stream_documentation, to_ndjson
+    from docweave.features.repo_location import find_repo_root
+    from docweave.features.run_journal import RunJournal
+
+    root = find_repo_root(repo_path)
+    if root is None:
+        print_error(f"{repo_path} is not a git repository.")
+        sys.exit(1)
+
+    async def run(sink) -> tuple[bool, MemoryStats]:
+        copilot_available, copilot_error = await _check_copilot(deadline)
+        if not copilot_available:
+            click.echo(f"Copilot CLI not available ({copilot_error}); using fallback", err=True)
+        ok = True
+        async for record in stream_documentation(
+            root,
+            limit,
+            days,
+            copilot_available,
+            copilot_error,
+            output_path=output.resolve() if output else None,
+            deadline=deadline,
+            journal=journal,
+        ):
+            sink.write(to_ndjson(record))
+            sink.flush()
+            ok = ok and record["type"] != "error"
+        # The pipeline started the samples in this task's context
+        return ok, current_memory_stats()
+
+    journal = RunJournal.for_repo(root, replay=resume)
+    try:
+        if ndjson_file:
+            with open(ndjson_file, "w", encoding="utf-8") as sink:
+                ok, memory = asyncio.run(run(sink))
+        else:
+            ok, memory = asyncio.run(run(sys.stdout))
+    except KeyboardInterrupt:
+        click.echo("Analysis interrupted by user; continue with --resume", err=True)
+        sys.exit(130)
+    finally:
+        journal.close()
+    if memory_profile:
+        for line in memory.report(max_memory()):
+            click.echo(line, err=True)
+    sys.exit(0 if ok else 1)
+
+
+@cli.command()
+@click.option(
+    "--path",
+    "-p",
+    type=click.Path(exists=True, path_type=Path),
+    default=None,
+    help="Path to git repository (default: current directory)",
+)
+def index(path: Optional[Path]) -> None:
+    """
+    Build or update DocWeave's history indexes for a repository.
+
+    Indexes are stored under .git/docweave/ and updated incrementally from
+    the last indexed commit; `docweave analyze` also keeps them current.
+    """
+    from docweave.features.history_reports import update_history_indexes
+
+    repo_path = (path or Path.cwd()).resolve()
+    try:
+        print_step("Updating co-change and churn indexes...")
+        added = update_history_indexes(repo_path)
+        print_success(f"{added} new commit(s) indexed")
+    except ValueError as e:
+        print_error(str(e))
+        sys.exit(1)
+
+
+@cli.group()
+def hooks() -> None:
+    """Manage git hooks that document new commits in the background."""
+    pass
+
+
+_path_option = click.option(
+    "--path",
+    "-p",
+    type=click.Path(exists=True, path_type=Path),
+    default=None,
+    help="Path to git repository (default: current directory)",
+)
+
+
+@hooks.command("install")
+@_path_option
+@click.option("--force", is_flag=True, default=False, help="Back up and replace existing hooks")
+def hooks_install(path: Optional[Path], force: bool) -> None:
+    """
+    Install post-commit, post-merge and post-rewrite hooks.
+
+    The hooks only append the new commit to a queue and return at once;
+    a detached worker analyzes queued commits and updates DocweaveDocs/.
+    """
+    from docweave.hooks.installer import install_hooks
+
+    repo_path = (path or Path.cwd()).resolve()
+    try:
+        installed = install_hooks(repo_path, force=force)
+    except ValueError as e:
+        print_error(str(e))
+        sys.exit(1)
+    for hook in installed:
+        print_success(f"Installed {hook}")
+
+
+@hooks.command("uninstall")
+@_path_option
+def hooks_uninstall(path: Optional[Path]) -> None:
+    """Remove DocWeave's hooks, restoring any hooks they replaced."""
+    from docweave.hooks.installer import uninstall_hooks
+
+    repo_path = (path or Path.cwd()).resolve()
+    try:
+        removed = uninstall_hooks(repo_path)
+    except ValueError as e:
+        print_error(str(e))
+        sys.exit(1)
+    if not removed:
+        print_info("No DocWeave hooks installed")
+    for hook in removed:
+        print_success(f"Removed {hook}")
+
+
+@hooks.command("status")
+@_path_option
+def hooks_status(path: Optional[Path]) -> None:
+    """Show queued commits and whether a worker is running."""
+    from docweave.hooks.queue import WorkerLock, pending_count
+
+    repo_path = (path or Path.cwd()).resolve()
+    try:
+        pending = pending_count(repo_path)
+        running = WorkerLock(repo_path).held_elsewhere
+    except ValueError as e:
+        print_error(str(e))
+        sys.exit(1)
+    click.echo(f"Queued commits: {pending}")
+    click.echo(f"Worker running: {'yes' if running else 'no'}")
+
+
+@hooks.command("drain")
+@_path_option
+@click.option(
+    "--debounce",
+    type=float,
+    default=None,
+    help="Seconds the queue must stay quiet before a batch is processed",
+)
+@click.option(
+    "--background",
+    is_flag=True,
+    default=False,
+    help="Detach from the terminal (used by the installed hooks)",
+)
+def hooks_drain(path: Optional[Path], debounce: Optional[float], background: bool) -> None:
+    """Process queued commits now (normally started by the hooks)."""
+    from docweave.hooks.worker import DEBOUNCE_SECONDS, detach, drain_queue
+
+    if background:
+        detach()
+    repo_path = (path or Path.cwd()).resolve()
+    batches = drain_queue(repo_path, DEBOUNCE_SECONDS if debounce is None else debounce)
+    if not background:
+        print_success(f"Processed {batches} batch(es)")
+
+
+@cli.command()
+@_path_option
+@click.option(
+    "--limit",
+    "-l",
+    type=int,
+    default=5,
+    show_default=True,
+    help="Maximum number of commits to document on each regeneration",
+)
+@click.option(
+    "--debounce",
+    type=float,
+    default=2.0,
+    show_default=True,
+    help="Seconds refs must stay quiet before docs are regenerated",
+)
+@click.option(
+    "--poll-interval",
+    type=float,
+    default=2.0,
+    show_default=True,
+    help="Seconds between checks when inotify is unavailable",
+)
+@click.option(
+    "--no-inotify",
+    is_flag=True,
+    default=False,
+    help="Always poll instead of using inotify",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Directory to write the documentation to (default: <repo>/DocweaveDocs; "
+    "required for bare repositories)",
+)
+def watch(
+    path: Optional[Path],
+    limit: int,
+    debounce: float,
+    poll_interval: float,
+    no_inotify: bool,
+    output: Optional[Path],
+) -> None:
+    """
+    Regenerate DocweaveDocs/ whenever HEAD or a ref changes.
+
+    Runs until interrupted. Bursts of ref updates (rebase, pull) trigger a
+    single regeneration, and only commits not analyzed before reach Copilot.
+    """
+    from datetime import datetime
+
+    from docweave.features.repo_location import default_output_path, find_repo_root
+    from docweave.features.watch import WatchDaemon
+
+    repo_path = (path or Path.cwd()).resolve()
+    repo_path = find_repo_root(repo_path) or repo_path
+    try:
+        daemon = WatchDaemon(
+            repo_path,
+            limit=limit,
+            output_path=output.resolve() if output else default_output_path(repo_path),
+            debounce=debounce,
+            use_inotify=not no_inotify,
+            poll_interval=poll_interval,
+        )
+    except ValueError as e:
+        print_error(str(e))
+        sys.exit(1)
+
+    mode = "inotify" if daemon.uses_inotify else f"polling every {poll_interval:g}s"
+    print_step(f"Watching {repo_path} ({mode}) - press Ctrl+C to stop", icon="👀")
+
+    def report_run(run) -> None:
+        stamp = datetime.now().strftime("%H:%M:%S")
+        names = ", ".join(p.name for p in run.written) or "no files changed"
+        print_success(f"[{stamp}] {daemon.last_sha[:7]}: {len(run.commits)} commit(s) - {names}")
+
+    def report_error(error: Exception) -> None:
+        print_warning(f"Regeneration failed: {error}")
+
+    try:
+        daemon.run(on_run=report_run, on_error=report_error)
+    except KeyboardInterrupt:
+        click.echo("\n👋 Stopped watching")
+    finally:
+        daemon.close()
+
+
+@cli.command()
+@_path_option
+@click.option(
+    "--limit",
+    "-l",
+    type=int,
+    default=50,
+    show_default=True,
+    help="Maximum number of commits in the site",
+)
+@click.option(
+    "--days",
+    "-d",
+    type=int,
+    default=None,
+    help="Only include commits from the last N days",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Docs directory; the site goes to OUTPUT/site/ (default: <repo>/DocweaveDocs)",
+)
+def site(path: Optional[Path], limit: int, days: Optional[int], output: Optional[Path]) -> None:
+    """
+    Build a static HTML site of the documentation in DocweaveDocs/site/.
+
+    One page per commit, index pages per author and per directory, and the
+    diagrams (pre-rendered to SVG when mermaid-cli is installed). Analyses
+    are cached and only pages whose commits or analyses changed are
+    rebuilt. The narrative, next steps and diagrams are those of the current
+    markdown documents, which are not regenerated; without them, they are
+    written first as by `docweave analyze`.
+    """
+    import asyncio
+
+    from docweave.components.doc_generator import load_documentation
+    from docweave.features.analysis_cache import AnalysisCache
+    from docweave.features.pipeline import run_documentation
+    from docweave.features.repo_location import default_output_path, find_repo_root
+    from docweave.features.static_site import build_site, find_mmdc
+    from docweave.lib.copilot_check import check_copilot_cli_installed
+
+    repo_path = find_repo_root((path or Path.cwd()).resolve())
+    if repo_path is None:
+        print_error(f"{path or Path.cwd()} is not a git repository.")
+        sys.exit(1)
+
+    async def document(cache: AnalysisCache):
+        copilot_available, copilot_error = await check_copilot_cli_installed()
+        if not copilot_available:
+            print_warning(f"GitHub Copilot CLI not available: {copilot_error}")
+        return await run_documentation(
+            repo_path,
+            limit=limit,
+            days_back=days,
+            copilot_available=copilot_available,
+            copilot_error=copilot_error,
+            output_path=docs_path,
+            cache=cache,
+            documentation=documentation,
+        )
+
+    try:
+        docs_path = output.resolve() if output else default_output_path(repo_path)
+        documentation = load_documentation(docs_path)
+        if documentation:
+            print_info(
+                f"Using the documents in {docs_path}; run `docweave analyze` to regenerate them"
+            )
+        cache = AnalysisCache.for_repo(repo_path)
+        try:
+            print_step(f"Documenting up to {limit} commit(s) of {repo_path.name}...")
+            run = asyncio.run(document(cache))
+        finally:
+            cache.close()
+    except ValueError as e:
+        print_error(str(e))
+        sys.exit(1)
+    except KeyboardInterrupt:
+        click.echo("\n⚠️  Interrupted")
+        sys.exit(130)
+
+    if not run.commits:
+        print_warning("No commits found; nothing to build.")
+        sys.exit(0)
+
+    mmdc = find_mmdc()
+    if not mmdc:
+        print_info("mermaid-cli (mmdc) not found: diagrams will render in the browser")
+    build = build_site(run, docs_path / "site", mmdc)
+    print_success(
+        f"Site updated: {len(build.written)} file(s) written, {build.unchanged} unchanged, "
+        f"{len(build.removed)} removed"
+    )
+    click.echo(f"📂 {build.site_dir / 'index.html'}")
+
+
+@cli.command()
+@click.argument("query", required=False, default="")
+@_path_option
+@click.option(
+    "--importance",
+    "-i",
+    type=click.Choice(["high", "medium", "low"]),
+    multiple=True,
+    help="Only commits of this importance (repeatable)",
+)
+@click.option("--author", "-a", default=None, help="Only commits by this author")
+@click.option(
+    "--since",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default=None,
+    help="Only commits on or after this UTC date (YYYY-MM-DD)",
+)
+@click.option(
+    "--until",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default=None,
+    help="Only commits on or before this UTC date (YYYY-MM-DD)",
+)
+@click.option(
+    "--under",
+    "path_prefix",
+    default=None,
+    help="Only commits touching files under this path prefix (e.g. src/auth/)",
+)
+@click.option("--limit", "-l", type=click.IntRange(min=1), default=20, show_default=True)
+@click.option("--json", "as_json", is_flag=True, default=False, help="Print hits as JSON")
+def search(
+    query: str,
+    path: Optional[Path],
+    importance: tuple[str, ...],
+    author: Optional[str],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    path_prefix: Optional[str],
+    limit: int,
+    as_json: bool,
+) -> None:
+    """
+    Search the analyses of documented commits.
+
+    QUERY matches commit messages, summaries, reasons, next steps, file
+    paths and authors: all words must match, `word*` matches a prefix and
+    `OR` between words matches either. Without QUERY, lists the commits
+    matching the filters, newest first. Commits are indexed as `analyze`,
+    `watch`, hooks and the web app document them.
+    """
+    import json
+    import time
+    from dataclasses import asdict
+
+    from docweave.features.repo_location import find_repo_root
+    from docweave.features.search_index import SearchIndex
+
+    repo_path = find_repo_root((path or Path.cwd()).resolve())
+    if repo_path is None:
+        print_error(f"{path or Path.cwd()} is not a git repository.")
+        sys.exit(1)
+
+    try:
+        index = SearchIndex.for_repo(repo_path, read_only=True)
+    except FileNotFoundError:
+        if as_json:
+            click.echo("[]")
+        else:
+            print_warning("Nothing indexed yet; run `docweave analyze` first.")
+        return
+    try:
+        started = time.perf_counter()
+        hits = index.search(
+            query,
+            importance=list(importance),
+            author=author,
+            since=since,
+            until=until + timedelta(days=1) if until else None,
+            path_prefix=path_prefix,
+            limit=limit,
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        indexed = index.count()
+    finally:
+        index.close()
+
+    if as_json:
+        click.echo(json.dumps([asdict(h) for h in hits], default=str, indent=2))
+        return
+    if not indexed:
+        print_warning("Nothing indexed yet; run `docweave analyze` first.")
+        return
+    for hit in hits:
+        tag = click.style(f"[{hit.importance.upper()}]", bold=hit.importance == "high")
+        click.echo(
+            f"{click.style(hit.sha, fg='yellow')} {hit.date:%Y-%m-%d} {tag} "
+            f"{hit.author}: {hit.title}"
+        )
+        click.echo(f"    {' '.join((hit.snippet or hit.summary).split())}")
+    click.echo(f"\n{len(hits)} hit(s) among {indexed} indexed commit(s) in {elapsed_ms:.1f} ms")
+
+
+@cli.command("analyze-many")
+@click.argument("source", type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "--limit",
+    "-l",
+    type=int,
+    default=5,
+    show_default=True,
+    help="Maximum number of commits to analyze per repository",
+)
+@click.option(
+    "--days",
+    "-d",
+    type=int,
+    default=None,
+    help="Only analyze commits from the last N days",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Number of repositories processed concurrently",
+)
+@click.option(
+    "--copilot-concurrency",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Maximum concurrent Copilot CLI calls across all repositories",
+)
+@click.option(
+    "--summary",
+    "summary_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write a consolidated JSON summary to this file",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Write each repository's docs to OUTPUT/<name>/ (required for bare mirrors)",
+)
+def analyze_many_command(
+    source: Path,
+    limit: int,
+    days: Optional[int],
+    jobs: int,
+    copilot_concurrency: int,
+    summary_path: Optional[Path],
+    output: Optional[Path],
+) -> None:
+    """
+    Analyze many repositories and generate documentation for each.
+
+    SOURCE is either a manifest file listing one repository path per line,
+    or a directory whose subdirectories are git repositories (work trees or
+    bare mirrors). Each repository gets its own DocweaveDocs/ folder, or
+    OUTPUT/<name>/ with --output.
+    """
+    import asyncio
+    import time
+
+    from docweave.features.batch_analysis import (
+        analyze_many,
+        load_repo_manifest,
+        write_batch_summary,
+    )
+    from docweave.lib.copilot_check import check_copilot_cli_installed
+
+    click.echo("\n" + "=" * 60)
+    click.echo(click.style("🔗 DocWeave - Batch Documentation", bold=True))
+    click.echo("=" * 60 + "\n")
+
+    try:
+        repos = load_repo_manifest(source)
+    except ValueError as e:
+        print_error(str(e))
+        sys.exit(1)
+    print_success(f"Found {len(repos)} repositor{'y' if len(repos) == 1 else 'ies'}")
+
+    print_step("Checking GitHub Copilot CLI...")
+
+    async def run_batch():
+        copilot_available, copilot_error = await check_copilot_cli_installed()
+        if copilot_available:
+            print_success("GitHub Copilot CLI is available - using enhanced analysis")
+        else:
+            print_warning(f"GitHub Copilot CLI not available: {copilot_error}")
+            print_info("Using fallback analysis for every repository\n")
+
+        def report_repo(result) -> None:
+            name = Path(result.repo_path).name
+            if result.success:
+                click.echo(
+                    f"  {name}: {result.commits_count} commit(s) "
+                    f"in {result.duration_seconds:.1f}s",
+                    nl=False,
+                )
+                print_success(" ✓")
+            else:
+                click.echo(f"  {name}: failed after {result.duration_seconds:.1f}s", nl=False)
+                print_warning(f" ⚠ {result.error}")
+
+        print_step(f"Documenting repositories ({jobs} at a time)...")
+        return await analyze_many(
+            repos,
+            limit=limit,
+            days_back=days,
+            jobs=jobs,
+            copilot_concurrency=copilot_concurrency,
+            copilot_available=copilot_available,
+            copilot_error=copilot_error,
+            on_repo_done=report_repo,
+            output_root=output.resolve() if output else None,
+        )
+
+    started = time.perf_counter()
+    try:
+        results = asyncio.run(run_batch())
+    except KeyboardInterrupt:
+        click.echo("\n\n⚠️  Batch interrupted by user")
+        sys.exit(130)
+    wall_seconds = time.perf_counter() - started
+
+    failed = [r for r in results if not r.success]
+    click.echo()
+    click.echo(click.style("📋 Summary:", bold=True))
+    click.echo(f"  Repositories: {len(results)}")
+    click.echo(f"  Succeeded:    {len(results) - len(failed)}")
+    click.echo(f"  Failed:       {len(failed)}")
+    click.echo(f"  Commits:      {sum(r.commits_count for r in results)}")
+    click.echo(f"  Time:         {wall_seconds:.1f}s")
+    for result in failed:
+        click.echo(f"  ✗ {result.repo_path}: {result.error}")
+
+    if summary_path:
+        write_batch_summary(results, summary_path, wall_seconds)
+        click.echo(f"\n📂 Summary saved to: {summary_path}")
+
+    click.echo()
+    sys.exit(1 if failed else 0)
 
 
 def main() -> None:
@@ -0,0 +1,186 @@
+"""Component: Per-author, per-week and per-directory activity rollups.
+
+Aggregates are computed column-wise: each commit gets an integer code per
+grouping (author, ISO week) and the measures (churn, importance) live in
+parallel arrays, so every group-by is a single pass of additions into
+per-group arrays. Directories are a many-to-many grouping: a commit counts
+once, with its whole churn, for every top-level directory it touches.
+"""
+
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+
+from docweave.types.models import CodeAnalysis, CommitInfo
+
+# Rows shown per table in prompts and the heuristic narrative
+MAX_ROWS = 8
+# Most recent weeks shown in the weekly table
+MAX_WEEKS = 12
+ROOT_DIRECTORY = "(root)"
+_IMPORTANCE_CODES = {"high": 0, "medium": 1, "low": 2}
+
+
+@dataclass
+class RollupRow:
+    """Aggregates of one group (an author, a week or a directory)."""
+
+    key: str
+    commits: int = 0
+    additions: int = 0
+    deletions: int = 0
+    high: int = 0
+    medium: int = 0
+    low: int = 0
+
+    @property
+    def churn(self) -> int:
+        """Lines added plus lines removed."""
+        return self.additions + self.deletions
+
+
+@dataclass
+class ActivityRollups:
+    """Rollups of a commit range; each list is sorted as documented."""
+
+    commits: int
+    first_week: str
+    last_week: str
+    by_author: list[RollupRow]  # most commits first
+    by_week: list[RollupRow]  # chronological
+    by_directory: list[RollupRow]  # most churn first
+
+
+def _factorize(keys: Iterable[str]) -> tuple[array, list[str]]:
+    """Integer code per key, plus the distinct keys indexed by code."""
+    index: dict[str, int] = {}
+    codes = array("l", (index.setdefault(k, len(index)) for k in keys))
+    return codes, list(index)
+
+
+def _group_by(
+    codes: array,
+    labels: list[str],
+    rows: array,
+    additions: array,
+    deletions: array,
+    importance: array,
+) -> list[RollupRow]:
+    """
+    Sum the measures of commit rows per group code.
+
+    Args:
+        codes: Group code of each (commit, group) pair
+        labels: Group key for each code
+        rows: Commit row of each pair, indexing the measure arrays
+        additions, deletions, importance: Per-commit measure columns
+    """
+    zeros = array("q", [0]) * len(labels)
+    commits, adds, dels = array("q", zeros), array("q", zeros), array("q", zeros)
+    mix = [array("q", zeros) for _ in _IMPORTANCE_CODES]
+    for code, row in zip(codes, rows):
+        commits[code] += 1
+        adds[code] += additions[row]
+        dels[code] += deletions[row]
+        mix[importance[row]][code] += 1
+    return [
+        RollupRow(labels[g], commits[g], adds[g], dels[g], mix[0][g], mix[1][g], mix[2][g])
+        for g in range(len(labels))
+    ]
+
+
+def top_directory(path: str) -> str:
+    """Top-level directory of a path ("src/" for "src/app.py"), or ROOT_DIRECTORY."""
+    head, sep, _ = path.partition("/")
+    return head + "/" if sep else ROOT_DIRECTORY
+
+
+def compute_rollups(
+    commits: list[CommitInfo], analyses: Optional[Sequence[CodeAnalysis]] = None
+) -> ActivityRollups:
+    """
+    Aggregate commits by author, ISO week and top-level directory.
+
+    Args:
+        commits: Commits to aggregate
+        analyses: Their analyses, in the same order, for the importance mix
+            (every commit counts as medium importance without them)
+
+    Returns:
+        ActivityRollups of the range
+    """
+    count = len(commits)
+    additions = array("q", (c.additions for c in commits))
+    deletions = array("q", (c.deletions for c in commits))
+    if analyses:
+        importance = array("b", (_IMPORTANCE_CODES.get(a.importance, 1) for a in analyses))
+    else:
+        importance = array("b", [1]) * count
+    rows = array("l", range(count))
+
+    author_codes, authors = _factorize(c.author for c in commits)
+    week_codes, week_labels = _factorize(
+        "{0:04d}-W{1:02d}".format(*c.date.isocalendar()[:2]) for c in commits
+    )
+
+    pair_rows, pair_dirs = array("l"), []
+    for row, commit in enumerate(commits):
+        dirs = dict.fromkeys(top_directory(p) for p in commit.files_changed)
+        pair_rows.extend([row] * len(dirs))
+        pair_dirs.extend(dirs)
+    dir_codes, dir_labels = _factorize(pair_dirs)
+
+    measures = (additions, deletions, importance)
+    by_author = _group_by(author_codes, authors, rows, *measures)
+    by_week = _group_by(week_codes, week_labels, rows, *measures)
+    by_directory = _group_by(dir_codes, dir_labels, pair_rows, *measures)
+
+    by_author.sort(key=lambda r: (-r.commits, -r.churn, r.key))
+    by_week.sort(key=lambda r: r.key)
+    by_directory.sort(key=lambda r: (-r.churn, -r.commits, r.key))
+    return ActivityRollups(
+        commits=count,
+        first_week=by_week[0].key if by_week else "",
+        last_week=by_week[-1].key if by_week else "",
+        by_author=by_author,
+        by_week=by_week,
+        by_directory=by_directory,
+    )
+
+
+def _table(title: str, rows: list[RollupRow], hidden: int) -> list[str]:
+    lines = [f"{title}:", "  key | commits | +added/-removed | high/medium/low"]
+    for r in rows:
+        mix = f"{r.high}/{r.medium}/{r.low}"
+        lines.append(f"  {r.key} | {r.commits} | +{r.additions}/-{r.deletions} | {mix}")
+    if hidden:
+        lines.append(f"  ... {hidden} more")
+    return lines
+
+
+def format_rollup_tables(rollups: ActivityRollups, max_rows: int = MAX_ROWS) -> str:
+    """
+    Compact text tables of the rollups, sized for a prompt.
+
+    Shows the top authors and directories and the most recent weeks; each
+    table notes how many rows it left out.
+    """
+    if not rollups.commits:
+        return ""
+    weeks = rollups.by_week[-MAX_WEEKS:]
+    lines = [
+        f"{rollups.commits} commits, {rollups.first_week} to {rollups.last_week}, "
+        f"{len(rollups.by_author)} author(s)",
+        *_table(
+            "Authors",
+            rollups.by_author[:max_rows],
+            max(0, len(rollups.by_author) - max_rows),
+        ),
+        *_table("Weeks", weeks, len(rollups.by_week) - len(weeks)),
+        *_table(
+            "Directories",
+            rollups.by_directory[:max_rows],
+            max(0, len(rollups.by_directory) - max_rows),
+        ),
+    ]
+    return "\n".join(lines)
@@ -0,0 +1,150 @@
+"""Component: In-memory cache of pre-compressed files served over HTTP."""
+
+import gzip
+import hashlib
+import mimetypes
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+try:  # optional: brotli compresses text noticeably better than gzip
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# Files smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 512
+_COMPRESSIBLE_PREFIXES = ("text/", "application/json", "application/javascript", "image/svg")
+
+mimetypes.add_type("text/markdown", ".md")
+
+
+@dataclass
+class CachedAsset:
+    """A file's bytes, their hash-based ETag and pre-compressed variants."""
+
+    content: bytes
+    etag: str
+    media_type: str
+    # Content-Encoding -> compressed bytes (only kept if smaller than content)
+    encodings: dict[str, bytes] = field(default_factory=dict)
+
+
+def _compress(content: bytes, media_type: str) -> dict[str, bytes]:
+    """Build the gzip (and, when available, brotli) variants of content."""
+    if len(content) < MIN_COMPRESS_BYTES or not media_type.startswith(_COMPRESSIBLE_PREFIXES):
+        return {}
+    variants = {"gzip": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(content, quality=11)
+    return {name: data for name, data in variants.items() if len(data) < len(content)}
+
+
+class AssetCache:
+    """
+    Serves files from memory, keyed on their content hash.
+
+    Each lookup stats the file; the bytes are only re-read when its mtime or
+    size changed, and only re-compressed when the content hash changed, so
+    a rewrite with identical content keeps its ETag. Writers in the same
+    process (save_documentation) call invalidate() so the next request never
+    sees stale content, even within the filesystem's mtime granularity.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # path -> ((mtime_ns, size), asset), least recently used first
+        self._entries: OrderedDict[Path, tuple[tuple[int, int], CachedAsset]] = OrderedDict()
+
+    def get(self, path: Path) -> Optional[CachedAsset]:
+        """
+        Return the cached asset for a file, loading it if needed.
+
+        Returns:
+            The asset, or None if the file does not exist
+        """
+        try:
+            stat = path.stat()
+        except (FileNotFoundError, NotADirectoryError):
+            self.invalidate([path])
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == stamp:
+                self._entries.move_to_end(path)
+                return entry[1]
+
+        content = path.read_bytes()
+        etag = hashlib.sha256(content).hexdigest()[:32]
+        if entry and entry[1].etag == etag:
+            asset = entry[1]
+        else:
+            media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            if media_type.startswith("text/"):
+                media_type += "; charset=utf-8"
+            asset = CachedAsset(content, etag, media_type, _compress(content, media_type))
+
+        with self._lock:
+            self._entries[path] = (stamp, asset)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return asset
+
+    def invalidate(self, paths: Iterable[Path]) -> None:
+        """Drop cached entries for files that were rewritten or removed."""
+        with self._lock:
+            for path in paths:
+                self._entries.pop(path, None)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header matches any variant of etag."""
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        tag = tag.removeprefix("W/").strip('"')
+        if tag.split("-", 1)[0] == etag:
+            return True
+    return False
+
+
+def negotiate(
+    asset: CachedAsset, accept_encoding: str, if_none_match: Optional[str], cache_control: str
+) -> tuple[int, bytes, dict[str, str]]:
+    """
+    Pick the representation of an asset for a request.
+
+    Args:
+        asset: The cached file
+        accept_encoding: The request's Accept-Encoding header ("" if absent)
+        if_none_match: The request's If-None-Match header, if any
+        cache_control: Cache-Control value to send
+
+    Returns:
+        (status code, body, headers): 304 with an empty body when the
+        client's copy is current, else 200 with the best encoding accepted
+    """
+    accepted = {part.split(";", 1)[0].strip().lower() for part in accept_encoding.split(",")}
+    encoding = next((e for e in ("br", "gzip") if e in accepted and e in asset.encodings), None)
+    suffix = {"br": "-br", "gzip": "-gz"}.get(encoding, "")
+    headers = {
+        "ETag": f'"{asset.etag}{suffix}"',
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if if_none_match and _etag_matches(if_none_match, asset.etag):
+        return 304, b"", headers
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        return 200, asset.encodings[encoding], headers
+    return 200, asset.content, headers
+
+
+# Shared by the web app and save_documentation
+asset_cache = AssetCache()
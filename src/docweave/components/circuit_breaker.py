@@ -0,0 +1,173 @@
+"""Component: Circuit breaker and adaptive timeouts for Copilot CLI calls."""
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+# Breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling Copilot while the breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing dependency until it has had time to recover.
+
+    After `failure_threshold` consecutive failures (errors or timeouts) the
+    breaker opens and calls fail fast. Once `cooldown` seconds have passed it
+    goes half-open and lets a single probe call through: success closes the
+    breaker, failure re-opens it with the cooldown doubled (up to
+    `max_cooldown`).
+
+    One instance is shared by every caller in the process, so the CLI, batch
+    runs and concurrent web requests all see the same state.
+    """
+
+    def __init__(
+        self, failure_threshold: int = 3, cooldown: float = 30.0, max_cooldown: float = 300.0
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Return to the closed state and forget past failures."""
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.cooldown = self.base_cooldown
+            self.opened_at = 0.0
+            self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go ahead now.
+
+        In the half-open state only one probe is allowed at a time; callers
+        that are refused should fall back immediately.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    return False
+                self.state = HALF_OPEN
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        """Record a successful call; closes a half-open breaker."""
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.cooldown = self.base_cooldown
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a failed or timed-out call; may open the breaker."""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN:
+                self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+                self._open()
+            elif self.consecutive_failures >= self.failure_threshold:
+                self._open()
+            self._probe_in_flight = False
+
+    def abandon(self) -> None:
+        """Forget a call that was cancelled before it succeeded or failed."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        """Current state, for health endpoints and logs."""
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "cooldown_seconds": self.cooldown,
+                "retry_in_seconds": None if retry_in is None else round(retry_in, 1),
+            }
+
+
+class LatencyTracker:
+    """
+    Recent call latencies, used to size timeouts to how Copilot is behaving.
+
+    Latency grows with prompt size, so each sample is normalized to a
+    1000-token prompt (assuming half the time is fixed overhead) and scaled
+    back to the size of the prompt being sent. The timeout is a high
+    percentile of recent samples times a headroom factor, clamped to
+    [min_timeout, max_timeout]. Until enough samples exist the maximum is
+    used.
+    """
+
+    def __init__(
+        self,
+        max_timeout: float,
+        min_timeout: float = 15.0,
+        percentile: float = 0.95,
+        headroom: float = 2.0,
+        min_samples: int = 5,
+        window: int = 50,
+    ) -> None:
+        self.max_timeout = max_timeout
+        self.min_timeout = min_timeout
+        self.percentile = percentile
+        self.headroom = headroom
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+
+    @staticmethod
+    def _size_units(prompt_tokens: int) -> float:
+        return (1000.0 + prompt_tokens) / 2000.0
+
+    def record(self, seconds: float, prompt_tokens: int) -> None:
+        """Add the latency of a successful call."""
+        self._samples.append(seconds / self._size_units(prompt_tokens))
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Normalized latency at quantile q (nearest rank), if sampled."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+        return ordered[rank]
+
+    def timeout_for(self, prompt_tokens: int) -> float:
+        """Timeout for a call with a prompt of the given size."""
+        if len(self._samples) < self.min_samples:
+            return self.max_timeout
+        expected = self.quantile(self.percentile) * self._size_units(prompt_tokens)
+        return max(self.min_timeout, min(self.max_timeout, expected * self.headroom))
+
+    def snapshot(self) -> dict:
+        """Latency summary, for health endpoints and logs."""
+        p50 = self.quantile(0.5)
+        p95 = self.quantile(0.95)
+        return {
+            "samples": len(self._samples),
+            # Seconds for a 1000-token prompt
+            "p50_seconds": None if p50 is None else round(p50, 2),
+            "p95_seconds": None if p95 is None else round(p95, 2),
+            "timeout_seconds_1k_tokens": round(self.timeout_for(1000), 1),
+        }
@@ -0,0 +1,141 @@
+"""Component: Sharded per-commit documents and their index.
+
+In the "sharded" docs layout each commit gets its own document,
+`DocweaveDocs/commits/<sha>.md`, instead of a section of CHANGES.md. A
+compact index, `commits/index.tsv`, lists every shard with one line per
+commit (SHA, date, author, importance, title), newest first. Shards from
+earlier runs are kept, so the index grows into a full log that readers can
+page through without opening any shard.
+"""
+
+import os
+from dataclasses import dataclass
+from datetime import timezone
+from pathlib import Path
+from typing import Iterable, Optional
+
+from docweave.components.run_settings import current_settings
+from docweave.types.models import CodeAnalysis, CommitInfo
+
+DOCS_LAYOUT_ENV = "DOCWEAVE_DOCS_LAYOUT"
+DOCS_LAYOUTS = ("single", "sharded")
+COMMITS_DIRNAME = "commits"
+INDEX_NAME = "index.tsv"
+INDEX_HEADER = "sha\tdate\tauthor\timportance\ttitle"
+# Longest title kept in the index (the shard has the full message)
+MAX_TITLE_LENGTH = 120
+
+
+def docs_layout(name: Optional[str] = None) -> str:
+    """
+    Resolve the documentation layout to write.
+
+    Args:
+        name: Explicit layout; defaults to --docs-layout, $DOCWEAVE_DOCS_LAYOUT,
+            then "single"
+
+    Raises:
+        ValueError: If the layout is unknown
+    """
+    name = name or current_settings().docs_layout or os.environ.get(DOCS_LAYOUT_ENV) or "single"
+    if name not in DOCS_LAYOUTS:
+        raise ValueError(f"Unknown docs layout: {name} (choose from {', '.join(DOCS_LAYOUTS)})")
+    return name
+
+
+@dataclass
+class IndexEntry:
+    """One line of the commit index."""
+
+    sha: str
+    date: str  # UTC, ISO 8601 ("2024-05-01T12:00:00Z"), so it sorts as text
+    author: str
+    importance: str
+    title: str
+
+    @classmethod
+    def from_commit(cls, commit: CommitInfo, analysis: CodeAnalysis) -> "IndexEntry":
+        # Naive dates are local time, as astimezone() takes them
+        date = commit.date.astimezone(timezone.utc)
+        return cls(
+            sha=commit.sha,
+            date=date.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            author=_field(commit.author),
+            importance=analysis.importance,
+            title=_field(commit.message.split("\n")[0])[:MAX_TITLE_LENGTH],
+        )
+
+    @classmethod
+    def from_line(cls, line: str) -> Optional["IndexEntry"]:
+        """Parse an index line; None for a malformed one."""
+        parts = line.rstrip("\n").split("\t")
+        return cls(*parts) if len(parts) == 5 else None
+
+    def to_line(self) -> str:
+        return "\t".join((self.sha, self.date, self.author, self.importance, self.title))
+
+
+def _field(text: str) -> str:
+    """Make text safe for one TSV column."""
+    return " ".join(text.split())
+
+
+def shard_name(sha: str) -> str:
+    """Path of a commit's shard, relative to the docs directory."""
+    return f"{COMMITS_DIRNAME}/{sha}.md"
+
+
+def merge_index(existing: str, lines: Iterable[str]) -> str:
+    """
+    Merge index lines into index text, replacing lines of the same SHA.
+
+    Args:
+        existing: Current index file content ("" if there is none)
+        lines: Index lines (IndexEntry.to_line) of the commits just documented,
+            in walk order (newest first)
+
+    Returns:
+        The new index: header, then one line per commit, newest first.
+        Commits of the same second keep their walk order, those just
+        documented ahead of those of earlier runs.
+    """
+    fresh = {e.sha: e for e in map(IndexEntry.from_line, lines) if e is not None}
+    kept = [
+        e
+        for e in map(IndexEntry.from_line, existing.splitlines()[1:])
+        if e is not None and e.sha not in fresh
+    ]
+    # A stable sort: equal dates stay in the order given
+    ordered = sorted([*fresh.values(), *kept], key=lambda e: e.date, reverse=True)
+    return "\n".join([INDEX_HEADER, *(e.to_line() for e in ordered)]) + "\n"
+
+
+def read_index(
+    output_path: Path, offset: int = 0, limit: int = 50
+) -> tuple[int, list[IndexEntry]]:
+    """
+    One page of the commit index of a docs directory.
+
+    Streams the index, so a page costs one pass over its lines and no shard
+    is read.
+
+    Args:
+        output_path: Docs directory (DocweaveDocs)
+        offset: Entries to skip (newest first)
+        limit: Maximum entries to return
+
+    Returns:
+        (total number of entries, the page of entries)
+    """
+    path = output_path / COMMITS_DIRNAME / INDEX_NAME
+    lines: list[str] = []
+    total = 0
+    try:
+        with path.open() as f:
+            f.readline()  # header
+            for total, line in enumerate(f, 1):
+                if offset < total <= offset + limit:
+                    lines.append(line)
+    except FileNotFoundError:
+        return 0, []
+    return total, [e for e in map(IndexEntry.from_line, lines) if e is not None]
@@ -3,31 +3,113 @@
 import asyncio
 import json
 import re
+import time
 from pathlib import Path
 from typing import Optional
 
+from docweave.components.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+)
+from docweave.components.prompt_budget import (
+    PromptSection,
+    build_prompt,
+    current_prompt_stats,
+    estimate_tokens,
+    truncate_to_tokens,
+)
 from docweave.types.models import CodeAnalysis
 
-# Max diff chars to send to Copilot (avoid prompt limits)
-MAX_DIFF_CHARS = 6000
+# Token budgets per prompt (template text included)
+ANALYSIS_PROMPT_TOKENS = 2500
+SYNTHESIS_PROMPT_TOKENS = 3000
+# Tokens of diff selected per commit before the analysis prompt is built
+DIFF_TOKEN_BUDGET = 2000
+# Hard ceiling for any prompt passed on the command line
+MAX_PROMPT_TOKENS = 7000
 # Subprocess timeout per Copilot call (seconds)
 COPILOT_TIMEOUT = 60
 
+# Optional process-wide cap on concurrent Copilot calls (None = unlimited)
+_copilot_slots: Optional[asyncio.Semaphore] = None
 
-async def _invoke_copilot(prompt: str) -> str:
+# Shared by every Copilot call in the process: fail fast while Copilot is
+# down, and size timeouts to its recent latency instead of always waiting
+# the full COPILOT_TIMEOUT
+copilot_breaker = CircuitBreaker(failure_threshold=3, cooldown=30.0)
+copilot_latency = LatencyTracker(max_timeout=COPILOT_TIMEOUT)
+
+
+def set_copilot_concurrency(limit: Optional[int]) -> None:
+    """
+    Limit how many Copilot CLI processes may run at once.
+
+    Shared by every caller in the process, so batch runs over many
+    repositories draw from a single budget. Pass None to remove the limit.
+    """
+    global _copilot_slots
+    _copilot_slots = asyncio.Semaphore(limit) if limit else None
+
+
+async def _invoke_copilot(prompt: str, timeout: Optional[float] = None) -> str:
     """
     Invoke GitHub Copilot CLI with a prompt.
 
     Uses `copilot -p "prompt"` for non-interactive programmatic mode.
+    Fails fast with CircuitOpenError while the shared breaker is open, and
+    otherwise records the outcome and latency of the call.
+
+    Args:
+        prompt: Prompt text
+        timeout: Upper bound in seconds for the call, including any wait for
+            a concurrency slot. The process timeout is the smaller of this
+            and the adaptive timeout for the prompt's size.
 
     Returns:
         Raw stdout from Copilot (may include usage stats at end)
     """
-    # Truncate prompt if too long (CLI tools often have limits)
-    max_prompt_len = 25000
-    if len(prompt) > max_prompt_len:
-        prompt = prompt[:max_prompt_len] + "\n\n[... prompt truncated ...]"
+    # Prompts are built within their budgets; this only guards the CLI limit
+    if estimate_tokens(prompt) > MAX_PROMPT_TOKENS:
+        prompt, dropped = truncate_to_tokens(prompt, MAX_PROMPT_TOKENS)
+        totals = current_prompt_stats().tokens_dropped
+        totals["prompt"] = totals.get("prompt", 0) + dropped
+
+    queued_at = time.monotonic()
+    if _copilot_slots is None:
+        return await _call_with_breaker(prompt, timeout, queued_at)
+    async with _copilot_slots:
+        return await _call_with_breaker(prompt, timeout, queued_at)
+
+
+async def _call_with_breaker(prompt: str, timeout: Optional[float], queued_at: float) -> str:
+    """Run one Copilot process under the circuit breaker and adaptive timeout."""
+    tokens = estimate_tokens(prompt)
+    process_timeout = copilot_latency.timeout_for(tokens)
+    if timeout is not None:
+        left = timeout - (time.monotonic() - queued_at)
+        if left <= 0:
+            raise RuntimeError("Copilot CLI timed out waiting for a free slot")
+        process_timeout = min(process_timeout, left)
+
+    if not copilot_breaker.allow():
+        raise CircuitOpenError("Copilot CLI circuit is open after repeated failures")
+    started = time.monotonic()
+    try:
+        result = await _run_copilot_process(prompt, process_timeout)
+    except asyncio.CancelledError:
+        copilot_breaker.abandon()
+        raise
+    except Exception:
+        copilot_breaker.record_failure()
+        raise
+    copilot_breaker.record_success()
+    copilot_latency.record(time.monotonic() - started, tokens)
+    return result
 
+
+async def _run_copilot_process(prompt: str, timeout: float = COPILOT_TIMEOUT) -> str:
+    """Run a single `copilot -p` process and return its stdout."""
     process = await asyncio.create_subprocess_exec(
         "copilot",
         "-p",
@@ -37,7 +119,7 @@ async def _invoke_copilot(prompt: str) -> str:
     )
     try:
         stdout, stderr = await asyncio.wait_for(
-            process.communicate(), timeout=COPILOT_TIMEOUT
+            process.communicate(), timeout=timeout
         )
     except asyncio.TimeoutError:
         process.kill()
@@ -105,8 +187,31 @@ def _parse_copilot_json_response(response: str) -> Optional[CodeAnalysis]:
         return None
 
 
+_ANALYSIS_TEMPLATE = """Analyze this git commit and code change. Provide a deep technical and business-oriented analysis.
+
+Commit message:
+{message}
+
+Code diff:
+{diff}
+{context}
+
+Respond with ONLY a valid JSON object (no markdown, no extra text):
+{{
+  "summary": "1-2 sentence technical summary of what changed and its impact",
+  "why": "Business/technical rationale - why was this change made, what problem does it solve",
+  "next_steps": ["actionable item 1", "actionable item 2", "actionable item 3"],
+  "importance": "low" or "medium" or "high"
+}}
+
+Importance: high = critical (security, bugs, core logic), medium = features/refactors, low = docs/style."""
+
+
 async def analyze_with_copilot(
-    code_diff: str, commit_message: str, context: Optional[str] = None
+    code_diff: str,
+    commit_message: str,
+    context: Optional[str] = None,
+    timeout: Optional[float] = None,
 ) -> CodeAnalysis:
     """
     Use GitHub Copilot CLI to analyze code changes.
@@ -118,37 +223,25 @@ async def analyze_with_copilot(
         code_diff: The git diff of the changes
         commit_message: The commit message
         context: Optional additional context
+        timeout: Seconds allowed for the Copilot call (default: COPILOT_TIMEOUT)
 
     Returns:
         CodeAnalysis object with insights
     """
-    diff_truncated = (
-        code_diff[:MAX_DIFF_CHARS] + "\n\n[ diff truncated for length ]"
-        if len(code_diff) > MAX_DIFF_CHARS
-        else code_diff
+    prompt = build_prompt(
+        _ANALYSIS_TEMPLATE,
+        [
+            PromptSection("message", commit_message, priority=0, min_tokens=150),
+            PromptSection("diff", code_diff, priority=1, min_tokens=1000, unit="hunk"),
+            PromptSection(
+                "context", f"Additional context: {context}" if context else "", priority=2
+            ),
+        ],
+        ANALYSIS_PROMPT_TOKENS,
     )
 
-    prompt = f"""Analyze this git commit and code change. Provide a deep technical and business-oriented analysis.
-
-Commit message:
-{commit_message}
-
-Code diff:
-{diff_truncated}
-{f'Additional context: {context}' if context else ''}
-
-Respond with ONLY a valid JSON object (no markdown, no extra text):
-{{
-  "summary": "1-2 sentence technical summary of what changed and its impact",
-  "why": "Business/technical rationale - why was this change made, what problem does it solve",
-  "next_steps": ["actionable item 1", "actionable item 2", "actionable item 3"],
-  "importance": "low" or "medium" or "high"
-}}
-
-Importance: high = critical (security, bugs, core logic), medium = features/refactors, low = docs/style."""
-
     try:
-        raw = await _invoke_copilot(prompt)
+        raw = await _invoke_copilot(prompt, timeout)
         analysis = _parse_copilot_json_response(raw)
         if analysis:
             return analysis
@@ -215,6 +308,7 @@ def _create_enhanced_analysis(
         why=why,
         next_steps=next_steps,
         importance=importance,
+        source="heuristic",
     )
 
 
@@ -225,8 +319,108 @@ def _create_fallback_analysis(
     return _create_enhanced_analysis(commit_message, code_diff)
 
 
+def _create_revert_analysis(
+    commit_message: str, reverted_sha: str, original: Optional[CodeAnalysis] = None
+) -> CodeAnalysis:
+    """
+    Annotate a revert without calling Copilot.
+
+    When the reverted commit's analysis is known, the revert inherits its
+    importance and summary; otherwise the commit message is used.
+    """
+    title = commit_message.split(chr(10))[0][:60]
+    if original:
+        summary = f"Reverts {reverted_sha}: {original.summary}"
+        importance = original.importance
+    else:
+        summary = f"Revert of {reverted_sha}: {title}"
+        importance = "medium"
+    return CodeAnalysis(
+        summary=summary[:200],
+        why=f"Backs out the changes introduced in {reverted_sha}.",
+        next_steps=[
+            f"Confirm why {reverted_sha} was reverted and record the reason",
+            "Track whether the reverted change should be re-landed",
+            "Check that dependent changes still work without it",
+        ],
+        importance=importance,
+        source="heuristic",
+    )
+
+
+_IMPORTANCE_LEVELS = ("low", "medium", "high")
+
+
+def _create_near_duplicate_analysis(
+    commit_message: str,
+    representative_sha: str,
+    representative: CodeAnalysis,
+    similarity: float,
+    size_ratio: float,
+) -> CodeAnalysis:
+    """
+    Derive a commit's analysis from a near-identical commit's, without Copilot.
+
+    The representative's reasoning carries over. The summary is this
+    commit's own title, and importance moves one level when this commit is
+    much smaller (a quarter or less) or much larger (four times or more).
+
+    Args:
+        commit_message: Message of this commit
+        representative_sha: SHA of the analyzed near-duplicate
+        representative: Its analysis
+        similarity: Estimated similarity of the two diffs
+        size_ratio: This commit's changed lines over the representative's
+    """
+    title = commit_message.split(chr(10))[0][:60]
+    importance = representative.importance
+    level = _IMPORTANCE_LEVELS.index(importance) if importance in _IMPORTANCE_LEVELS else 1
+    if size_ratio <= 0.25:
+        level = max(0, level - 1)
+    elif size_ratio >= 4:
+        level = min(len(_IMPORTANCE_LEVELS) - 1, level + 1)
+    return CodeAnalysis(
+        summary=f"{title} (same change as {representative_sha}: {representative.summary})"[:200],
+        why=representative.why,
+        next_steps=[
+            *representative.next_steps[:2],
+            f"Review together with {representative_sha} (~{similarity:.0%} similar diff)",
+        ],
+        importance=_IMPORTANCE_LEVELS[level],
+        source=representative.source,
+    )
+
+
+def _synthesis_prompt(
+    template: str,
+    commits_text: str,
+    analyses_text: str,
+    repo_name: str,
+    activity_text: Optional[str] = None,
+) -> str:
+    """
+    Build a repository-level prompt within SYNTHESIS_PROMPT_TOKENS.
+
+    The commit list is filled first, but the analyses always keep a share
+    of the budget; both are cut between whole entries. Activity rollups,
+    when the template has an {activity} section, go before both: they are
+    small and cover the whole range, however much of the list is cut.
+    """
+    # The repo name is substituted up front; it is not a budgeted section
+    template = template.replace("{repo_name}", repo_name.replace("{", "{{").replace("}", "}}"))
+    sections = [
+        PromptSection("commits", commits_text, priority=0, min_tokens=600, unit="block"),
+        PromptSection("analyses", analyses_text, priority=1, min_tokens=600, unit="block"),
+    ]
+    if activity_text is not None:
+        sections.insert(
+            0, PromptSection("activity", activity_text, priority=-1, min_tokens=400, unit="block")
+        )
+    return build_prompt(template, sections, SYNTHESIS_PROMPT_TOKENS)
+
+
 async def generate_diagrams_with_copilot(
-    commits_text: str, analyses_text: str, repo_name: str
+    commits_text: str, analyses_text: str, repo_name: str, timeout: Optional[float] = None
 ) -> list[str]:
     """
     Use Copilot to generate deep-dive Mermaid diagrams.
@@ -234,13 +428,14 @@ async def generate_diagrams_with_copilot(
     Returns list of Mermaid diagram strings (with ```mermaid wrapper).
     Falls back to empty list on failure.
     """
-    prompt = f"""Based on these commits and analyses for repository "{repo_name}", generate 2-4 Mermaid diagrams that provide deep technical and business insight.
+    prompt = _synthesis_prompt(
+        """Based on these commits and analyses for repository "{repo_name}", generate 2-4 Mermaid diagrams that provide deep technical and business insight.
 
 COMMITS:
-{commits_text[:4000]}
+{commits}
 
 ANALYSES:
-{analyses_text[:4000]}
+{analyses}
 
 Generate diagrams such as:
 - Architecture/component flow showing how changes affect the system
@@ -253,10 +448,14 @@ Return ONLY valid Mermaid code blocks, one per diagram. Format each as:
 ... diagram code ...
 ```
 
-No other text. Just the ```mermaid blocks."""
+No other text. Just the ```mermaid blocks.""",
+        commits_text,
+        analyses_text,
+        repo_name,
+    )
 
     try:
-        raw = await _invoke_copilot(prompt)
+        raw = await _invoke_copilot(prompt, timeout)
         cleaned = _strip_usage_stats(raw)
         diagrams = []
         for m in re.finditer(r"```mermaid\s*([\s\S]*?)```", cleaned):
@@ -269,14 +468,15 @@ No other text. Just the ```mermaid blocks."""
 
 
 async def generate_integration_insights_with_copilot(
-    commits_text: str, analyses_text: str, repo_name: str
+    commits_text: str, analyses_text: str, repo_name: str, timeout: Optional[float] = None
 ) -> str:
     """
     Use Copilot to answer integration and architecture questions.
 
     Answers: Where is integration generated? Best way to solve login? etc.
     """
-    prompt = f"""Based on these commits and analyses for "{repo_name}", provide a concise technical guide.
+    prompt = _synthesis_prompt(
+        """Based on these commits and analyses for "{repo_name}", provide a concise technical guide.
 
 Answer ONLY these questions in clean markdown (no tool output, no command output, no bullet lists of file operations):
 
@@ -286,15 +486,19 @@ Answer ONLY these questions in clean markdown (no tool output, no command output
 4. Any gotchas or conventions for adding new integrations
 
 COMMITS:
-{commits_text[:3500]}
+{commits}
 
 ANALYSES:
-{analyses_text[:3500]}
+{analyses}
 
-Respond with ONLY the guide text. Use ## headings for each topic. Prose paragraphs only."""
+Respond with ONLY the guide text. Use ## headings for each topic. Prose paragraphs only.""",
+        commits_text,
+        analyses_text,
+        repo_name,
+    )
 
     try:
-        raw = await _invoke_copilot(prompt)
+        raw = await _invoke_copilot(prompt, timeout)
         cleaned = _strip_usage_stats(raw).strip()
         # Remove Copilot session/tool output artifacts (● List, └ N files, $ command)
         cleaned = re.sub(r"●[^\n]+\n", "", cleaned)
@@ -310,29 +514,46 @@ Respond with ONLY the guide text. Use ## headings for each topic. Prose paragrap
 
 
 async def generate_narrative_with_copilot(
-    commits_text: str, analyses_text: str, repo_name: str
+    commits_text: str,
+    analyses_text: str,
+    repo_name: str,
+    timeout: Optional[float] = None,
+    activity_text: str = "",
 ) -> str:
     """
     Use Copilot to generate deeper technical and business narrative.
 
+    activity_text holds the author/week/directory rollup tables of the whole
+    range, so the narrative reflects actual activity even when the commit
+    list is truncated.
+
     Returns narrative string. Falls back to empty string on failure.
     """
-    prompt = f"""Based on these commits and analyses for repository "{repo_name}", write a 2-4 paragraph narrative that:
+    prompt = _synthesis_prompt(
+        """Based on these commits and analyses for repository "{repo_name}", write a 2-4 paragraph narrative that:
 1. Summarizes the development trajectory from a technical perspective
 2. Explains the business impact and value of these changes
 3. Highlights integration points, architectural decisions, or patterns
 4. Addresses questions like: Where are key integrations? What's the best approach for auth/login given the codebase? What technical debt or next steps matter most?
 
-COMMITS:
-{commits_text[:4000]}
+ACTIVITY (whole range; churn is lines added/removed, mix is high/medium/low importance):
+{activity}
+
+COMMITS (may be truncated):
+{commits}
 
 ANALYSES:
-{analyses_text[:4000]}
+{analyses}
 
-Write in clear, professional prose. No bullet lists. Paragraphs only."""
+Write in clear, professional prose. No bullet lists. Paragraphs only.""",
+        commits_text,
+        analyses_text,
+        repo_name,
+        activity_text,
+    )
 
     try:
-        raw = await _invoke_copilot(prompt)
+        raw = await _invoke_copilot(prompt, timeout)
         cleaned = _strip_usage_stats(raw).strip()
         return cleaned[:3000] if cleaned else ""
     except Exception:
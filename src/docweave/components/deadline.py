@@ -0,0 +1,42 @@
+"""Component: Wall-clock deadline shared by the stages of a run."""
+
+import time
+from typing import Optional
+
+# Below this many seconds a Copilot call is not worth starting
+MIN_COPILOT_SECONDS = 5.0
+
+
+class Deadline:
+    """
+    A point in time a run must finish by.
+
+    Stages ask for the time left (optionally minus a reserve kept for later
+    stages) and size their Copilot timeouts to it, falling back to
+    heuristics once too little is left.
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self, reserve: float = 0.0) -> float:
+        """Seconds left before the deadline, minus `reserve` (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic() - reserve)
+
+    def call_timeout(self, default: float, reserve: float = 0.0) -> Optional[float]:
+        """
+        Timeout for the next Copilot call.
+
+        Args:
+            default: Timeout used when the deadline is far away
+            reserve: Seconds to keep free for later stages
+
+        Returns:
+            min(default, time left), or None if too little time is left to
+            make a call worthwhile
+        """
+        left = self.remaining(reserve)
+        if left < MIN_COPILOT_SECONDS:
+            return None
+        return min(default, left)
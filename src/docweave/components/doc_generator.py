@@ -1,15 +1,42 @@
 """Component: Generate documentation from analysis results."""
 
+import asyncio
+import re
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
+from docweave.components.activity_rollups import (
+    ActivityRollups,
+    compute_rollups,
+    format_rollup_tables,
+)
+from docweave.components.asset_cache import asset_cache
+from docweave.components.commit_index import (
+    COMMITS_DIRNAME,
+    INDEX_NAME,
+    IndexEntry,
+    docs_layout,
+    merge_index,
+    shard_name,
+)
 from docweave.components.copilot_integration import (
+    COPILOT_TIMEOUT,
     generate_diagrams_with_copilot,
     generate_integration_insights_with_copilot,
     generate_narrative_with_copilot,
 )
+from docweave.components.deadline import Deadline
+from docweave.components.write_lock import docs_write_lock
 from docweave.types.models import CodeAnalysis, CommitInfo, DocumentationResult
 
+# Seconds kept free after synthesis for rendering and writing the docs
+WRITE_RESERVE_SECONDS = 2.0
+# Diagram blocks of DIAGRAMS.md, and the numbered items of NEXT_STEPS.md
+_MERMAID_BLOCK_RE = re.compile(r"```mermaid\n.*?```", re.S)
+_NUMBERED_RE = re.compile(r"^\d+\. (.*)$", re.M)
+# The SHA line of each commit section of CHANGES.md (see _commit_section)
+_SHA_LINE_RE = re.compile(r"^\*\*SHA:\*\* `([0-9a-f]{4,64})`", re.M)
+
 
 def _format_commits_for_copilot(commits: list[CommitInfo]) -> str:
     """Format commits as text for Copilot prompts."""
@@ -21,7 +48,7 @@ def _format_commits_for_copilot(commits: list[CommitInfo]) -> str:
     return "\n".join(lines)
 
 
-def _format_analyses_for_copilot(analyses: list[CodeAnalysis]) -> str:
+def _format_analyses_for_copilot(analyses: Sequence[CodeAnalysis]) -> str:
     """Format analyses as text for Copilot prompts."""
     lines = []
     for i, a in enumerate(analyses, 1):
@@ -34,60 +61,81 @@ def _format_analyses_for_copilot(analyses: list[CodeAnalysis]) -> str:
 
 async def generate_documentation(
     commits: list[CommitInfo],
-    analyses: list[CodeAnalysis],
+    analyses: Sequence[CodeAnalysis],
     repo_name: str,
     copilot_available: bool = False,
+    cochange_diagram: Optional[str] = None,
+    hotspots: str = "",
+    deadline: Optional[Deadline] = None,
 ) -> DocumentationResult:
     """
     Generate markdown documentation and Mermaid diagrams from commits and analyses.
 
     When copilot_available is True, uses GitHub Copilot CLI for deeper diagrams,
-    narrative, and integration insights.
+    narrative, and integration insights. With a deadline, the three Copilot
+    calls run concurrently within the time left and are skipped (heuristic
+    output only) when too little is left.
 
     Args:
         commits: List of commit information
         analyses: List of code analyses from Copilot
         repo_name: Name of the repository
         copilot_available: Whether to use Copilot for enhanced diagrams/narrative
+        cochange_diagram: Clustered diagram from the co-change index; replaces
+            the per-commit "Files Modified" diagram when given
+        hotspots: HOTSPOTS.md content from the churn index (optional)
+        deadline: Optional run deadline bounding the Copilot calls
 
     Returns:
         DocumentationResult with generated content
     """
-    markdown = _generate_markdown(commits, analyses, repo_name)
+    commit_documents: dict[str, str] = {}
+    commit_index: list[str] = []
+    if docs_layout() == "sharded":
+        markdown = ""
+        commit_documents, commit_index = _generate_shards(commits, analyses, repo_name)
+    else:
+        markdown = _generate_markdown(commits, analyses, repo_name)
+    rollups = compute_rollups(commits, analyses)
 
     commits_text = _format_commits_for_copilot(commits)
     analyses_text = _format_analyses_for_copilot(analyses)
+    activity_text = format_rollup_tables(rollups)
 
     # Diagrams: Copilot deep-dive when available, else heuristic baseline
-    heuristic_diagrams = _generate_mermaid_diagrams(commits, analyses)
-    if copilot_available:
+    heuristic_diagrams = _generate_mermaid_diagrams(commits, analyses, cochange_diagram)
+    copilot_diagrams: list[str] = []
+    narrative = ""
+    integration_insights = ""
+
+    if copilot_available and deadline is None:
         copilot_diagrams = await generate_diagrams_with_copilot(
             commits_text, analyses_text, repo_name
         )
-        mermaid_diagrams = (
-            copilot_diagrams + heuristic_diagrams
-            if copilot_diagrams
-            else heuristic_diagrams
-        )
-    else:
-        mermaid_diagrams = heuristic_diagrams
-
-    # Narrative: Copilot deep-dive or heuristic
-    if copilot_available:
         narrative = await generate_narrative_with_copilot(
-            commits_text, analyses_text, repo_name
+            commits_text, analyses_text, repo_name, activity_text=activity_text
         )
-    else:
-        narrative = ""
-    if not narrative:
-        narrative = _generate_narrative(commits, analyses)
-
-    # Integration insights (Copilot only)
-    integration_insights = ""
-    if copilot_available:
         integration_insights = await generate_integration_insights_with_copilot(
             commits_text, analyses_text, repo_name
         )
+    elif copilot_available:
+        timeout = deadline.call_timeout(COPILOT_TIMEOUT, reserve=WRITE_RESERVE_SECONDS)
+        if timeout is not None:
+            copilot_diagrams, narrative, integration_insights = await asyncio.gather(
+                generate_diagrams_with_copilot(commits_text, analyses_text, repo_name, timeout),
+                generate_narrative_with_copilot(
+                    commits_text, analyses_text, repo_name, timeout, activity_text
+                ),
+                generate_integration_insights_with_copilot(
+                    commits_text, analyses_text, repo_name, timeout
+                ),
+            )
+
+    mermaid_diagrams = copilot_diagrams + heuristic_diagrams
+
+    # Narrative: Copilot deep-dive or heuristic
+    if not narrative:
+        narrative = _generate_narrative(commits, analyses, rollups)
 
     next_steps = []
     for analysis in analyses:
@@ -100,11 +148,47 @@ async def generate_documentation(
         narrative=narrative,
         next_steps=next_steps,
         integration_insights=integration_insights,
+        hotspots=hotspots,
+        commit_documents=commit_documents,
+        commit_index=commit_index,
     )
 
 
+def _commit_section(commit: CommitInfo, analysis: CodeAnalysis) -> str:
+    """Markdown body of one commit's documentation (everything below its title)."""
+    md = f"**SHA:** `{commit.sha}`  \n"
+    md += f"**Author:** {commit.author}  \n"
+    md += f"**Date:** {commit.date.strftime('%Y-%m-%d %H:%M:%S')}  \n"
+    md += f"**Changes:** +{commit.additions} / -{commit.deletions} lines  \n"
+    if commit.reverts:
+        md += f"**Reverts:** `{commit.reverts}`  \n"
+    md += "\n"
+
+    md += f"### Summary\n\n{analysis.summary}\n\n"
+
+    md += f"### Why This Change?\n\n{analysis.why}\n\n"
+
+    md += f"### Importance: {analysis.importance.upper()}\n\n"
+
+    if commit.files_changed:
+        md += f"### Files Changed\n\n"
+        for file in commit.files_changed[:10]:  # Limit to 10 files
+            md += f"- `{file}`\n"
+        if len(commit.files_changed) > 10:
+            md += f"- *... and {len(commit.files_changed) - 10} more files*\n"
+        md += "\n"
+
+    if analysis.next_steps:
+        md += f"### Suggested Next Steps\n\n"
+        for step in analysis.next_steps:
+            md += f"- {step}\n"
+        md += "\n"
+
+    return md
+
+
 def _generate_markdown(
-    commits: list[CommitInfo], analyses: list[CodeAnalysis], repo_name: str
+    commits: list[CommitInfo], analyses: Sequence[CodeAnalysis], repo_name: str
 ) -> str:
     """Generate markdown documentation."""
     md = f"# {repo_name} - Recent Changes Documentation\n\n"
@@ -113,38 +197,40 @@ def _generate_markdown(
 
     for i, (commit, analysis) in enumerate(zip(commits, analyses), 1):
         md += f"## Commit {i}: {commit.message.split(chr(10))[0]}\n\n"
-        md += f"**SHA:** `{commit.sha}`  \n"
-        md += f"**Author:** {commit.author}  \n"
-        md += f"**Date:** {commit.date.strftime('%Y-%m-%d %H:%M:%S')}  \n"
-        md += f"**Changes:** +{commit.additions} / -{commit.deletions} lines  \n\n"
-
-        md += f"### Summary\n\n{analysis.summary}\n\n"
-
-        md += f"### Why This Change?\n\n{analysis.why}\n\n"
+        md += _commit_section(commit, analysis)
+        md += "---\n\n"
 
-        md += f"### Importance: {analysis.importance.upper()}\n\n"
+    return md
 
-        if commit.files_changed:
-            md += f"### Files Changed\n\n"
-            for file in commit.files_changed[:10]:  # Limit to 10 files
-                md += f"- `{file}`\n"
-            if len(commit.files_changed) > 10:
-                md += f"- *... and {len(commit.files_changed) - 10} more files*\n"
-            md += "\n"
 
-        if analysis.next_steps:
-            md += f"### Suggested Next Steps\n\n"
-            for step in analysis.next_steps:
-                md += f"- {step}\n"
-            md += "\n"
+def _generate_shards(
+    commits: list[CommitInfo], analyses: Sequence[CodeAnalysis], repo_name: str
+) -> tuple[dict[str, str], list[str]]:
+    """
+    Per-commit documents for the "sharded" layout.
 
-        md += "---\n\n"
+    A shard depends only on its own commit and analysis (no position in the
+    run), so re-documenting a commit reproduces its shard byte for byte.
 
-    return md
+    Returns:
+        (shard content by SHA, index line per shard)
+    """
+    shards: dict[str, str] = {}
+    index: list[str] = []
+    for commit, analysis in zip(commits, analyses):
+        shards[commit.sha] = (
+            f"# {commit.message.split(chr(10))[0]}\n\n"
+            f"*{repo_name} - documented by DocWeave*\n\n"
+            + _commit_section(commit, analysis)
+        )
+        index.append(IndexEntry.from_commit(commit, analysis).to_line())
+    return shards, index
 
 
 def _generate_mermaid_diagrams(
-    commits: list[CommitInfo], analyses: list[CodeAnalysis]
+    commits: list[CommitInfo],
+    analyses: Sequence[CodeAnalysis],
+    cochange_diagram: Optional[str] = None,
 ) -> list[str]:
     """Generate Mermaid diagrams."""
     diagrams = []
@@ -158,8 +244,10 @@ def _generate_mermaid_diagrams(
         timeline += "```"
         diagrams.append(timeline)
 
-    # Files changed diagram
-    if commits:
+    # Files changed diagram: co-change clusters when indexed, else per-commit files
+    if cochange_diagram:
+        diagrams.append(cochange_diagram)
+    elif commits:
         all_files = set()
         for commit in commits:
             all_files.update(commit.files_changed[:5])  # Limit per commit
@@ -187,14 +275,44 @@ def _generate_mermaid_diagrams(
     return diagrams
 
 
+def _describe_activity(rollups: ActivityRollups) -> str:
+    """Sentences on who changed what, and when, from the activity rollups."""
+    authors = rollups.by_author
+    if len(authors) == 1:
+        text = f"All of them were made by {authors[0].key}. "
+    else:
+        top = ", ".join(f"{a.key} ({a.commits})" for a in authors[:3])
+        text = f"{len(authors)} authors contributed, led by {top}. "
+
+    if len(rollups.by_week) > 1:
+        busiest = max(rollups.by_week, key=lambda w: (w.commits, w.churn))
+        text += (
+            f"Work spans {len(rollups.by_week)} weeks ({rollups.first_week} to "
+            f"{rollups.last_week}); the busiest was {busiest.key} with "
+            f"{busiest.commits} commit(s). "
+        )
+
+    dirs = [d for d in rollups.by_directory if d.churn][:3]
+    if dirs:
+        listed = ", ".join(f"{d.key} (+{d.additions}/-{d.deletions})" for d in dirs)
+        text += f"Most lines changed in {listed}. "
+        hot = max(rollups.by_directory, key=lambda d: (d.high, d.churn))
+        if hot.high:
+            text += f"{hot.key} received the most high-importance changes ({hot.high}). "
+    return text
+
+
 def _generate_narrative(
-    commits: list[CommitInfo], analyses: list[CodeAnalysis]
+    commits: list[CommitInfo],
+    analyses: Sequence[CodeAnalysis],
+    rollups: Optional[ActivityRollups] = None,
 ) -> str:
-    """Generate narrative storytelling from commits."""
+    """Generate narrative storytelling from commits and their activity rollups."""
     if not commits:
         return "No recent commits found."
 
     narrative = f"In the past {len(commits)} commit(s), this repository has seen significant activity. "
+    narrative += _describe_activity(rollups or compute_rollups(commits, analyses))
 
     # Group by importance
     high_importance = [a for a in analyses if a.importance == "high"]
@@ -223,46 +341,131 @@ def _generate_narrative(
     return narrative
 
 
+def _read_document(path: Path) -> str:
+    try:
+        return path.read_text()
+    except FileNotFoundError:
+        return ""
+
+
+def load_documentation(output_path: Path) -> Optional[DocumentationResult]:
+    """
+    The repository-level documentation saved in a docs directory.
+
+    Reads back the narrative, diagrams, next steps and hotspots written by
+    save_documentation, so they can be reused without generating them again.
+
+    Returns:
+        The documentation (without the per-commit documents), or None if the
+        directory holds no narrative
+    """
+    narrative = _read_document(output_path / "NARRATIVE.md")
+    if not narrative:
+        return None
+    return DocumentationResult(
+        markdown_content="",
+        mermaid_diagrams=_MERMAID_BLOCK_RE.findall(_read_document(output_path / "DIAGRAMS.md")),
+        # Below the "# <repo> - Development Narrative" title
+        narrative=narrative.partition("\n\n")[2].strip(),
+        next_steps=_NUMBERED_RE.findall(_read_document(output_path / "NEXT_STEPS.md")),
+        hotspots=_read_document(output_path / "HOTSPOTS.md"),
+    )
+
+
+def documented_commits(output_path: Path) -> list[str]:
+    """SHAs of the commits in a docs directory's CHANGES.md, in document order."""
+    return _SHA_LINE_RE.findall(_read_document(output_path / "CHANGES.md"))
+
+
+def _write_if_changed(path: Path, content: str) -> bool:
+    """Write a file only if its content differs; returns True if written."""
+    try:
+        if path.read_text() == content:
+            return False
+    except (FileNotFoundError, UnicodeDecodeError):
+        pass
+    path.write_text(content)
+    return True
+
+
 async def save_documentation(
     result: DocumentationResult, output_path: Path, repo_name: str
-) -> None:
+) -> list[Path]:
     """
     Save generated documentation to files.
 
+    Files whose content is unchanged are left untouched, so repeated runs
+    only rewrite (and bump the mtime of) the outputs that actually changed.
+    Writes hold docs_write_lock, so concurrent runs for the same directory
+    (CLI, hooks, web workers) replace the documents one whole run at a time.
+    In the sharded layout that means only new or changed commits/<sha>.md
+    shards are written, and commits/index.tsv is merged with the index of
+    earlier runs. A CHANGES.md left by the single layout is removed then, as
+    the shards replace it.
+
     Args:
         result: DocumentationResult to save
         output_path: Directory to save documentation (should be DocweaveDocs)
         repo_name: Name of the repository
+
+    Returns:
+        Paths of the files that were written
     """
     output_path.mkdir(parents=True, exist_ok=True)
+    documents: dict[str, str] = {}
 
-    # Save main markdown
-    main_doc = output_path / "CHANGES.md"
-    main_doc.write_text(result.markdown_content)
+    # Main markdown (or, in the sharded layout, one document per commit) and narrative
+    if result.markdown_content:
+        documents["CHANGES.md"] = result.markdown_content
+    for sha, content in result.commit_documents.items():
+        documents[shard_name(sha)] = content
+    documents["NARRATIVE.md"] = f"# {repo_name} - Development Narrative\n\n{result.narrative}\n"
 
-    # Save narrative
-    narrative_doc = output_path / "NARRATIVE.md"
-    narrative_doc.write_text(f"# {repo_name} - Development Narrative\n\n{result.narrative}\n")
-
-    # Save Mermaid diagrams
+    # Mermaid diagrams
     if result.mermaid_diagrams:
-        diagrams_doc = output_path / "DIAGRAMS.md"
-        diagrams_content = "# Diagrams\n\n" + "\n\n".join(result.mermaid_diagrams)
-        diagrams_doc.write_text(diagrams_content)
+        documents["DIAGRAMS.md"] = "# Diagrams\n\n" + "\n\n".join(result.mermaid_diagrams)
 
-    # Save next steps
+    # Next steps
     if result.next_steps:
-        next_steps_doc = output_path / "NEXT_STEPS.md"
         next_steps_content = "# Suggested Next Steps\n\n"
         for i, step in enumerate(result.next_steps, 1):
             next_steps_content += f"{i}. {step}\n"
-        next_steps_doc.write_text(next_steps_content)
+        documents["NEXT_STEPS.md"] = next_steps_content
+
+    # Hotspots report (from the churn index)
+    if result.hotspots:
+        documents["HOTSPOTS.md"] = result.hotspots
 
-    # Save integration insights (Copilot-generated)
+    # Integration insights (Copilot-generated)
     if result.integration_insights:
-        integration_doc = output_path / "INTEGRATION.md"
-        integration_doc.write_text(
+        documents["INTEGRATION.md"] = (
             f"# {repo_name} - Integration & Architecture Insights\n\n"
             f"*Generated by DocWeave with GitHub Copilot CLI*\n\n"
             f"{result.integration_insights}\n"
         )
+
+    written, removed = [], []
+    # Concurrent runs for the same repository must not interleave their files
+    async with docs_write_lock(output_path):
+        if result.commit_index:
+            changes = output_path / "CHANGES.md"
+            if changes.exists():
+                changes.unlink()
+                removed.append(changes)
+            # Merged under the lock: the index also lists shards of earlier runs
+            (output_path / COMMITS_DIRNAME).mkdir(exist_ok=True)
+            index_path = output_path / COMMITS_DIRNAME / INDEX_NAME
+            try:
+                existing = index_path.read_text()
+            except FileNotFoundError:
+                existing = ""
+            documents[f"{COMMITS_DIRNAME}/{INDEX_NAME}"] = merge_index(
+                existing, result.commit_index
+            )
+        for name, content in documents.items():
+            path = output_path / name
+            if _write_if_changed(path, content):
+                written.append(path)
+    # Served copies (see /api/docs) must not outlive the files they came from
+    asset_cache.invalidate(p.resolve() for p in [*written, *removed])
+    return written
@@ -0,0 +1,67 @@
+"""Component: Bounded caches of open handles that are closed when dropped.
+
+functools.lru_cache forgets an evicted value without closing it, which
+leaks whatever the value holds open (GitPython's persistent `git cat-file`
+processes, the batch backend's pipes). HandleCache closes a handle when it
+is evicted, when the cache is cleared and at interpreter exit.
+"""
+
+import atexit
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+H = TypeVar("H")
+
+
+class HandleCache(Generic[H]):
+    """
+    Least-recently-used cache of handles, keyed by what opened them.
+
+    Thread-safe. A handle is opened at most once per key while it stays
+    cached; callers must not close handles themselves.
+    """
+
+    def __init__(
+        self, open_handle: Callable[..., H], close_handle: Callable[[H], None], maxsize: int
+    ) -> None:
+        """
+        Args:
+            open_handle: Called with the key's arguments to open a handle
+            close_handle: Releases a handle (must not raise for a closed one)
+            maxsize: Handles kept open at most
+        """
+        self._open = open_handle
+        self._close = close_handle
+        self._maxsize = maxsize
+        self._handles: OrderedDict[Hashable, H] = OrderedDict()
+        self._lock = threading.Lock()
+        atexit.register(self.clear)
+
+    def get(self, *key: Hashable) -> H:
+        """The handle for a key, opening it (and evicting the oldest) if needed."""
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is not None:
+                self._handles.move_to_end(key)
+                return handle
+            handle = self._handles[key] = self._open(*key)
+            evicted = (
+                self._handles.popitem(last=False)[1]
+                if len(self._handles) > self._maxsize
+                else None
+            )
+        if evicted is not None:
+            self._close(evicted)
+        return handle
+
+    def clear(self) -> None:
+        """Close and forget every handle."""
+        with self._lock:
+            handles = list(self._handles.values())
+            self._handles.clear()
+        for handle in handles:
+            try:
+                self._close(handle)
+            except Exception:
+                pass  # Best effort, e.g. at interpreter exit
@@ -0,0 +1,97 @@
+"""Component: Locate and open DocWeave's persistent per-repository indexes."""
+
+import sqlite3
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+# How long an index update waits for another process updating the same index
+WRITE_WAIT_SECONDS = 120
+
+
+def state_dir(repo_path: Path, create: bool = True) -> Path:
+    """
+    Directory for DocWeave's persistent state of a repository.
+
+    Lives inside the git directory (`.git/docweave/`, or `<repo>/docweave/`
+    for bare repositories), so indexes never show up as working-tree changes
+    and are shared by all worktrees of the repository.
+
+    Args:
+        create: Create the directory if it does not exist yet
+
+    Raises:
+        ValueError: If repo_path is not inside a git repository
+    """
+    result = subprocess.run(
+        ["git", "-C", str(repo_path), "rev-parse", "--git-common-dir"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise ValueError(f"{repo_path} is not a git repository")
+    git_dir = Path(result.stdout.strip())
+    if not git_dir.is_absolute():
+        git_dir = (repo_path / git_dir).resolve()
+    path = git_dir / "docweave"
+    if create:
+        path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def open_index_db(path: Path) -> sqlite3.Connection:
+    """Open (creating if needed) an index database tuned for bulk updates."""
+    conn = sqlite3.connect(str(path))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    return conn
+
+
+def open_index_db_read_only(path: Path) -> sqlite3.Connection:
+    """
+    Open an existing index database for reading only; nothing is created.
+
+    Raises:
+        FileNotFoundError: If the database does not exist
+    """
+    if not path.is_file():
+        raise FileNotFoundError(f"No index at {path}")
+    return sqlite3.connect(f"{path.as_uri()}?mode=ro", uri=True)
+
+
+def begin_write(conn: sqlite3.Connection, wait: float = WRITE_WAIT_SECONDS) -> bool:
+    """
+    Start a write transaction now, rather than at the first write.
+
+    Only one connection can hold it. An update that reads what it last
+    indexed after this cannot interleave with another updater of the same
+    index: it waits for the other to commit, then sees what it recorded.
+
+    Args:
+        wait: Seconds to wait for another writer
+
+    Returns:
+        False if another writer still held the database after `wait`
+    """
+    conn.execute(f"PRAGMA busy_timeout = {int(wait * 1000)}")
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def get_meta(conn: sqlite3.Connection, key: str) -> Optional[str]:
+    """Read a value from an index's meta table."""
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def set_meta(conn: sqlite3.Connection, key: str, value: str) -> None:
+    """Write a value to an index's meta table."""
+    conn.execute(
+        "INSERT INTO meta (key, value) VALUES (?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (key, value),
+    )
@@ -0,0 +1,298 @@
+"""Component: Memory budget and per-stage memory sampling for large runs.
+
+With a budget (--max-memory / $DOCWEAVE_MAX_MEMORY), the pipeline samples
+the resident set size (RSS) as it goes and degrades before the process
+runs out: past SOFT_PRESSURE of the budget, diffs get smaller budgets and
+finished analyses are spilled to disk; past HARD_PRESSURE, one commit is
+analyzed at a time and nothing is prefetched.
+
+Every sample is recorded per pipeline stage. With tracemalloc running
+(`docweave analyze --memory-profile`), samples also record Python
+allocations, and the top allocation sites are captured each time the
+traced total reaches a new high.
+"""
+
+import os
+import pickle
+import re
+import sys
+import tempfile
+import tracemalloc
+from array import array
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional, Sequence, TypeVar, Union, overload
+
+from docweave.components.run_settings import current_settings
+
+MAX_MEMORY_ENV = "DOCWEAVE_MAX_MEMORY"
+# Shares of the budget at which runs degrade, then go one commit at a time
+SOFT_PRESSURE = 0.6
+HARD_PRESSURE = 0.8
+# Allocation sites listed in a profile
+TOP_SITES = 10
+# A new top-sites snapshot is taken when traced memory grows by this factor
+# (snapshots walk every traced block, so they are kept rare)
+SNAPSHOT_GROWTH = 1.25
+_MIN_SNAPSHOT_BYTES = 1 << 20
+_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmg]?)i?b?\s*$", re.IGNORECASE)
+_UNITS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30}
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+T = TypeVar("T")
+
+
+def parse_size(text: str) -> int:
+    """
+    Parse a memory size: bytes, or a number with a K, M or G suffix ("512M").
+
+    Raises:
+        ValueError: If the text is not a positive size
+    """
+    match = _SIZE_RE.match(text)
+    size = int(float(match.group(1)) * _UNITS[match.group(2).lower()]) if match else 0
+    if size <= 0:
+        raise ValueError(f"Invalid memory size: {text} (e.g. 512M or 2G)")
+    return size
+
+
+def max_memory(value: Optional[str] = None) -> Optional[int]:
+    """
+    Resolve the memory budget in bytes.
+
+    Args:
+        value: Explicit size; defaults to --max-memory, then $DOCWEAVE_MAX_MEMORY
+
+    Returns:
+        The budget, or None when memory is not limited
+
+    Raises:
+        ValueError: If the size is invalid
+    """
+    value = value or current_settings().max_memory or os.environ.get(MAX_MEMORY_ENV)
+    return parse_size(value) if value else None
+
+
+def peak_rss() -> Optional[int]:
+    """Highest resident set size of this process so far, in bytes."""
+    # VmHWM where /proc has it: on Linux ru_maxrss survives fork and exec,
+    # so a child started by a larger process would report that one's peak
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (the peak where unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return peak_rss()
+
+
+def format_size(size: float) -> str:
+    """Human-readable size ("12.5 MiB")."""
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.2f} GiB"
+
+
+def _site_name(filename: str) -> str:
+    """Short form of a source path: from the package directory on, or the last two parts."""
+    parts = filename.replace("\\", "/").split("/")
+    for anchor, skip in (("docweave", 0), ("site-packages", 1)):
+        if anchor in parts:
+            start = len(parts) - 1 - parts[::-1].index(anchor)
+            return "/".join(parts[start + skip :])
+    return "/".join(parts[-2:])
+
+
+def top_allocation_sites(limit: int = TOP_SITES) -> list[str]:
+    """The source lines holding the most traced memory, largest first."""
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ]
+    )
+    return [
+        f"{_site_name(stat.traceback[0].filename)}:{stat.traceback[0].lineno} "
+        f"{format_size(stat.size)} in {stat.count} block(s)"
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+
+
+@dataclass
+class StageMemory:
+    """Memory seen while one pipeline stage ran."""
+
+    samples: int = 0
+    peak_rss: int = 0  # bytes
+    peak_traced: int = 0  # bytes allocated by Python (with tracemalloc running)
+
+
+@dataclass
+class MemoryStats:
+    """Memory samples and degradations of one run, for reporting after it."""
+
+    peak_rss: int = 0
+    smaller_diffs: int = 0  # Diffs fetched with a reduced budget
+    spilled: int = 0  # Analyses kept on disk instead of in memory
+    serialized: int = 0  # Analyses that waited for others to finish first
+    stages: dict[str, StageMemory] = field(default_factory=dict)
+    top_sites: list[str] = field(default_factory=list)  # At the highest traced total
+    _snapshot_at: int = 0
+
+    def sample(self, stage: str) -> int:
+        """
+        Record the memory in use at a point of a stage.
+
+        Returns:
+            Current RSS in bytes (0 where it cannot be read)
+        """
+        rss = current_rss() or 0
+        entry = self.stages.setdefault(stage, StageMemory())
+        entry.samples += 1
+        entry.peak_rss = max(entry.peak_rss, rss)
+        self.peak_rss = max(self.peak_rss, rss)
+        if tracemalloc.is_tracing():
+            traced = tracemalloc.get_traced_memory()[0]
+            entry.peak_traced = max(entry.peak_traced, traced)
+            if traced >= max(self._snapshot_at * SNAPSHOT_GROWTH, _MIN_SNAPSHOT_BYTES):
+                self._snapshot_at = traced
+                self.top_sites = top_allocation_sites()
+        return rss
+
+    def report(self, budget: Optional[int] = None, detail: bool = True) -> list[str]:
+        """
+        Lines describing peak memory and degradations, then (with detail)
+        per-stage peaks and the top allocation sites.
+        """
+        peak = max(self.peak_rss, peak_rss() or 0)
+        lines = [
+            f"Peak RSS {format_size(peak)}"
+            + (f" of a {format_size(budget)} budget" if budget else "")
+        ]
+        degraded = [
+            f"{count} {what}"
+            for count, what in (
+                (self.smaller_diffs, "smaller diff(s)"),
+                (self.spilled, "analyses spilled to disk"),
+                (self.serialized, "analyses run one at a time"),
+            )
+            if count
+        ]
+        if degraded:
+            lines.append("Degraded to stay in budget: " + ", ".join(degraded))
+        if not detail:
+            return lines
+        for stage, entry in self.stages.items():
+            traced = f", Python {format_size(entry.peak_traced)}" if entry.peak_traced else ""
+            lines.append(f"  {stage}: RSS {format_size(entry.peak_rss)}{traced}")
+        if self.top_sites:
+            lines.append("Top allocation sites:")
+            lines += [f"  {site}" for site in self.top_sites]
+        return lines
+
+
+# Samples of the run in progress, shared with the tasks it starts
+_run_memory_stats: ContextVar[Optional[MemoryStats]] = ContextVar(
+    "docweave_memory_stats", default=None
+)
+
+
+def start_memory_stats() -> MemoryStats:
+    """Start fresh memory samples for the run beginning in the current context."""
+    stats = MemoryStats()
+    _run_memory_stats.set(stats)
+    return stats
+
+
+def current_memory_stats() -> MemoryStats:
+    """Memory samples of the run in progress, started on first use outside a run."""
+    return _run_memory_stats.get() or start_memory_stats()
+
+
+class SpillList(Sequence[T]):
+    """
+    A list whose items can be moved to a temporary file.
+
+    Until spill() is called it behaves as an ordinary list. Afterwards every
+    item (existing and newly set) is pickled to an anonymous temporary file
+    and read back on access, so only an offset per item stays in memory.
+    It is a read-only Sequence (indexing, slicing, len, iteration) that can
+    also be appended to and assigned by index.
+    """
+
+    def __init__(self) -> None:
+        self._items: list[Optional[T]] = []
+        self._offsets = array("q")  # -1 while the item is in memory
+        self._file: Optional[Any] = None
+
+    @property
+    def spilled(self) -> bool:
+        return self._file is not None
+
+    def spill(self) -> int:
+        """Move every item to disk; returns the number of items moved."""
+        if self._file is None:
+            self._file = tempfile.TemporaryFile()
+        moved = 0
+        for i, item in enumerate(self._items):
+            if self._offsets[i] < 0 and item is not None:
+                self._write(i, item)
+                moved += 1
+        return moved
+
+    def _write(self, index: int, item: T) -> None:
+        self._file.seek(0, os.SEEK_END)
+        self._offsets[index] = self._file.tell()
+        pickle.dump(item, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._items[index] = None
+
+    def append(self, item: T) -> None:
+        self._items.append(None)
+        self._offsets.append(-1)
+        self[len(self._items) - 1] = item
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __setitem__(self, index: int, item: T) -> None:
+        self._items[index] = item
+        self._offsets[index] = -1
+        if self._file is not None and item is not None:
+            self._write(index, item)
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[T]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, list[T]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._items)))]
+        offset = self._offsets[index]
+        if offset < 0:
+            return self._items[index]
+        self._file.seek(offset)
+        return pickle.load(self._file)
+
+    def __iter__(self) -> Iterator[T]:
+        for i in range(len(self._items)):
+            yield self[i]
@@ -0,0 +1,161 @@
+"""Component: Near-duplicate commit detection with MinHash and LSH.
+
+Codemods and large refactors land as many commits whose diffs are almost
+the same (one rename applied package by package). Patch ids only catch
+exact copies, so each commit's changed lines are reduced to a set of
+token shingles, summarized by a MinHash signature, and bucketed with
+locality-sensitive hashing: commits sharing a band bucket are compared by
+signature, and those above a similarity threshold share one analysis.
+"""
+
+import hashlib
+import os
+import random
+import re
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+from docweave.components.run_settings import current_settings
+
+SIMILARITY_ENV = "DOCWEAVE_SIMILARITY_THRESHOLD"
+# Estimated Jaccard similarity of changed-line shingles above which commits
+# share an analysis
+DEFAULT_SIMILARITY = 0.7
+# Tokens per shingle (shingles never span lines)
+SHINGLE_SIZE = 3
+# Diffs with fewer distinct shingles are too small to call near-duplicates
+MIN_SHINGLES = 8
+# Signature length, split into LSH bands of BAND_ROWS rows. With 16 bands
+# of 4, pairs at 0.7 similarity share a bucket with ~99% probability.
+NUM_PERM = 64
+BAND_ROWS = 4
+
+# One 64-bit hash per shingle, XORed with a random mask per signature slot:
+# as accurate as independent hash functions here, and min(map(...)) keeps
+# the inner loop in C
+_MASKS = [random.Random(0x5EED + i).getrandbits(64) for i in range(NUM_PERM)]
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def similarity_threshold(value: Optional[str] = None) -> Optional[float]:
+    """
+    Resolve the near-duplicate threshold.
+
+    Args:
+        value: Explicit threshold, or "off"; defaults to --similarity-threshold,
+            $DOCWEAVE_SIMILARITY_THRESHOLD, then DEFAULT_SIMILARITY
+
+    Returns:
+        The threshold, or None when clustering is off
+
+    Raises:
+        ValueError: If the value is not "off" or a number in (0, 1]
+    """
+    value = value or current_settings().similarity_threshold or os.environ.get(SIMILARITY_ENV)
+    if not value:
+        return DEFAULT_SIMILARITY
+    if value.lower() == "off":
+        return None
+    try:
+        threshold = float(value)
+    except ValueError:
+        threshold = -1.0
+    if not 0 < threshold <= 1:
+        raise ValueError(f"Invalid similarity threshold: {value} (a number in (0, 1], or off)")
+    return threshold
+
+
+def diff_shingles(diff: str) -> set[str]:
+    """
+    Shingles of the lines a diff adds and removes.
+
+    File headers, hunk headers and context lines are ignored. Tokens are
+    lowercased and numbers replaced by 0, so the same edit in different
+    files (or with different literals) gives the same shingles; unrelated
+    diffs share almost none.
+    """
+    shingles: set[str] = set()
+    for line in diff.splitlines():
+        if line[:1] in ("+", "-") and not line.startswith(("+++", "---")):
+            tokens = [line[0]]
+            tokens += ["0" if t.isdigit() else t for t in _TOKEN_RE.findall(line[1:].lower())]
+            shingles.update(
+                " ".join(tokens[i : i + SHINGLE_SIZE])
+                for i in range(max(1, len(tokens) - SHINGLE_SIZE + 1))
+            )
+    return shingles
+
+
+def minhash(shingles: set[str]) -> Optional[tuple[int, ...]]:
+    """MinHash signature of a shingle set; None if it has fewer than MIN_SHINGLES."""
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big")
+        for s in shingles
+    ]
+    return tuple(min(map(mask.__xor__, hashes)) for mask in _MASKS)
+
+
+def estimated_similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the sets behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+@dataclass
+class ClusterStats:
+    """Totals of near-duplicate clustering in one run, for reporting after it."""
+
+    commits: int = 0  # Commits with a signature
+    clusters: int = 0  # Clusters with at least one near-duplicate member
+    members: int = 0  # Commits that reused a representative's analysis
+
+    def record(self, index: "NearDuplicateIndex") -> None:
+        """Add the clusters of an index to the totals."""
+        self.commits += index.signatures
+        self.clusters += len({rep for rep, _ in index.representative_of.values()})
+        self.members += len(index.representative_of)
+
+
+class NearDuplicateIndex:
+    """
+    Incremental clustering of near-duplicate signatures around representatives.
+
+    Signatures are added one at a time, in the order their commits are
+    analyzed. One that is at least `threshold` similar to an earlier
+    representative sharing an LSH bucket joins the earliest such
+    representative; any other becomes a representative itself. Members are
+    therefore always directly similar to their representative, and only
+    representatives are bucketed.
+    """
+
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+        self.signatures = 0
+        # {member key: (representative key, estimated similarity)}
+        self.representative_of: dict[Hashable, tuple[Hashable, float]] = {}
+        self._order: dict[Hashable, int] = {}
+        self._reps: dict[Hashable, tuple[int, ...]] = {}
+        self._buckets: dict[tuple, list[Hashable]] = {}
+
+    def add(self, key: Hashable, signature: tuple[int, ...]) -> Optional[tuple[Hashable, float]]:
+        """
+        Cluster one signature.
+
+        Returns:
+            (representative key, estimated similarity) if the signature joins
+            a cluster; None if it becomes a representative
+        """
+        self.signatures += 1
+        bands = [(b, signature[b : b + BAND_ROWS]) for b in range(0, NUM_PERM, BAND_ROWS)]
+        candidates = {rep for b in bands for rep in self._buckets.get(b, ())}
+        for rep in sorted(candidates, key=self._order.__getitem__):
+            similarity = estimated_similarity(signature, self._reps[rep])
+            if similarity >= self.threshold:
+                self.representative_of[key] = (rep, similarity)
+                return rep, similarity
+        self._order[key] = len(self._order)
+        self._reps[key] = signature
+        for b in bands:
+            self._buckets.setdefault(b, []).append(key)
+        return None
@@ -0,0 +1,230 @@
+"""Component: Token-aware prompt budgeting for Copilot prompts."""
+
+import math
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Average UTF-8 bytes per token for a mix of code and English prose. Counting
+# bytes rather than characters makes non-ASCII text (which tokenizes less
+# efficiently) weigh more, and len(str.encode()) runs in C.
+BYTES_PER_TOKEN = 3.5
+# Tokens set aside for the "[... omitted ...]" marker of a truncated section
+_MARKER_TOKENS = 16
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast, slightly pessimistic estimate of the token count of text."""
+    if not text:
+        return 0
+    return math.ceil(len(text.encode("utf-8")) / BYTES_PER_TOKEN)
+
+
+def chars_for_tokens(tokens: int) -> int:
+    """Approximate number of (ASCII) characters that fit in a token budget."""
+    return int(tokens * BYTES_PER_TOKEN)
+
+
+@dataclass
+class PromptSection:
+    """One variable part of a prompt, e.g. the commit message or the diff."""
+
+    name: str
+    text: str
+    # Lower numbers are filled first once every section has its floor
+    priority: int = 0
+    # Tokens reserved for this section before budget goes to higher priorities
+    min_tokens: int = 0
+    # Boundary to truncate at: "line", "block" (an unindented line and the
+    # indented lines under it) or "hunk" (a diff header or @@ hunk)
+    unit: str = "line"
+
+
+@dataclass
+class PromptFit:
+    """Sections fitted into a budget, with what had to be left out."""
+
+    texts: dict[str, str]
+    tokens: int
+    # Estimated tokens dropped per section (only sections that were cut)
+    dropped: dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class PromptStats:
+    """Running totals of prompt sizes, for reporting after a run."""
+
+    prompts: int = 0
+    tokens_sent: int = 0
+    tokens_dropped: dict[str, int] = field(default_factory=dict)
+
+    def record(self, fit: PromptFit, overhead_tokens: int = 0) -> None:
+        """Add one built prompt to the totals."""
+        self.prompts += 1
+        self.tokens_sent += fit.tokens + overhead_tokens
+        for name, tokens in fit.dropped.items():
+            self.tokens_dropped[name] = self.tokens_dropped.get(name, 0) + tokens
+
+    @property
+    def total_dropped(self) -> int:
+        """Tokens dropped across all sections."""
+        return sum(self.tokens_dropped.values())
+
+
+# Totals of the run in progress; the pipeline's tasks inherit them from the
+# context the run was started in, so concurrent runs keep separate totals
+_run_prompt_stats: ContextVar[Optional[PromptStats]] = ContextVar(
+    "docweave_prompt_stats", default=None
+)
+
+
+def start_prompt_stats() -> PromptStats:
+    """Start fresh prompt totals for the run beginning in the current context."""
+    stats = PromptStats()
+    _run_prompt_stats.set(stats)
+    return stats
+
+
+def current_prompt_stats() -> PromptStats:
+    """Prompt totals of the run in progress, started on first use outside a run."""
+    return _run_prompt_stats.get() or start_prompt_stats()
+
+
+def _split_units(text: str, unit: str) -> list[str]:
+    """Split text into the pieces it may be truncated between."""
+    lines = text.splitlines(keepends=True)
+    if unit == "line":
+        return lines
+    units: list[str] = []
+    for line in lines:
+        if unit == "hunk":
+            starts_unit = line.startswith(("diff --git", "@@", "[excluded:"))
+        else:
+            starts_unit = bool(line.strip()) and not line[0].isspace()
+        if starts_unit or not units:
+            units.append(line)
+        else:
+            units[-1] += line
+    return units
+
+
+def truncate_to_tokens(text: str, max_tokens: int, unit: str = "line") -> tuple[str, int]:
+    """
+    Keep the leading whole units of text that fit in max_tokens.
+
+    Leftover budget goes to the leading lines of the first unit that does
+    not fit (only a single oversized line is ever cut mid-line). A marker
+    line records how much was omitted.
+
+    Args:
+        text: Text to truncate
+        max_tokens: Token budget, including the omission marker
+        unit: Truncation boundary ("line", "block" or "hunk")
+
+    Returns:
+        (truncated text, estimated tokens dropped)
+    """
+    total = estimate_tokens(text)
+    if total <= max_tokens:
+        return text, 0
+    budget = max(0, max_tokens - _MARKER_TOKENS)
+    units = _split_units(text, unit)
+    kept: list[str] = []
+    used = 0
+    for piece in units:
+        cost = estimate_tokens(piece)
+        if used + cost > budget:
+            break
+        kept.append(piece)
+        used += cost
+    omitted_units = len(units) - len(kept)
+    if omitted_units and budget > used:
+        # Spend what is left on the leading whole lines of the first unit
+        # that did not fit (or, for one huge line, on its first characters)
+        overflow = units[len(kept)]
+        head = ""
+        for line in overflow.splitlines(keepends=True):
+            if estimate_tokens(head + line) > budget - used:
+                break
+            head += line
+        if not head and not kept:
+            head = overflow[: chars_for_tokens(budget)].rstrip() + "\n"
+        if head:
+            kept.append(head)
+            used += estimate_tokens(head)
+    dropped = max(0, total - used)
+    body = "".join(kept)
+    if body and not body.endswith("\n"):
+        body += "\n"
+    plural = "s" if omitted_units != 1 else ""
+    body += f"[... {omitted_units} {unit}{plural} omitted, ~{dropped} tokens ...]"
+    return body, dropped
+
+
+def fit_sections(sections: list[PromptSection], budget_tokens: int) -> PromptFit:
+    """
+    Allocate a token budget across prompt sections and truncate them to fit.
+
+    Every section first gets up to its min_tokens floor; the rest of the
+    budget is handed out in priority order, so a long diff cannot crowd out
+    the commit message and a long commit list still leaves room for the
+    analyses. Sections are cut at unit or line boundaries.
+
+    Args:
+        sections: Sections to fit
+        budget_tokens: Tokens available for all sections together
+
+    Returns:
+        PromptFit with the fitted text of each section
+    """
+    needs = {s.name: estimate_tokens(s.text) for s in sections}
+    if sum(needs.values()) <= budget_tokens:
+        return PromptFit(texts={s.name: s.text for s in sections}, tokens=sum(needs.values()))
+
+    ordered = sorted(sections, key=lambda s: s.priority)
+    grants: dict[str, int] = {}
+    remaining = max(0, budget_tokens)
+    for s in ordered:
+        grants[s.name] = min(needs[s.name], s.min_tokens, remaining)
+        remaining -= grants[s.name]
+    for s in ordered:
+        extra = min(needs[s.name] - grants[s.name], remaining)
+        grants[s.name] += extra
+        remaining -= extra
+
+    texts: dict[str, str] = {}
+    dropped: dict[str, int] = {}
+    tokens = 0
+    for s in sections:
+        text, lost = truncate_to_tokens(s.text, grants[s.name], s.unit)
+        texts[s.name] = text
+        tokens += estimate_tokens(text)
+        if lost:
+            dropped[s.name] = lost
+    return PromptFit(texts=texts, tokens=tokens, dropped=dropped)
+
+
+def build_prompt(
+    template: str,
+    sections: list[PromptSection],
+    budget_tokens: int,
+    stats: Optional[PromptStats] = None,
+) -> str:
+    """
+    Fill a str.format template with sections fitted to a total token budget.
+
+    The template's own text is counted against the budget first.
+
+    Args:
+        template: Prompt template with a {name} placeholder per section
+        sections: Sections to place into the template
+        budget_tokens: Token budget for the whole prompt
+        stats: Totals to record the prompt in (default: the current run's)
+
+    Returns:
+        The assembled prompt
+    """
+    overhead = estimate_tokens(template.format(**{s.name: "" for s in sections}))
+    fit = fit_sections(sections, budget_tokens - overhead)
+    (stats or current_prompt_stats()).record(fit, overhead)
+    return template.format(**fit.texts)
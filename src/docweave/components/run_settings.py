@@ -0,0 +1,44 @@
+"""Component: Settings given as `docweave` group options.
+
+--git-backend, --docs-layout, --similarity-threshold, --max-memory and
+--no-search-index hold for the one command they precede. cli() keeps them
+on the click context, which makes them current (use_settings) until the
+command finishes; each setting's resolver reads them before its
+environment variable. They live in a context variable, so the command's
+asyncio tasks and hook workers forked from it see them, and later
+in-process invocations start clean.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+
+@dataclass(frozen=True)
+class RunSettings:
+    """Group options of one command; None leaves the environment or default in force."""
+
+    git_backend: Optional[str] = None
+    docs_layout: Optional[str] = None
+    similarity_threshold: Optional[str] = None
+    max_memory: Optional[str] = None
+    search_index: Optional[bool] = None
+
+
+_settings: ContextVar[RunSettings] = ContextVar("docweave_settings", default=RunSettings())
+
+
+def current_settings() -> RunSettings:
+    """The settings of the command in progress (all None outside one)."""
+    return _settings.get()
+
+
+@contextmanager
+def use_settings(settings: RunSettings) -> Iterator[RunSettings]:
+    """Make settings current until the block exits."""
+    token = _settings.set(settings)
+    try:
+        yield settings
+    finally:
+        _settings.reset(token)
@@ -0,0 +1,405 @@
+"""Component: Shared state for the web service (jobs and cache entries).
+
+The store is what lets uvicorn run with `--workers N`, or several replicas
+share one host: any worker can report the status of a job another worker
+is running. `DOCWEAVE_STATE_URL` picks the backend:
+
+* `sqlite:///path/to/state.sqlite` (default: ~/.cache/docweave/state.sqlite)
+* `memory://` for a single process (tests, embedding)
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Optional, Protocol
+
+from docweave.types.models import JobState
+
+STATE_URL_ENV = "DOCWEAVE_STATE_URL"
+DEFAULT_STATE_PATH = Path.home() / ".cache" / "docweave" / "state.sqlite"
+# How long a writer waits for another worker's write to finish
+BUSY_TIMEOUT_MS = 5000
+# Finished jobs and expired cache entries older than this are purged
+RETENTION_SECONDS = 7 * 24 * 3600
+# A worker touches each job it runs this often, even while waiting on Copilot
+HEARTBEAT_SECONDS = 30
+# A queued or running job without a heartbeat for this long has lost its
+# worker (crash, restart) and is marked failed
+STALE_JOB_SECONDS = 4 * HEARTBEAT_SECONDS
+_ACTIVE = ("queued", "running")
+
+_JOB_FIELDS = ("status", "stage", "message", "progress", "result", "error")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    stage TEXT NOT NULL DEFAULT '',
+    message TEXT NOT NULL DEFAULT '',
+    progress REAL NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    owner TEXT NOT NULL DEFAULT ''
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL
+) WITHOUT ROWID;
+"""
+
+
+class StateStore(Protocol):
+    """Job status and cache entries shared by every web worker."""
+
+    def create_job(self, stage: str = "", message: str = "") -> JobState:
+        """Register a new queued job and return it."""
+        ...
+
+    def update_job(self, job_id: str, **fields: Any) -> None:
+        """
+        Update status, stage, message, progress, result or error of a job.
+
+        Every update (with no fields: a heartbeat) records that the job's
+        worker is alive.
+        """
+        ...
+
+    def get_job(self, job_id: str) -> Optional[JobState]:
+        """Current state of a job (stale ones are failed first), or None if unknown."""
+        ...
+
+    def fail_stale_jobs(self, stale_after: float = STALE_JOB_SECONDS) -> int:
+        """Mark queued or running jobs without a recent heartbeat failed; returns how many."""
+        ...
+
+    def create_or_join_job(
+        self, key: str, stage: str = "", message: str = "", ttl: Optional[float] = None
+    ) -> tuple[JobState, bool]:
+        """
+        Register a new job under key, unless a queued or running one holds it.
+
+        Atomic across workers: of several concurrent callers with the same
+        key exactly one creates the job, and the others get that job.
+
+        Returns:
+            (job, created)
+        """
+        ...
+
+    def cache_get(self, key: str) -> Optional[Any]:
+        """A JSON-serializable cached value, or None if absent or expired."""
+        ...
+
+    def cache_set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a JSON-serializable value, optionally expiring after ttl seconds."""
+        ...
+
+    def purge(self, older_than: float = RETENTION_SECONDS) -> int:
+        """Drop finished jobs and expired entries; returns rows removed."""
+        ...
+
+
+def worker_id() -> str:
+    """Identity recorded as the owner of the jobs this process runs."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _new_job(stage: str, message: str) -> JobState:
+    now = time.time()
+    return JobState(
+        job_id=uuid.uuid4().hex,
+        status="queued",
+        stage=stage,
+        message=message,
+        created_at=now,
+        updated_at=now,
+        owner=worker_id(),
+    )
+
+
+def _stale_error(owner: str) -> str:
+    return f"Worker {owner or 'unknown'} stopped while running this job"
+
+
+def _check_fields(fields: dict) -> None:
+    unknown = set(fields) - set(_JOB_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown job field(s): {', '.join(sorted(unknown))}")
+
+
+class MemoryStateStore:
+    """Process-local store; state is lost on restart and not shared."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._jobs: dict[str, JobState] = {}
+        self._cache: dict[str, tuple[Any, Optional[float]]] = {}
+
+    def create_job(self, stage: str = "", message: str = "") -> JobState:
+        job = _new_job(stage, message)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        return JobState(**vars(job))
+
+    def update_job(self, job_id: str, **fields: Any) -> None:
+        _check_fields(fields)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            for name, value in fields.items():
+                setattr(job, name, value)
+            job.updated_at = time.time()
+
+    def get_job(self, job_id: str) -> Optional[JobState]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            self._fail_if_stale(job, time.time() - STALE_JOB_SECONDS)
+            return JobState(**vars(job))
+
+    def fail_stale_jobs(self, stale_after: float = STALE_JOB_SECONDS) -> int:
+        cutoff = time.time() - stale_after
+        with self._lock:
+            return sum(self._fail_if_stale(job, cutoff) for job in self._jobs.values())
+
+    @staticmethod
+    def _fail_if_stale(job: JobState, cutoff: float) -> bool:
+        if job.status not in _ACTIVE or job.updated_at >= cutoff:
+            return False
+        job.status, job.stage, job.error = "failed", "error", _stale_error(job.owner)
+        job.updated_at = time.time()
+        return True
+
+    def create_or_join_job(
+        self, key: str, stage: str = "", message: str = "", ttl: Optional[float] = None
+    ) -> tuple[JobState, bool]:
+        now = time.time()
+        with self._lock:
+            job_id, expires_at = self._cache.get(key, (None, None))
+            holder = self._jobs.get(job_id) if expires_at is None or expires_at >= now else None
+            if holder is not None:
+                self._fail_if_stale(holder, now - STALE_JOB_SECONDS)
+                if holder.status in _ACTIVE:
+                    return JobState(**vars(holder)), False
+            job = _new_job(stage, message)
+            self._jobs[job.job_id] = job
+            self._cache[key] = (job.job_id, now + ttl if ttl is not None else None)
+            return JobState(**vars(job)), True
+
+    def cache_get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is None or (entry[1] is not None and entry[1] < time.time()):
+            return None
+        return entry[0]
+
+    def cache_set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._cache[key] = (value, expires_at)
+
+    def purge(self, older_than: float = RETENTION_SECONDS) -> int:
+        now = time.time()
+        with self._lock:
+            jobs = [
+                job_id
+                for job_id, job in self._jobs.items()
+                if job.status in ("succeeded", "failed") and job.updated_at < now - older_than
+            ]
+            keys = [k for k, (_, exp) in self._cache.items() if exp is not None and exp < now]
+            for job_id in jobs:
+                del self._jobs[job_id]
+            for key in keys:
+                del self._cache[key]
+        return len(jobs) + len(keys)
+
+
+class SQLiteStateStore:
+    """
+    Store in a local SQLite database in WAL mode.
+
+    WAL lets status polls read while a worker writes, and every write is a
+    single short statement, so concurrent writers from several processes
+    only queue briefly on the write lock (up to BUSY_TIMEOUT_MS). Each
+    thread gets its own connection.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        # Stores created before jobs had owners
+        if "owner" not in {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}:
+            conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT NOT NULL DEFAULT ''")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit: each statement is its own (short) transaction
+            conn = sqlite3.connect(
+                str(self.db_path), timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+        return conn
+
+    def create_job(self, stage: str = "", message: str = "") -> JobState:
+        job = _new_job(stage, message)
+        self._insert_job(job)
+        return job
+
+    def _insert_job(self, job: JobState) -> None:
+        self._conn().execute(
+            "INSERT INTO jobs (job_id, status, stage, message, progress, created_at, "
+            "updated_at, owner) VALUES (?, ?, ?, ?, 0, ?, ?, ?)",
+            (
+                job.job_id,
+                job.status,
+                job.stage,
+                job.message,
+                job.created_at,
+                job.updated_at,
+                job.owner,
+            ),
+        )
+
+    def update_job(self, job_id: str, **fields: Any) -> None:
+        _check_fields(fields)
+        if "result" in fields and fields["result"] is not None:
+            fields["result"] = json.dumps(fields["result"])
+        assignments = "".join(f"{name} = ?, " for name in fields)
+        self._conn().execute(
+            f"UPDATE jobs SET {assignments}updated_at = ? WHERE job_id = ?",
+            (*fields.values(), time.time(), job_id),
+        )
+
+    def get_job(self, job_id: str) -> Optional[JobState]:
+        self._fail_stale(STALE_JOB_SECONDS, job_id)
+        row = self._conn().execute(
+            "SELECT job_id, status, stage, message, progress, result, error, "
+            "created_at, updated_at, owner FROM jobs WHERE job_id = ?",
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        job = JobState(*row)
+        job.result = json.loads(job.result) if job.result else None
+        return job
+
+    def fail_stale_jobs(self, stale_after: float = STALE_JOB_SECONDS) -> int:
+        return self._fail_stale(stale_after)
+
+    def _fail_stale(self, stale_after: float, job_id: Optional[str] = None) -> int:
+        conn = self._conn()
+        stale = "status IN ('queued', 'running') AND updated_at < ?"
+        cutoff = time.time() - stale_after
+        if job_id is None:
+            rows = conn.execute(f"SELECT job_id, owner FROM jobs WHERE {stale}", (cutoff,))
+        else:
+            rows = conn.execute(
+                f"SELECT job_id, owner FROM jobs WHERE job_id = ? AND {stale}", (job_id, cutoff)
+            )
+        failed = 0
+        for stale_id, owner in rows.fetchall():
+            # Re-checked in the update: a heartbeat may have arrived since
+            failed += conn.execute(
+                "UPDATE jobs SET status = 'failed', stage = 'error', error = ?, updated_at = ? "
+                f"WHERE job_id = ? AND {stale}",
+                (_stale_error(owner), time.time(), stale_id, cutoff),
+            ).rowcount
+        return failed
+
+    def create_or_join_job(
+        self, key: str, stage: str = "", message: str = "", ttl: Optional[float] = None
+    ) -> tuple[JobState, bool]:
+        conn = self._conn()
+        job = _new_job(stage, message)
+        now = job.created_at
+        expires_at = now + ttl if ttl is not None else None
+        # One write transaction: the key's holder cannot change under us
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Insert if absent (or expired); whoever holds the key afterwards won
+            conn.execute(
+                "INSERT INTO cache (key, value, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, "
+                "expires_at = excluded.expires_at "
+                "WHERE cache.expires_at IS NOT NULL AND cache.expires_at < ?",
+                (key, json.dumps(job.job_id), expires_at, now),
+            )
+            winner = json.loads(
+                conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()[0]
+            )
+            holder = self.get_job(winner) if winner != job.job_id else None
+            if holder is not None and holder.status in _ACTIVE:
+                conn.execute("COMMIT")
+                return holder, False
+            if winner != job.job_id:
+                # The holder finished, failed or was purged: take the key over
+                conn.execute(
+                    "UPDATE cache SET value = ?, expires_at = ? WHERE key = ?",
+                    (json.dumps(job.job_id), expires_at, key),
+                )
+            self._insert_job(job)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return job, True
+
+    def cache_get(self, key: str) -> Optional[Any]:
+        row = self._conn().execute(
+            "SELECT value FROM cache WHERE key = ? AND (expires_at IS NULL OR expires_at >= ?)",
+            (key, time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def cache_set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._conn().execute(
+            "INSERT INTO cache (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, "
+            "expires_at = excluded.expires_at",
+            (key, json.dumps(value), expires_at),
+        )
+
+    def purge(self, older_than: float = RETENTION_SECONDS) -> int:
+        now = time.time()
+        conn = self._conn()
+        jobs = conn.execute(
+            "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?",
+            (now - older_than,),
+        ).rowcount
+        entries = conn.execute(
+            "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?", (now,)
+        ).rowcount
+        return jobs + entries
+
+
+def open_state_store(url: Optional[str] = None) -> StateStore:
+    """
+    Open the state store named by url (default: $DOCWEAVE_STATE_URL).
+
+    Raises:
+        ValueError: If the URL scheme is not supported
+    """
+    url = url or os.environ.get(STATE_URL_ENV) or f"sqlite:///{DEFAULT_STATE_PATH}"
+    if url == "memory://":
+        return MemoryStateStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteStateStore(Path(url[len("sqlite:///"):]).expanduser())
+    raise ValueError(f"Unsupported state store URL: {url}")
@@ -0,0 +1,47 @@
+"""Component: Cross-process lock serializing writes to a docs directory."""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+LOCK_DIR = Path(tempfile.gettempdir()) / "docweave-locks"
+
+
+def _lock_path(output_path: Path) -> Path:
+    """Lock file for a docs directory (kept outside it, so it never shows up there)."""
+    digest = hashlib.sha1(str(output_path.resolve()).encode()).hexdigest()[:16]
+    return LOCK_DIR / f"{digest}.lock"
+
+
+@asynccontextmanager
+async def docs_write_lock(output_path: Path) -> AsyncIterator[None]:
+    """
+    Hold an exclusive lock on a docs directory while writing it.
+
+    Serializes save_documentation across coroutines, threads and processes
+    (CLI runs, hook workers, web workers) writing the same directory. Uses
+    flock on a per-directory lock file, acquired in a thread so waiting
+    does not block the event loop. Without fcntl (Windows) it is a no-op.
+    """
+    if fcntl is None:
+        yield
+        return
+    LOCK_DIR.mkdir(parents=True, exist_ok=True)
+    fd = os.open(_lock_path(output_path), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        await asyncio.to_thread(fcntl.flock, fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
@@ -0,0 +1,113 @@
+"""Feature: Persistent per-commit analysis cache."""
+
+import json
+import time
+from pathlib import Path
+from typing import Optional
+
+from docweave.components.index_storage import open_index_db, state_dir
+from docweave.types.models import CodeAnalysis, CommitInfo
+
+CACHE_FILE = "analyses.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    sha TEXT PRIMARY KEY,
+    patch_id TEXT NOT NULL DEFAULT '',
+    summary TEXT NOT NULL,
+    why TEXT NOT NULL,
+    next_steps TEXT NOT NULL,
+    importance TEXT NOT NULL,
+    source TEXT NOT NULL,
+    created_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class AnalysisCache:
+    """
+    Stores each commit's CodeAnalysis so later runs skip Copilot for it.
+
+    Entries are keyed by commit SHA and checked against the commit's patch
+    id, so a short-SHA collision or a rewritten commit is treated as a miss.
+    Heuristic analyses are only reused while Copilot is unavailable; once it
+    is back, those commits are analyzed again.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        self.conn = open_index_db(db_path)
+        self.conn.executescript(_SCHEMA)
+        # In-process copy of rows already read or written: sha -> (patch_id, analysis)
+        self._memo: dict[str, tuple[str, CodeAnalysis]] = {}
+
+    @classmethod
+    def for_repo(cls, repo_path: Path) -> "AnalysisCache":
+        """Open the cache stored in the repository's DocWeave state directory."""
+        return cls(state_dir(repo_path) / CACHE_FILE)
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        self.conn.close()
+
+    def get(self, commit: CommitInfo, copilot_available: bool) -> Optional[CodeAnalysis]:
+        """
+        Look up the cached analysis of a commit.
+
+        Args:
+            commit: Commit to look up
+            copilot_available: Whether Copilot can be used right now; if so,
+                cached heuristic analyses are ignored
+
+        Returns:
+            The cached CodeAnalysis, or None on a miss
+        """
+        if commit.sha in self._memo:
+            patch_id, analysis = self._memo[commit.sha]
+            if patch_id != commit.patch_id:
+                return None
+            if copilot_available and analysis.source != "copilot":
+                return None
+            return analysis
+
+        row = self.conn.execute(
+            "SELECT patch_id, summary, why, next_steps, importance, source "
+            "FROM analyses WHERE sha = ?",
+            (commit.sha,),
+        ).fetchone()
+        if not row:
+            return None
+        patch_id, summary, why, next_steps, importance, source = row
+        analysis = CodeAnalysis(
+            summary=summary,
+            why=why,
+            next_steps=json.loads(next_steps),
+            importance=importance,
+            source=source,
+        )
+        self._memo[commit.sha] = (patch_id, analysis)
+        if patch_id != commit.patch_id:
+            return None
+        if copilot_available and source != "copilot":
+            return None
+        return analysis
+
+    def put(self, commit: CommitInfo, analysis: CodeAnalysis) -> None:
+        """Store (or replace) the analysis of a commit."""
+        self._memo[commit.sha] = (commit.patch_id, analysis)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO analyses "
+            "(sha, patch_id, summary, why, next_steps, importance, source, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                commit.sha,
+                commit.patch_id,
+                analysis.summary,
+                analysis.why,
+                json.dumps(analysis.next_steps),
+                analysis.importance,
+                analysis.source,
+                time.time(),
+            ),
+        )
+        self.conn.commit()
@@ -0,0 +1,212 @@
+"""Feature: Document many repositories in one process with a shared scheduler."""
+
+import asyncio
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from docweave.components.copilot_integration import set_copilot_concurrency
+from docweave.features.pipeline import run_documentation
+from docweave.features.repo_location import looks_like_repository, repo_display_name
+from docweave.types.models import RepoRunResult
+
+# Called as each repository finishes, in completion order
+RepoCallback = Callable[[RepoRunResult], None]
+
+
+def load_repo_manifest(source: Path) -> list[Path]:
+    """
+    Resolve the list of repositories to document.
+
+    Args:
+        source: Either a manifest file (one repository path per line; blank
+            lines and lines starting with # are ignored; relative paths are
+            resolved against the manifest's directory) or a directory whose
+            immediate subdirectories are git repositories.
+
+    Returns:
+        Repository paths, de-duplicated, in manifest or sorted directory order
+
+    Raises:
+        ValueError: If the source yields no repositories
+    """
+    source = source.expanduser().resolve()
+    repos: list[Path] = []
+
+    if source.is_file():
+        for line in source.read_text().splitlines():
+            entry = line.strip()
+            if not entry or entry.startswith("#"):
+                continue
+            path = Path(entry).expanduser()
+            if not path.is_absolute():
+                path = source.parent / path
+            repos.append(path.resolve())
+    elif source.is_dir():
+        if looks_like_repository(source):
+            repos.append(source)
+        else:
+            repos.extend(
+                child
+                for child in sorted(source.iterdir())
+                if child.is_dir() and looks_like_repository(child)
+            )
+
+    repos = list(dict.fromkeys(repos))
+    if not repos:
+        raise ValueError(f"No git repositories found in {source}")
+    return repos
+
+
+def output_dirs(repos: list[Path], output_root: Path) -> dict[Path, Path]:
+    """
+    Docs directory of each repository under a shared output root.
+
+    A repository's docs go to output_root/<name> (see repo_display_name).
+    Repositories whose names clash (`a/service.git` and `b/service`, or
+    names differing only in case) get a suffix from a hash of their
+    resolved path instead, so they never write to the same directory.
+    """
+    names = {repo: repo_display_name(repo) for repo in repos}
+    taken: dict[str, int] = {}
+    for name in names.values():
+        taken[name.casefold()] = taken.get(name.casefold(), 0) + 1
+    dirs = {}
+    for repo, name in names.items():
+        if taken[name.casefold()] > 1:
+            name += "-" + hashlib.sha1(str(repo.resolve()).encode()).hexdigest()[:8]
+        dirs[repo] = output_root / name
+    return dirs
+
+
+async def _run_one(
+    repo_path: Path,
+    limit: int,
+    days_back: Optional[int],
+    copilot_available: bool,
+    copilot_error: Optional[str],
+    output_path: Optional[Path] = None,
+) -> RepoRunResult:
+    """Document a single repository, capturing failures instead of raising."""
+    started = time.perf_counter()
+    try:
+        run = await run_documentation(
+            repo_path,
+            limit=limit,
+            days_back=days_back,
+            copilot_available=copilot_available,
+            copilot_error=copilot_error,
+            output_path=output_path,
+        )
+        return RepoRunResult(
+            repo_path=str(repo_path),
+            success=True,
+            duration_seconds=time.perf_counter() - started,
+            commits_count=len(run.commits),
+            output_path=str(run.output_path) if run.commits else None,
+        )
+    except Exception as e:
+        return RepoRunResult(
+            repo_path=str(repo_path),
+            success=False,
+            duration_seconds=time.perf_counter() - started,
+            error=str(e) or type(e).__name__,
+        )
+
+
+async def analyze_many(
+    repos: list[Path],
+    limit: int = 5,
+    days_back: Optional[int] = None,
+    jobs: int = 4,
+    copilot_concurrency: Optional[int] = 4,
+    copilot_available: bool = False,
+    copilot_error: Optional[str] = None,
+    on_repo_done: Optional[RepoCallback] = None,
+    output_root: Optional[Path] = None,
+) -> list[RepoRunResult]:
+    """
+    Document every repository over a shared worker pool.
+
+    At most `jobs` repositories are processed at once, and all of them share
+    one Copilot concurrency budget, so the number of Copilot processes stays
+    bounded however many repositories are in flight. Copilot availability is
+    probed once by the caller and reused for every repository.
+
+    Args:
+        repos: Repositories to document
+        limit: Maximum number of commits to analyze per repository
+        days_back: Optional number of days to look back
+        jobs: Number of repositories processed concurrently
+        copilot_concurrency: Maximum concurrent Copilot calls (None = unlimited)
+        copilot_available: Result of the shared Copilot availability probe
+        copilot_error: Reason Copilot is unavailable
+        on_repo_done: Optional callback invoked as each repository finishes
+        output_root: Write each repository's docs to output_root/<name>
+            instead of <repo>/DocweaveDocs (required for bare mirrors); see
+            output_dirs for repositories of the same name
+
+    Returns:
+        One RepoRunResult per repository, in input order
+    """
+    set_copilot_concurrency(copilot_concurrency)
+    workers = asyncio.Semaphore(max(1, jobs))
+    outputs = output_dirs(repos, output_root) if output_root else {}
+
+    async def worker(repo_path: Path) -> RepoRunResult:
+        async with workers:
+            result = await _run_one(
+                repo_path,
+                limit,
+                days_back,
+                copilot_available,
+                copilot_error,
+                outputs.get(repo_path),
+            )
+        if on_repo_done:
+            on_repo_done(result)
+        return result
+
+    try:
+        return list(await asyncio.gather(*(worker(r) for r in repos)))
+    finally:
+        set_copilot_concurrency(None)
+
+
+def write_batch_summary(
+    results: list[RepoRunResult], summary_path: Path, wall_seconds: Optional[float] = None
+) -> None:
+    """
+    Write a consolidated JSON summary of a batch run.
+
+    Args:
+        results: Per-repository results from analyze_many
+        summary_path: File to write (parent directories are created)
+        wall_seconds: Elapsed time of the whole batch. Repositories run
+            concurrently, so this is less than the sum of their durations
+            ("summed_seconds"); None records null.
+    """
+    succeeded = [r for r in results if r.success]
+    summary = {
+        "repositories": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "commits_analyzed": sum(r.commits_count for r in results),
+        "total_seconds": round(wall_seconds, 3) if wall_seconds is not None else None,
+        "summed_seconds": round(sum(r.duration_seconds for r in results), 3),
+        "results": [
+            {
+                "repo_path": r.repo_path,
+                "success": r.success,
+                "duration_seconds": round(r.duration_seconds, 3),
+                "commits_count": r.commits_count,
+                "output_path": r.output_path,
+                "error": r.error,
+            }
+            for r in results
+        ],
+    }
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    summary_path.write_text(json.dumps(summary, indent=2) + "\n")
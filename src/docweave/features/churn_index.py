@@ -0,0 +1,240 @@
+"""Feature: Persistent per-file churn index and hotspot reporting."""
+
+import math
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from docweave.components.index_storage import (
+    begin_write,
+    get_meta,
+    open_index_db,
+    open_index_db_read_only,
+    set_meta,
+    state_dir,
+)
+from docweave.features.diff_selection import is_generated_or_vendored
+from docweave.features.history_stream import CommitChanges, update_indexes
+from docweave.types.models import FileChurn
+
+INDEX_FILE = "churn.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    commits INTEGER NOT NULL DEFAULT 0,
+    additions INTEGER NOT NULL DEFAULT 0,
+    deletions INTEGER NOT NULL DEFAULT 0,
+    authors INTEGER NOT NULL DEFAULT 0,
+    last_touched INTEGER NOT NULL DEFAULT 0,
+    score REAL NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS files_by_score ON files (score DESC);
+CREATE TABLE IF NOT EXISTS file_authors (
+    path TEXT NOT NULL,
+    author TEXT NOT NULL,
+    PRIMARY KEY (path, author)
+) WITHOUT ROWID;
+"""
+
+
+def hotspot_score(commits: int, additions: int, deletions: int, authors: int) -> float:
+    """
+    Risk score of a file: change frequency times the log of its churn.
+
+    Files touched by many authors get a modest boost, since shared
+    ownership tends to go with more defects.
+    """
+    return commits * math.log2(2 + additions + deletions) * (1 + 0.1 * max(0, authors - 1))
+
+
+class ChurnIndex:
+    """
+    Per-file commit count, lines added and removed, distinct authors and
+    last-touched time, with a precomputed hotspot score.
+
+    The score column is indexed, so hotspot queries read a handful of rows
+    instead of walking git or scanning the table.
+    """
+
+    def __init__(self, db_path: Path, read_only: bool = False) -> None:
+        """
+        Args:
+            db_path: Index database, created unless read_only
+            read_only: Only query an existing index
+
+        Raises:
+            FileNotFoundError: If read_only and there is no index yet
+        """
+        self.db_path = db_path
+        if read_only:
+            self.conn = open_index_db_read_only(db_path)
+        else:
+            self.conn = open_index_db(db_path)
+            self.conn.executescript(_SCHEMA)
+        self.conn.create_function("hotspot_score", 4, hotspot_score, deterministic=True)
+        self.conn.create_function("is_generated", 1, is_generated_or_vendored, deterministic=True)
+        # Pending per-file [commits, additions, deletions, last_touched] and authors
+        self._stats: dict[str, list[int]] = defaultdict(lambda: [0, 0, 0, 0])
+        self._authors: set[tuple[str, str]] = set()
+
+    @classmethod
+    def for_repo(cls, repo_path: Path, read_only: bool = False) -> "ChurnIndex":
+        """
+        Open the index stored in the repository's DocWeave state directory.
+
+        With read_only, nothing is created (see __init__).
+        """
+        directory = state_dir(repo_path, create=not read_only)
+        return cls(directory / INDEX_FILE, read_only)
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        self.conn.close()
+
+    def begin(self) -> bool:
+        """Start an update's write transaction (see begin_write)."""
+        return begin_write(self.conn)
+
+    def rollback(self) -> None:
+        """Drop an update's uncommitted changes and buffered counts."""
+        self.conn.rollback()
+        self._stats.clear()
+        self._authors.clear()
+
+    @property
+    def last_indexed_sha(self) -> Optional[str]:
+        """SHA of the newest commit included in the index."""
+        return get_meta(self.conn, "last_sha")
+
+    def update(self, repo_path: Path) -> int:
+        """
+        Bring the index up to date with HEAD, reading only new commits.
+
+        Returns:
+            Number of commits added to the index
+        """
+        return update_indexes(repo_path, [self])
+
+    def reset(self) -> None:
+        """Drop all indexed data."""
+        for table in ("files", "file_authors", "meta"):
+            self.conn.execute(f"DELETE FROM {table}")
+
+    def ingest(self, change: CommitChanges) -> None:
+        """Buffer the statistics contributed by one commit."""
+        for f in change.files:
+            stats = self._stats[f.path]
+            stats[0] += 1
+            stats[1] += f.additions
+            stats[2] += f.deletions
+            stats[3] = max(stats[3], change.timestamp)
+            self._authors.add((f.path, change.author))
+
+    def flush(self) -> None:
+        """Merge buffered statistics into the database and refresh scores."""
+        if not self._stats:
+            return
+        cur = self.conn.cursor()
+        cur.executemany(
+            "INSERT INTO files (path, commits, additions, deletions, last_touched) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT(path) DO UPDATE SET "
+            "commits = commits + excluded.commits, "
+            "additions = additions + excluded.additions, "
+            "deletions = deletions + excluded.deletions, "
+            "last_touched = MAX(last_touched, excluded.last_touched)",
+            ((path, *stats) for path, stats in self._stats.items()),
+        )
+        cur.executemany(
+            "INSERT OR IGNORE INTO file_authors (path, author) VALUES (?, ?)",
+            self._authors,
+        )
+        cur.execute("CREATE TEMP TABLE IF NOT EXISTS touched (path TEXT PRIMARY KEY)")
+        cur.execute("DELETE FROM touched")
+        cur.executemany("INSERT INTO touched (path) VALUES (?)", ((p,) for p in self._stats))
+        cur.execute(
+            "UPDATE files SET authors = "
+            "(SELECT COUNT(*) FROM file_authors fa WHERE fa.path = files.path) "
+            "WHERE path IN (SELECT path FROM touched)"
+        )
+        cur.execute(
+            "UPDATE files SET score = hotspot_score(commits, additions, deletions, authors) "
+            "WHERE path IN (SELECT path FROM touched)"
+        )
+        self._stats.clear()
+        self._authors.clear()
+
+    def mark_indexed(self, sha: str) -> None:
+        """Record the newest indexed commit and commit the transaction."""
+        set_meta(self.conn, "last_sha", sha)
+        self.conn.commit()
+
+    def top_hotspots(
+        self, limit: int = 20, path_prefix: Optional[str] = None, exclude_generated: bool = False
+    ) -> list[FileChurn]:
+        """
+        Highest-risk files by hotspot score.
+
+        Args:
+            limit: Maximum number of files to return
+            path_prefix: Only consider files under this path (e.g. "src/api/")
+            exclude_generated: Skip generated and vendored files (lockfiles,
+                vendor/ ...). Filtered in the query, so up to `limit` files
+                are still returned.
+
+        Returns:
+            FileChurn entries, highest score first
+        """
+        where: list[str] = []
+        params: list = []
+        if path_prefix:
+            where.append("path >= ? AND path < ?")
+            params += [path_prefix, path_prefix + "\U0010ffff"]
+        if exclude_generated:
+            where.append("NOT is_generated(path)")
+        rows = self.conn.execute(
+            "SELECT path, commits, additions, deletions, authors, last_touched, score "
+            f"FROM files {'WHERE ' + ' AND '.join(where) if where else ''} "
+            "ORDER BY score DESC LIMIT ?",
+            (*params, limit),
+        )
+        return [_row_to_churn(row) for row in rows]
+
+    def file_churn(self, path: str) -> Optional[FileChurn]:
+        """Churn statistics of a single file, if it has been indexed."""
+        row = self.conn.execute(
+            "SELECT path, commits, additions, deletions, authors, last_touched, score "
+            "FROM files WHERE path = ?",
+            (path,),
+        ).fetchone()
+        return _row_to_churn(row) if row else None
+
+
+def _row_to_churn(row: tuple) -> FileChurn:
+    """Convert a files table row into a FileChurn."""
+    path, commits, additions, deletions, authors, last_touched, score = row
+    return FileChurn(
+        path=path,
+        commits=commits,
+        additions=additions,
+        deletions=deletions,
+        authors=authors,
+        last_touched=datetime.fromtimestamp(last_touched),
+        score=score,
+    )
+
+
+def generate_hotspots_markdown(hotspots: list[FileChurn], repo_name: str) -> str:
+    """Render the HOTSPOTS.md report."""
+    md = f"# {repo_name} - Hotspots\n\n"
+    md += "*Files that change most often and carry the most risk, over the full history.*\n\n"
+    md += "Score = commits × log2(2 + lines changed), boosted for files with many authors.\n\n"
+    md += "| # | File | Commits | +Lines | -Lines | Authors | Last touched | Score |\n"
+    md += "|---|------|--------:|-------:|-------:|--------:|--------------|------:|\n"
+    for i, h in enumerate(hotspots, 1):
+        md += (
+            f"| {i} | `{h.path}` | {h.commits} | {h.additions} | {h.deletions} | "
+            f"{h.authors} | {h.last_touched.strftime('%Y-%m-%d')} | {h.score:.1f} |\n"
+        )
+    return md
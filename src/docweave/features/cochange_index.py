@@ -0,0 +1,322 @@
+"""Feature: Persistent co-change index and clustered architecture diagrams."""
+
+from collections import Counter
+from itertools import combinations
+from pathlib import Path
+from typing import Optional
+
+from docweave.components.index_storage import (
+    begin_write,
+    get_meta,
+    open_index_db,
+    open_index_db_read_only,
+    set_meta,
+    state_dir,
+)
+from docweave.features.history_stream import CommitChanges, update_indexes
+
+INDEX_FILE = "cochange.sqlite"
+# Directories are collapsed to this many leading path components
+DIR_DEPTH = 2
+# Commits touching more files (or directories) than this add no pairs at that
+# level: sweeping changes say little about structure and would add O(n^2) rows
+MAX_FILES_FOR_PAIRS = 25
+MAX_DIRS_FOR_PAIRS = 25
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    dir TEXT NOT NULL,
+    commits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS files_by_dir ON files (dir, commits DESC);
+CREATE TABLE IF NOT EXISTS file_pairs (
+    a INTEGER NOT NULL,
+    b INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (a, b)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS file_pairs_by_b ON file_pairs (b);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    commits INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS dir_pairs (
+    a TEXT NOT NULL,
+    b TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (a, b)
+) WITHOUT ROWID;
+"""
+
+
+def dir_key(path: str) -> str:
+    """Collapse a file path to its directory cluster (DIR_DEPTH components)."""
+    parts = path.split("/")[:-1][:DIR_DEPTH]
+    return "/".join(parts) if parts else "."
+
+
+class CoChangeIndex:
+    """
+    Sparse counts of files and directories that change together.
+
+    Only pairs that actually co-occur are stored (one row per pair), and
+    sweeping commits are excluded from pair counting, so the index grows
+    with real coupling rather than with the square of the file count.
+    """
+
+    def __init__(self, db_path: Path, read_only: bool = False) -> None:
+        """
+        Args:
+            db_path: Index database, created unless read_only
+            read_only: Only query an existing index
+
+        Raises:
+            FileNotFoundError: If read_only and there is no index yet
+        """
+        self.db_path = db_path
+        if read_only:
+            self.conn = open_index_db_read_only(db_path)
+        else:
+            self.conn = open_index_db(db_path)
+            self.conn.executescript(_SCHEMA)
+        # Pending counts, merged into SQLite by flush()
+        self._file_ids: Optional[dict[str, int]] = None
+        self._file_commits: Counter = Counter()
+        self._dir_commits: Counter = Counter()
+        self._file_pairs: Counter = Counter()
+        self._dir_pairs: Counter = Counter()
+
+    @classmethod
+    def for_repo(cls, repo_path: Path, read_only: bool = False) -> "CoChangeIndex":
+        """
+        Open the index stored in the repository's DocWeave state directory.
+
+        With read_only, nothing is created (see __init__).
+        """
+        directory = state_dir(repo_path, create=not read_only)
+        return cls(directory / INDEX_FILE, read_only)
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        self.conn.close()
+
+    def begin(self) -> bool:
+        """Start an update's write transaction (see begin_write)."""
+        self._file_ids = None  # Another updater may have added files since
+        return begin_write(self.conn)
+
+    def rollback(self) -> None:
+        """Drop an update's uncommitted changes and buffered counts."""
+        self.conn.rollback()
+        self._file_ids = None
+        for counter in (self._file_commits, self._dir_commits, self._file_pairs, self._dir_pairs):
+            counter.clear()
+
+    @property
+    def last_indexed_sha(self) -> Optional[str]:
+        """SHA of the newest commit included in the index."""
+        return get_meta(self.conn, "last_sha")
+
+    def update(self, repo_path: Path) -> int:
+        """
+        Bring the index up to date with HEAD in one streamed pass.
+
+        Only commits after the last indexed SHA are read. If history was
+        rewritten so that SHA is no longer an ancestor of HEAD, the index is
+        rebuilt from scratch.
+
+        Returns:
+            Number of commits added to the index
+        """
+        return update_indexes(repo_path, [self])
+
+    def reset(self) -> None:
+        """Drop all indexed data."""
+        for table in ("files", "file_pairs", "dirs", "dir_pairs", "meta"):
+            self.conn.execute(f"DELETE FROM {table}")
+        self._file_ids = {}
+
+    def ingest(self, change: CommitChanges) -> None:
+        """Buffer the counts contributed by one commit."""
+        paths = sorted({f.path for f in change.files})
+        dirs = sorted({dir_key(p) for p in paths})
+        self._file_commits.update(paths)
+        self._dir_commits.update(dirs)
+        if 1 < len(paths) <= MAX_FILES_FOR_PAIRS:
+            self._file_pairs.update(combinations(paths, 2))
+        if 1 < len(dirs) <= MAX_DIRS_FOR_PAIRS:
+            self._dir_pairs.update(combinations(dirs, 2))
+
+    def mark_indexed(self, sha: str) -> None:
+        """Record the newest indexed commit and commit the transaction."""
+        set_meta(self.conn, "last_sha", sha)
+        self.conn.commit()
+
+    def flush(self) -> None:
+        """Merge buffered counts into the database and clear the buffers."""
+        if self._file_ids is None:
+            self._file_ids = dict(self.conn.execute("SELECT path, id FROM files"))
+        file_ids = self._file_ids
+        cur = self.conn.cursor()
+        new_paths = [p for p in self._file_commits if p not in file_ids]
+        for p in new_paths:
+            cur.execute("INSERT INTO files (path, dir) VALUES (?, ?)", (p, dir_key(p)))
+            file_ids[p] = cur.lastrowid
+        cur.executemany(
+            "UPDATE files SET commits = commits + ? WHERE id = ?",
+            ((n, file_ids[p]) for p, n in self._file_commits.items()),
+        )
+        cur.executemany(
+            "INSERT INTO dirs (path, commits) VALUES (?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET commits = commits + excluded.commits",
+            self._dir_commits.items(),
+        )
+        cur.executemany(
+            "INSERT INTO file_pairs (a, b, n) VALUES (?, ?, ?) "
+            "ON CONFLICT(a, b) DO UPDATE SET n = n + excluded.n",
+            (
+                (min(file_ids[a], file_ids[b]), max(file_ids[a], file_ids[b]), n)
+                for (a, b), n in self._file_pairs.items()
+            ),
+        )
+        cur.executemany(
+            "INSERT INTO dir_pairs (a, b, n) VALUES (?, ?, ?) "
+            "ON CONFLICT(a, b) DO UPDATE SET n = n + excluded.n",
+            ((a, b, n) for (a, b), n in self._dir_pairs.items()),
+        )
+        for counter in (self._file_commits, self._dir_commits, self._file_pairs, self._dir_pairs):
+            counter.clear()
+
+    def top_dirs(self, limit: int) -> list[tuple[str, int]]:
+        """Most frequently changed directory clusters."""
+        return self.conn.execute(
+            "SELECT path, commits FROM dirs ORDER BY commits DESC LIMIT ?", (limit,)
+        ).fetchall()
+
+    def dir_commits(self, paths: list[str]) -> dict[str, int]:
+        """Commit counts for the given directory clusters."""
+        rows = self.conn.execute(
+            f"SELECT path, commits FROM dirs WHERE path IN ({_marks(paths)})", paths
+        )
+        return dict(rows)
+
+    def dir_neighbours(self, path: str, limit: int) -> list[tuple[str, int]]:
+        """Directories most often changed together with `path`."""
+        return self.conn.execute(
+            "SELECT CASE WHEN a = ? THEN b ELSE a END, n FROM dir_pairs "
+            "WHERE a = ? OR b = ? ORDER BY n DESC LIMIT ?",
+            (path, path, path, limit),
+        ).fetchall()
+
+    def dir_edges(self, paths: list[str], min_weight: int) -> list[tuple[str, str, int]]:
+        """Co-change counts between the given directory clusters."""
+        return self.conn.execute(
+            f"SELECT a, b, n FROM dir_pairs WHERE a IN ({_marks(paths)}) "
+            f"AND b IN ({_marks(paths)}) AND n >= ? ORDER BY n DESC",
+            [*paths, *paths, min_weight],
+        ).fetchall()
+
+    def files_in_dir(self, path: str, limit: int) -> list[tuple[int, str, int]]:
+        """Most frequently changed files of a directory cluster: (id, path, commits)."""
+        return self.conn.execute(
+            "SELECT id, path, commits FROM files WHERE dir = ? ORDER BY commits DESC LIMIT ?",
+            (path, limit),
+        ).fetchall()
+
+    def file_ids(self, paths: list[str]) -> dict[str, int]:
+        """Map file paths to their index ids (unknown paths are omitted)."""
+        rows = self.conn.execute(
+            f"SELECT path, id FROM files WHERE path IN ({_marks(paths)})", paths
+        )
+        return dict(rows)
+
+    def file_edges(self, ids: list[int], min_weight: int) -> list[tuple[int, int, int]]:
+        """Co-change counts between the given files."""
+        return self.conn.execute(
+            f"SELECT a, b, n FROM file_pairs WHERE a IN ({_marks(ids)}) "
+            f"AND b IN ({_marks(ids)}) AND n >= ? ORDER BY n DESC",
+            [*ids, *ids, min_weight],
+        ).fetchall()
+
+
+def _marks(values: list) -> str:
+    """SQL placeholders for an IN clause."""
+    return ",".join("?" * len(values)) or "NULL"
+
+
+def _label(text: str) -> str:
+    """Escape text for use inside a quoted Mermaid label."""
+    return text.replace('"', "#quot;")
+
+
+def render_cochange_diagram(
+    index: CoChangeIndex,
+    focus_paths: Optional[list[str]] = None,
+    max_clusters: int = 6,
+    files_per_cluster: int = 4,
+    max_edges: int = 20,
+    min_weight: int = 1,
+) -> Optional[str]:
+    """
+    Render a clustered Mermaid graph from the co-change index.
+
+    Files are grouped into one subgraph per directory cluster; edges are
+    labelled with how often their ends changed together, and the strongest
+    quarter are drawn thick. With focus_paths (e.g. the files of the commits
+    being documented) the graph centres on their directories and their
+    strongest co-change neighbours; otherwise on the busiest directories.
+
+    Returns:
+        A ```mermaid block, or None when the index has nothing to show
+    """
+    focus_paths = focus_paths or []
+    clusters: list[str] = []
+    if focus_paths:
+        focus_dirs = list(dict.fromkeys(dir_key(p) for p in focus_paths))
+        counts = index.dir_commits(focus_dirs)
+        clusters = sorted(counts, key=counts.get, reverse=True)[:max_clusters]
+        for path in list(clusters):
+            for neighbour, _ in index.dir_neighbours(path, max_clusters):
+                if len(clusters) >= max_clusters:
+                    break
+                if neighbour not in clusters:
+                    clusters.append(neighbour)
+    if not clusters:
+        clusters = [path for path, _ in index.top_dirs(max_clusters)]
+    if not clusters:
+        return None
+
+    focus_ids = index.file_ids(focus_paths) if focus_paths else {}
+    cluster_files: dict[str, list[tuple[int, str]]] = {}
+    for path in clusters:
+        focused = [(fid, p) for p, fid in focus_ids.items() if dir_key(p) == path]
+        chosen = focused[:files_per_cluster]
+        for fid, p, _ in index.files_in_dir(path, files_per_cluster):
+            if len(chosen) >= files_per_cluster:
+                break
+            if all(fid != c for c, _ in chosen):
+                chosen.append((fid, p))
+        cluster_files[path] = chosen
+
+    node_ids = [fid for files in cluster_files.values() for fid, _ in files]
+    file_edges = index.file_edges(node_ids, min_weight)[:max_edges]
+    dir_edges = index.dir_edges(clusters, min_weight)[: max(0, max_edges - len(file_edges))]
+    weights = sorted(n for *_, n in file_edges + dir_edges)
+    strong = weights[(3 * len(weights)) // 4] if weights else 0
+
+    lines = ["```mermaid", "graph LR"]
+    for ci, path in enumerate(clusters):
+        lines.append(f'    subgraph C{ci}["{_label(path)}"]')
+        for fid, p in cluster_files[path]:
+            lines.append(f'        F{fid}["{_label(p.rsplit("/", 1)[-1])}"]')
+        lines.append("    end")
+    for a, b, n in file_edges:
+        link = "===" if n >= strong and n > weights[0] else "---"
+        lines.append(f"    F{a} {link}|{n}| F{b}")
+    cluster_ids = {path: ci for ci, path in enumerate(clusters)}
+    for a, b, n in dir_edges:
+        lines.append(f"    C{cluster_ids[a]} -.-|{n}| C{cluster_ids[b]}")
+    lines.append("```")
+    return "\n".join(lines)
@@ -1,28 +1,164 @@
 """Feature: Analyze git commits and extract changes."""
 
+import os
+import re
+import subprocess
+import threading
 from datetime import datetime, timedelta
+from itertools import islice
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 from git import Repo
-from git.exc import InvalidGitRepositoryError
+from git.exc import GitCommandError, InvalidGitRepositoryError
 
-from docweave.types.models import CommitInfo
+from docweave.components.copilot_integration import DIFF_TOKEN_BUDGET
+from docweave.components.handle_cache import HandleCache
+from docweave.components.prompt_budget import chars_for_tokens
+from docweave.components.run_settings import current_settings
+from docweave.features.diff_selection import GitAttributeRule, parse_gitattributes, select_diff
+from docweave.features.git_batch import (
+    batch_backend,
+    cap_patch_lines,
+    close_batch_backends,
+    split_patch_output,
+)
+from docweave.features.repo_location import find_repo_root, shallow_boundary
+from docweave.types.models import CommitInfo, FileDiff
 
+# Hash of git's empty tree, used as the base when diffing a root commit
+NULL_TREE_SHA = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
 
-async def analyze_recent_commits(
-    repo_path: Path, limit: int = 10, days_back: Optional[int] = None
-) -> list[CommitInfo]:
+# "This reverts commit <sha>." line written by `git revert`
+_REVERT_MESSAGE_RE = re.compile(r"This reverts commit ([0-9a-f]{7,40})")
+
+# Object access backend: "gitpython" (Commit/Diff objects) or "batch"
+# (persistent cat-file/diff-tree processes, see features/git_batch.py)
+GIT_BACKEND_ENV = "DOCWEAVE_GIT_BACKEND"
+GIT_BACKENDS = ("gitpython", "batch")
+# Commits read per chunk when commits are streamed (iter_recent_commits)
+INGEST_CHUNK = 32
+
+
+def git_backend(name: Optional[str] = None) -> str:
     """
-    Analyze recent commits in a git repository.
+    Resolve the object access backend to use.
+
+    Args:
+        name: Explicit backend; defaults to --git-backend, $DOCWEAVE_GIT_BACKEND,
+            then "gitpython"
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    name = name or current_settings().git_backend or os.environ.get(GIT_BACKEND_ENV) or "gitpython"
+    if name not in GIT_BACKENDS:
+        raise ValueError(f"Unknown git backend: {name} (choose from {', '.join(GIT_BACKENDS)})")
+    return name
+
+
+# Open GitPython handles, one per (repository, thread); evicted ones are
+# closed, which stops their persistent `git cat-file` processes
+_repos: HandleCache[Repo] = HandleCache(
+    lambda repo_path, thread_id: Repo(repo_path), Repo.close, maxsize=32
+)
+
+
+def _open_repo(repo_path: Path) -> Repo:
+    """Open a repository, reusing the handle (and its git processes) across calls."""
+    # GitPython's Repo is not thread-safe, so each thread gets its own handle
+    return _repos.get(repo_path, threading.get_ident())
+
+
+def close_repo_handles() -> None:
+    """Close every cached repository handle and batch backend (they reopen on next use)."""
+    _repos.clear()
+    close_batch_backends()
+
+
+def compute_patch_ids(
+    repo_path: Path, shas: list[str], reverse: bool = False
+) -> dict[str, str]:
+    """
+    Compute stable patch identities, as `git patch-id --stable` does.
+
+    Streams `git log -p` for all SHAs into a single `git patch-id --stable`
+    process. Commits with identical diffs (cherry-picks, backports,
+    revert-of-revert pairs) get the same patch id regardless of line
+    numbers or whitespace.
 
     Args:
         repo_path: Path to the git repository
-        limit: Maximum number of commits to analyze
-        days_back: Optional number of days to look back
+        shas: Full commit SHAs
+        reverse: Compute the id of each commit's inverse diff instead, which
+            equals the forward id of a commit that reverts it
 
     Returns:
-        List of CommitInfo objects
+        Mapping of full commit SHA to patch id. Commits without a patch
+        (merges, empty commits) are omitted. Empty if git is unavailable.
+    """
+    if not shas:
+        return {}
+    log_cmd = ["git", "-C", str(repo_path), "log", "--stdin", "--no-walk=unsorted",
+               "-p", "--format=commit %H"]
+    if reverse:
+        # -R swaps the prefixes too; swap them back so headers match a forward diff
+        log_cmd += ["-R", "--src-prefix=b/", "--dst-prefix=a/"]
+    try:
+        log_proc = subprocess.Popen(
+            log_cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        patch_proc = subprocess.Popen(
+            ["git", "patch-id", "--stable"],
+            stdin=log_proc.stdout,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        log_proc.stdout.close()
+        log_proc.stdin.write("\n".join(shas).encode() + b"\n")
+        log_proc.stdin.close()
+        output, _ = patch_proc.communicate()
+        log_proc.wait()
+    except OSError:
+        return {}
+
+    patch_ids: dict[str, str] = {}
+    for line in output.decode("ascii", errors="ignore").splitlines():
+        parts = line.split()
+        if len(parts) == 2:
+            patch_ids[parts[1]] = parts[0]
+    return patch_ids
+
+
+def _link_reverts(
+    commit_infos: list[CommitInfo], full_shas: list[str], reverse_ids: dict[str, str]
+) -> None:
+    """
+    Set `reverts` on commits that undo another commit.
+
+    A commit is a revert when its message carries git's "This reverts commit"
+    line, or when its patch id equals the inverse patch id of an older commit
+    in the list (commits are ordered newest first).
+    """
+    for i, info in enumerate(commit_infos):
+        match = _REVERT_MESSAGE_RE.search(info.message)
+        if match:
+            info.reverts = match.group(1)[:7]
+            continue
+        if not info.patch_id:
+            continue
+        for older_sha, older in zip(full_shas[i + 1 :], commit_infos[i + 1 :]):
+            if reverse_ids.get(older_sha) == info.patch_id:
+                info.reverts = older.sha
+                break
+
+
+def _resolve_repo(repo_path: Path) -> Path:
+    """
+    Root of the repository at or above repo_path.
 
     Raises:
         ValueError: If repo_path is not a valid git repository
@@ -36,57 +172,196 @@ async def analyze_recent_commits(
     if not repo_path.is_dir():
         raise ValueError(f"Path is not a directory: {repo_path}")
     
-    # Check if it's a git repository
-    git_dir = repo_path / ".git"
-    if not git_dir.exists() and not git_dir.is_dir():
-        # Try parent directories (might be in a subdirectory of a git repo)
-        current = repo_path
-        found_git = False
-        for _ in range(5):  # Check up to 5 levels up
-            if (current / ".git").exists():
-                repo_path = current
-                found_git = True
-                break
-            if current.parent == current:  # Reached root
-                break
-            current = current.parent
-        
-        if not found_git:
-            raise ValueError(
-                f"{repo_path} is not a git repository. "
-                "Please ensure you're in a directory with a .git folder or initialize with 'git init'."
-            )
-    
+    # Work tree, subdirectory of one, or a bare repository (e.g. a mirror)
+    root = find_repo_root(repo_path)
+    if root is None:
+        raise ValueError(
+            f"{repo_path} is not a git repository. "
+            "Please ensure you're in a git work tree or a bare repository, "
+            "or initialize with 'git init'."
+        )
+    return root
+
+
+async def analyze_recent_commits(
+    repo_path: Path,
+    limit: int = 10,
+    days_back: Optional[int] = None,
+    backend: Optional[str] = None,
+) -> list[CommitInfo]:
+    """
+    Analyze recent commits in a git repository.
+
+    Args:
+        repo_path: Path to the git repository
+        limit: Maximum number of commits to analyze
+        days_back: Optional number of days to look back
+        backend: Object access backend (see git_backend)
+
+    Returns:
+        List of CommitInfo objects
+
+    Raises:
+        ValueError: If repo_path is not a valid git repository
+    """
+    repo_path = _resolve_repo(repo_path)
+    boundary = shallow_boundary(repo_path)
+
+    commit_infos: list[CommitInfo] = []
+    full_shas: list[str] = []
+    for infos, shas in _commit_chunks(
+        repo_path, limit, days_back, boundary, backend, max(1, limit)
+    ):
+        commit_infos += infos
+        full_shas += shas
+
+    # Boundary commits would get the patch id of their whole tree
+    patch_ids = compute_patch_ids(repo_path, [s for s in full_shas if s not in boundary])
+    for info, full_sha in zip(commit_infos, full_shas):
+        info.patch_id = patch_ids.get(full_sha, "")
+    _link_reverts(commit_infos, full_shas, compute_patch_ids(repo_path, full_shas, reverse=True))
+    return commit_infos
+
+
+def iter_recent_commits(
+    repo_path: Path,
+    limit: int = 10,
+    days_back: Optional[int] = None,
+    backend: Optional[str] = None,
+    chunk_size: int = INGEST_CHUNK,
+    revisions: Optional[list[str]] = None,
+) -> Iterator[list[CommitInfo]]:
+    """
+    The commits of analyze_recent_commits, read and yielded a chunk at a time.
+
+    Lets a consumer start on the newest commits while older ones are still
+    being read. Patch ids are computed per chunk. A revert is linked as soon
+    as its chunk is read when the message names the reverted commit; a
+    revert found by patch id against an older chunk gets `reverts` set when
+    that chunk is read, after its own chunk was yielded.
+
+    Args:
+        repo_path: Path to the git repository
+        limit: Maximum number of commits to read
+        days_back: Optional number of days to look back
+        backend: Object access backend (see git_backend)
+        chunk_size: Commits per chunk
+        revisions: Read these commits (newest first) instead of the history
+            of HEAD; ones that no longer exist are skipped
+
+    Yields:
+        Lists of CommitInfo objects, newest first
+
+    Raises:
+        ValueError: If repo_path is not a valid git repository
+    """
+    repo_path = _resolve_repo(repo_path)
+    boundary = shallow_boundary(repo_path)
+    # Patch id -> newer commit not linked as a revert yet, from earlier chunks
+    newer: dict[str, CommitInfo] = {}
+    chunks = _commit_chunks(repo_path, limit, days_back, boundary, backend, chunk_size, revisions)
+    for infos, shas in chunks:
+        patch_ids = compute_patch_ids(repo_path, [s for s in shas if s not in boundary])
+        for info, full_sha in zip(infos, shas):
+            info.patch_id = patch_ids.get(full_sha, "")
+        reverse_ids = compute_patch_ids(repo_path, shas, reverse=True)
+        for full_sha, info in zip(shas, infos):
+            reverter = newer.pop(reverse_ids.get(full_sha, ""), None)
+            if reverter is not None and reverter.reverts is None:
+                reverter.reverts = info.sha
+        _link_reverts(infos, shas, reverse_ids)
+        for info in infos:
+            if info.patch_id and info.reverts is None:
+                newer.setdefault(info.patch_id, info)
+        yield infos
+
+
+def _commit_chunks(
+    repo_path: Path,
+    limit: int,
+    days_back: Optional[int],
+    boundary: frozenset[str],
+    backend: Optional[str],
+    chunk_size: int,
+    revisions: Optional[list[str]] = None,
+) -> Iterator[tuple[list[CommitInfo], list[str]]]:
+    """
+    Recent commits (without patch ids) and their full SHAs, chunk by chunk.
+
+    With `revisions`, those commits are read (in the given order) instead of
+    the newest commits of HEAD.
+    """
+    shas = existing_commits(repo_path, revisions)[:limit] if revisions is not None else None
+    if git_backend(backend) == "batch":
+        return _recent_commits_batch(repo_path, limit, days_back, boundary, chunk_size, shas)
+    return _recent_commits_gitpython(repo_path, limit, days_back, boundary, chunk_size, shas)
+
+
+def existing_commits(repo_path: Path, revisions: list[str]) -> list[str]:
+    """
+    Full SHAs of the revisions that name a commit in the repository.
+
+    Others (garbage-collected after a rebase, or not commits at all) are
+    dropped; the order and the first of any duplicates are kept.
+    """
+    if not revisions:
+        return []
+    result = subprocess.run(
+        ["git", "-C", str(repo_path), "cat-file", "--batch-check=%(objectname) %(objecttype)"],
+        input="".join(f"{rev}^{{commit}}\n" for rev in revisions),
+        capture_output=True,
+        text=True,
+    )
+    found = [line.split() for line in result.stdout.splitlines()]
+    return list(dict.fromkeys(f[0] for f in found if len(f) == 2 and f[1] == "commit"))
+
+
+def _recent_commits_gitpython(
+    repo_path: Path,
+    limit: int,
+    days_back: Optional[int],
+    boundary: frozenset[str],
+    chunk_size: int,
+    shas: Optional[list[str]] = None,
+) -> Iterator[tuple[list[CommitInfo], list[str]]]:
+    """
+    Recent commits (without patch ids) and their full SHAs, read with GitPython.
+
+    Commits in the shallow boundary get no file statistics. With `shas`,
+    those commits are read instead of the history of HEAD.
+    """
     try:
-        repo = Repo(repo_path)
+        repo = _open_repo(repo_path)
     except InvalidGitRepositoryError:
         raise ValueError(f"{repo_path} is not a valid git repository")
     except Exception as e:
         raise ValueError(f"Error accessing git repository: {str(e)}")
 
-    if not repo.bare:
-        # Get commits
-        commits = list(repo.iter_commits(max_count=limit))
+    # Get commits
+    if shas is None:
+        commit_iter = repo.iter_commits(max_count=limit)
+    else:
+        commit_iter = (repo.commit(sha) for sha in shas)
+    cutoff_date = datetime.now() - timedelta(days=days_back) if days_back else None
 
-        if days_back:
-            cutoff_date = datetime.now() - timedelta(days=days_back)
-            commits = [
-                c
-                for c in commits
-                if datetime.fromtimestamp(c.committed_date) >= cutoff_date
-            ]
+    while chunk := list(islice(commit_iter, chunk_size)):
+        if cutoff_date:
+            chunk = [c for c in chunk if datetime.fromtimestamp(c.committed_date) >= cutoff_date]
 
         commit_infos: list[CommitInfo] = []
+        for commit in chunk:
+            if commit.hexsha in boundary:
+                # Shallow clone: the parent was not fetched, so there is no diff
+                files_changed, additions, deletions = [], 0, 0
+            else:
+                # Get files changed in this commit
+                # commit.stats.files is a dict where keys are file paths
+                files_changed = list(commit.stats.files.keys())
 
-        for commit in commits:
-            # Get files changed in this commit
-            # commit.stats.files is a dict where keys are file paths
-            files_changed = list(commit.stats.files.keys())
-
-            # Calculate additions and deletions
-            stats = commit.stats.total
-            additions = stats.get("insertions", 0)
-            deletions = stats.get("deletions", 0)
+                # Calculate additions and deletions
+                stats = commit.stats.total
+                additions = stats.get("insertions", 0)
+                deletions = stats.get("deletions", 0)
 
             commit_info = CommitInfo(
                 sha=commit.hexsha[:7],
@@ -100,47 +375,242 @@ async def analyze_recent_commits(
 
             commit_infos.append(commit_info)
 
-        return commit_infos
+        if commit_infos:
+            yield commit_infos, [c.hexsha for c in chunk]
 
-    return []
 
+def _recent_commits_batch(
+    repo_path: Path,
+    limit: int,
+    days_back: Optional[int],
+    boundary: frozenset[str],
+    chunk_size: int,
+    shas: Optional[list[str]] = None,
+) -> Iterator[tuple[list[CommitInfo], list[str]]]:
+    """
+    Recent commits (without patch ids) and their full SHAs, read through the
+    batch backend: one rev-list, then pipelined cat-file and diff-tree
+    requests per chunk.
 
-async def get_commit_diff(repo_path: Path, commit_sha: str) -> str:
+    Commits in the shallow boundary get no file statistics. With `shas`,
+    those commits are read instead of the history of HEAD.
     """
-    Get the diff for a specific commit.
+    if shas is None:
+        result = subprocess.run(
+            ["git", "-C", str(repo_path), "rev-list", f"--max-count={limit}", "HEAD", "--"],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            return  # No HEAD yet
+        shas = result.stdout.split()
+
+    backend = batch_backend(repo_path)
+    cutoff = (datetime.now() - timedelta(days=days_back)).timestamp() if days_back else None
+    for start in range(0, len(shas), chunk_size):
+        commits = backend.read_commits(shas[start : start + chunk_size])
+        if cutoff:
+            commits = [c for c in commits if c.commit_time >= cutoff]
+
+        numstats = iter(backend.diffs([c for c in commits if c.sha not in boundary], "numstat"))
+        commit_infos: list[CommitInfo] = []
+        for commit in commits:
+            entries = [] if commit.sha in boundary else _parse_numstat(next(numstats))
+            commit_infos.append(
+                CommitInfo(
+                    sha=commit.sha[:7],
+                    message=commit.message.strip(),
+                    author=commit.author,
+                    date=datetime.fromtimestamp(commit.commit_time),
+                    files_changed=[path for _, _, _, path, _ in entries],
+                    additions=sum(added for added, _, _, _, _ in entries),
+                    deletions=sum(deleted for _, deleted, _, _, _ in entries),
+                )
+            )
+        if commit_infos:
+            yield commit_infos, [c.sha for c in commits]
+
+
+def _parse_numstat(output: str) -> list[tuple[int, int, bool, str, Optional[str]]]:
+    """
+    Parse `git diff --numstat -z` output.
+
+    Returns:
+        (additions, deletions, binary, path, old_path) per file; binary files
+        report "-" counts, which become 0 with binary=True
+    """
+    entries = []
+    fields = output.split("\0")
+    i = 0
+    while i < len(fields) and fields[i]:
+        added, deleted, path = fields[i].split("\t", 2)
+        old_path = None
+        if not path:
+            # Rename/copy: the old and new paths follow as separate fields
+            old_path, path = fields[i + 1], fields[i + 2]
+            i += 2
+        binary = added == "-" or deleted == "-"
+        entries.append(
+            (0 if binary else int(added), 0 if binary else int(deleted), binary, path, old_path)
+        )
+        i += 1
+    return entries
+
+
+def _split_patch(patch: str) -> list[str]:
+    """Split multi-file `git diff` output into one chunk per file."""
+    # Lines are collected per file and joined once: appending to a string
+    # held in a list copies it each time, quadratic for a large file
+    chunks: list[list[str]] = []
+    for line in patch.splitlines(keepends=True):
+        if line.startswith("diff --git ") or not chunks:
+            chunks.append([line])
+        else:
+            chunks[-1].append(line)
+    return ["".join(chunk) for chunk in chunks]
+
+
+def get_commit_file_diffs(
+    repo: Repo, commit_sha: str, max_file_chars: Optional[int] = None
+) -> list[FileDiff]:
+    """
+    Get per-file patches and line counts for a commit against its first parent.
+
+    Args:
+        repo: Open GitPython repository
+        commit_sha: SHA of the commit
+        max_file_chars: Cut each file's patch after this many bytes while
+            reading it (see git_batch.cap_patch_lines); line counts stay exact
+
+    Returns:
+        One FileDiff per changed file, in git's diff order
+    """
+    commit = repo.commit(commit_sha)
+    base = commit.parents[0].hexsha if commit.parents else NULL_TREE_SHA
+    patch_args = (base, commit.hexsha, "--patch", "-M", "--no-color", "--no-ext-diff")
+    if max_file_chars is None:
+        patch = repo.git.diff(*patch_args)
+    else:
+        proc = repo.git.diff(*patch_args, as_process=True)
+        lines = cap_patch_lines(proc.stdout, max_file_chars)
+        patch = b"".join(lines).decode("utf-8", errors="replace")
+        proc.wait()
+    return _pair_file_diffs(
+        repo.git.diff(base, commit.hexsha, "--numstat", "-z", "-M", "--no-color"), patch
+    )
+
+
+def _pair_file_diffs(numstat_output: str, patch_output: str) -> list[FileDiff]:
+    """Combine `--numstat -z` and `--patch` output of one diff into FileDiffs."""
+    numstat = _parse_numstat(numstat_output)
+    chunks = _split_patch(patch_output)
+    if len(chunks) != len(numstat):
+        # Unusual entries (e.g. submodules) can break the 1:1 pairing; keep stats only
+        chunks = [""] * len(numstat)
+
+    return [
+        FileDiff(
+            path=path,
+            patch=chunk if chunk.endswith("\n") else chunk + "\n",
+            additions=added,
+            deletions=deleted,
+            binary=binary,
+            old_path=old_path,
+        )
+        for (added, deleted, binary, path, old_path), chunk in zip(numstat, chunks)
+    ]
+
+
+def _load_gitattributes(repo: Repo, commit_sha: str) -> list[GitAttributeRule]:
+    """Read the root .gitattributes as of a commit (empty if absent)."""
+    try:
+        return parse_gitattributes(repo.git.show(f"{commit_sha}:.gitattributes"))
+    except GitCommandError:
+        return []
+
+
+async def get_commit_diff(
+    repo_path: Path,
+    commit_sha: str,
+    max_tokens: int = DIFF_TOKEN_BUDGET,
+    backend: Optional[str] = None,
+) -> str:
+    """
+    Get the diff for a specific commit, ranked and trimmed for prompting.
+
+    Generated, vendored and binary files are left out (honouring
+    .gitattributes), and the budget is spent on the most relevant hunks
+    first. See features/diff_selection.py.
 
     Args:
         repo_path: Path to the git repository
         commit_sha: SHA of the commit
+        max_tokens: Estimated token budget for the returned diff
+        backend: Object access backend (see git_backend)
 
     Returns:
         Diff string
     """
+    return commit_diff(repo_path, commit_sha, max_tokens, backend)
+
+
+def commit_diff(
+    repo_path: Path,
+    commit_sha: str,
+    max_tokens: int = DIFF_TOKEN_BUDGET,
+    backend: Optional[str] = None,
+    max_file_chars: Optional[int] = None,
+) -> str:
+    """
+    get_commit_diff as a plain function, for callers running git work on a
+    thread of their own (see features/pipeline.py).
+
+    Args:
+        max_file_chars: Optional cap on the patch text read per file, which
+            bounds the memory a huge commit can take (see get_commit_file_diffs)
+    """
     try:
         repo_path = repo_path.resolve()
-        repo = Repo(repo_path)
+        if git_backend(backend) == "batch":
+            return _commit_diff_batch(repo_path, commit_sha, max_tokens, max_file_chars)
+        repo = _open_repo(repo_path)
         commit = repo.commit(commit_sha)
-        
-        # Get diff against parent commit
-        if commit.parents:
-            diff = commit.diff(commit.parents[0], create_patch=True)
-        else:
-            # First commit - show all files
-            diff = commit.diff(None, create_patch=True)
-        
-        # Format the diff
-        diff_str = ""
-        for item in diff:
-            a_path = item.a_path if item.a_path else "/dev/null"
-            b_path = item.b_path if item.b_path else "/dev/null"
-            diff_str += f"--- a/{a_path}\n+++ b/{b_path}\n"
-            if hasattr(item, 'diff') and item.diff:
-                if isinstance(item.diff, bytes):
-                    diff_str += item.diff.decode('utf-8', errors='ignore')
-                else:
-                    diff_str += str(item.diff)
-        
-        return diff_str if diff_str else f"Commit {commit_sha}: {commit.message[:100]}"
+        if commit.hexsha in shallow_boundary(repo_path):
+            return _boundary_diff(commit_sha, commit.message)
+
+        files = get_commit_file_diffs(repo, commit.hexsha, max_file_chars)
+        diff_str = select_diff(files, chars_for_tokens(max_tokens), _load_gitattributes(repo, commit.hexsha))
+
+        return diff_str if diff_str.strip() else f"Commit {commit_sha}: {commit.message[:100]}"
     except Exception as e:
         # Return a minimal diff description instead of empty string
         return f"Error getting diff for commit {commit_sha}: {str(e)}"
+
+
+def _commit_diff_batch(
+    repo_path: Path, commit_sha: str, max_tokens: int, max_file_chars: Optional[int] = None
+) -> str:
+    """get_commit_diff through the batch backend."""
+    batch = batch_backend(repo_path)
+    commits = batch.read_commits([commit_sha])
+    if not commits:
+        raise ValueError(f"Unknown commit {commit_sha}")
+    commit = commits[0]
+    if commit.sha in shallow_boundary(repo_path):
+        return _boundary_diff(commit_sha, commit.message)
+    numstat, patch = split_patch_output(batch.diffs([commit], "patch", max_file_chars)[0])
+    attributes = batch.read_objects([f"{commit.sha}:.gitattributes"])[0]
+    rules = []
+    if attributes:
+        rules = parse_gitattributes(attributes[1].decode("utf-8", errors="replace"))
+
+    diff_str = select_diff(_pair_file_diffs(numstat, patch), chars_for_tokens(max_tokens), rules)
+    return diff_str if diff_str.strip() else f"Commit {commit_sha}: {commit.message[:100]}"
+
+
+def _boundary_diff(commit_sha: str, message: str) -> str:
+    """Stand-in diff for a commit whose parent a shallow clone did not fetch."""
+    return (
+        f"Commit {commit_sha}: {message[:100]}\n"
+        "(Shallow clone boundary: the parent commit was not fetched, so the diff is unavailable.)"
+    )
@@ -0,0 +1,313 @@
+"""Feature: Rank changed files by relevance and fit the best hunks into a budget."""
+
+import fnmatch
+import math
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import Optional
+
+from docweave.types.models import FileDiff
+
+# Lockfiles and other files tools write for you (linguist "generated")
+_GENERATED_NAMES = {
+    "package-lock.json",
+    "npm-shrinkwrap.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+    "poetry.lock",
+    "Pipfile.lock",
+    "Cargo.lock",
+    "Gemfile.lock",
+    "composer.lock",
+    "go.sum",
+    "mix.lock",
+    "flake.lock",
+    "packages.lock.json",
+}
+_GENERATED_PATTERNS = (
+    "*.min.js",
+    "*.min.css",
+    "*.map",
+    "*.snap",
+    "*_pb2.py",
+    "*_pb2_grpc.py",
+    "*.pb.go",
+    "*.pb.cc",
+    "*.pb.h",
+    "*.generated.*",
+    "*.g.dart",
+)
+_GENERATED_DIRS = {"__snapshots__", "__generated__", "generated"}
+
+# Third-party code checked into the tree (linguist "vendored")
+_VENDORED_DIRS = {
+    "vendor",
+    "vendors",
+    "third_party",
+    "thirdparty",
+    "third-party",
+    "node_modules",
+    "bower_components",
+    "external",
+    "dist",
+    ".yarn",
+}
+
+# Relevance weight by file extension; anything else gets _DEFAULT_WEIGHT
+_SOURCE_WEIGHT = 1.0
+_CONFIG_WEIGHT = 0.5
+_DOCS_WEIGHT = 0.4
+_DEFAULT_WEIGHT = 0.6
+_TEST_FACTOR = 0.8
+_SOURCE_EXTS = {
+    ".py", ".js", ".jsx", ".ts", ".tsx", ".go", ".rs", ".java", ".kt", ".kts",
+    ".scala", ".c", ".h", ".cc", ".cpp", ".hpp", ".cs", ".rb", ".php", ".swift",
+    ".m", ".mm", ".ex", ".exs", ".erl", ".hs", ".clj", ".lua", ".dart", ".vue",
+    ".svelte", ".sql", ".sh", ".bash", ".zsh", ".ps1",
+}
+_CONFIG_EXTS = {
+    ".json", ".yml", ".yaml", ".toml", ".ini", ".cfg", ".conf", ".xml",
+    ".gradle", ".properties", ".env", ".lock",
+}
+_DOCS_EXTS = {".md", ".rst", ".txt", ".adoc"}
+
+# Most example paths listed per exclusion reason in the summary line
+_SUMMARY_EXAMPLES = 3
+
+
+@dataclass
+class GitAttributeRule:
+    """One `pattern attr...` line from .gitattributes."""
+
+    pattern: str
+    attributes: dict[str, bool]
+
+
+def parse_gitattributes(text: str) -> list[GitAttributeRule]:
+    """
+    Parse the attributes DocWeave cares about from a .gitattributes file.
+
+    Recognizes linguist-generated, linguist-vendored, binary and -diff (all
+    may be negated with `-attr` or `attr=false`). Only the repository's root
+    .gitattributes is read; nested files are not consulted.
+    """
+    wanted = {"linguist-generated", "linguist-vendored", "binary", "diff"}
+    rules: list[GitAttributeRule] = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        pattern, *attrs = line.split()
+        parsed: dict[str, bool] = {}
+        for attr in attrs:
+            value = True
+            if attr.startswith(("-", "!")):
+                attr, value = attr[1:], False
+            elif "=" in attr:
+                attr, raw = attr.split("=", 1)
+                value = raw.lower() not in ("false", "0", "unset")
+            if attr in wanted:
+                parsed[attr] = value
+        if parsed:
+            rules.append(GitAttributeRule(pattern=pattern, attributes=parsed))
+    return rules
+
+
+def _attr_pattern_matches(pattern: str, path: str) -> bool:
+    """Match a .gitattributes pattern against a repository-relative path."""
+    pattern = pattern.lstrip("/")
+    if pattern.endswith("/**"):
+        prefix = pattern[:-3]
+        return path.startswith(prefix + "/") or fnmatch.fnmatchcase(path, pattern)
+    if "/" not in pattern:
+        return fnmatch.fnmatchcase(PurePosixPath(path).name, pattern)
+    return fnmatch.fnmatchcase(path, pattern)
+
+
+def _path_attributes(path: str, rules: list[GitAttributeRule]) -> dict[str, bool]:
+    """Resolve attributes for a path; later rules win, as in git."""
+    resolved: dict[str, bool] = {}
+    for rule in rules:
+        if _attr_pattern_matches(rule.pattern, path):
+            resolved.update(rule.attributes)
+    return resolved
+
+
+def classify_path(
+    file: FileDiff, rules: Optional[list[GitAttributeRule]] = None
+) -> Optional[str]:
+    """
+    Decide whether a changed file should be kept out of the prompt.
+
+    .gitattributes settings override the built-in heuristics in both
+    directions (e.g. `linguist-generated=false` keeps a lockfile).
+
+    Returns:
+        "binary", "generated" or "vendored", or None to keep the file
+    """
+    attrs = _path_attributes(file.path, rules or [])
+    if file.binary or attrs.get("binary") or attrs.get("diff") is False:
+        return "binary"
+    if "linguist-generated" in attrs:
+        if attrs["linguist-generated"]:
+            return "generated"
+    elif _looks_generated(file.path):
+        return "generated"
+    if "linguist-vendored" in attrs:
+        if attrs["linguist-vendored"]:
+            return "vendored"
+    elif _looks_vendored(file.path):
+        return "vendored"
+    return None
+
+
+def _looks_generated(path: str) -> bool:
+    """Linguist-style generated-file detection by name and location."""
+    p = PurePosixPath(path)
+    if p.name in _GENERATED_NAMES:
+        return True
+    if any(part in _GENERATED_DIRS for part in p.parts[:-1]):
+        return True
+    return any(fnmatch.fnmatchcase(p.name, pat) for pat in _GENERATED_PATTERNS)
+
+
+def _looks_vendored(path: str) -> bool:
+    """Linguist-style vendored-code detection by directory."""
+    return any(part in _VENDORED_DIRS for part in PurePosixPath(path).parts[:-1])
+
+
+def is_generated_or_vendored(path: str) -> bool:
+    """Whether a path looks like generated or vendored content (no .gitattributes)."""
+    return _looks_generated(path) or _looks_vendored(path)
+
+
+def relevance_score(file: FileDiff) -> float:
+    """
+    Score a kept file: language weight scaled by the log of its change size.
+
+    Source files outrank config and docs; tests rank slightly below the code
+    they exercise. The log keeps one huge change from dominating.
+    """
+    p = PurePosixPath(file.path)
+    ext = p.suffix.lower()
+    if ext in _SOURCE_EXTS:
+        weight = _SOURCE_WEIGHT
+    elif ext in _CONFIG_EXTS:
+        weight = _CONFIG_WEIGHT
+    elif ext in _DOCS_EXTS or _in_docs_dir(p):
+        weight = _DOCS_WEIGHT
+    else:
+        weight = _DEFAULT_WEIGHT
+    if any("test" in part.lower() for part in p.parts):
+        weight *= _TEST_FACTOR
+    return weight * (1.0 + math.log1p(file.additions + file.deletions))
+
+
+def _in_docs_dir(p: PurePosixPath) -> bool:
+    """Whether a path lives under a documentation directory."""
+    return any(part.lower() in ("docs", "doc", "documentation") for part in p.parts[:-1])
+
+
+def split_hunks(patch: str) -> tuple[str, list[str]]:
+    """Split a single-file patch into its header and its `@@` hunks."""
+    header_lines: list[str] = []
+    hunks: list[list[str]] = []
+    for line in patch.splitlines(keepends=True):
+        if line.startswith("@@"):
+            hunks.append([line])
+        elif hunks:
+            hunks[-1].append(line)
+        else:
+            header_lines.append(line)
+    return "".join(header_lines), ["".join(h) for h in hunks]
+
+
+def _truncate_lines(text: str, max_chars: int) -> str:
+    """Keep whole lines of text up to max_chars."""
+    cut = text.rfind("\n", 0, max_chars)
+    return text[: cut + 1] if cut >= 0 else ""
+
+
+def _describe(count_label: str, paths: list[str]) -> str:
+    """Format `N label (a, b, c, +K more)` for the summary line."""
+    examples = ", ".join(paths[:_SUMMARY_EXAMPLES])
+    if len(paths) > _SUMMARY_EXAMPLES:
+        examples += f", +{len(paths) - _SUMMARY_EXAMPLES} more"
+    return f"{len(paths)} {count_label} ({examples})"
+
+
+def _exclusion_summary(excluded: dict[str, list[str]], over_budget: list[str]) -> str:
+    """Build the compact one-line list of files left out of the prompt."""
+    parts = [
+        _describe(reason, excluded[reason])
+        for reason in ("generated", "vendored", "binary")
+        if excluded.get(reason)
+    ]
+    if over_budget:
+        parts.append(_describe("over budget", over_budget))
+    return f"[excluded: {'; '.join(parts)}]" if parts else ""
+
+
+def select_diff(
+    files: list[FileDiff],
+    max_chars: int,
+    rules: Optional[list[GitAttributeRule]] = None,
+) -> str:
+    """
+    Assemble a diff that spends the character budget on the most relevant hunks.
+
+    Generated, vendored and binary files are dropped. The remaining files are
+    ranked by relevance_score; every ranked file first gets its header and
+    first hunk (so the prompt sees the breadth of the change), then leftover
+    budget goes to further hunks in rank order. Hunks are never cut mid-way.
+    A final summary line lists what was left out.
+
+    Args:
+        files: Per-file patches of one commit
+        max_chars: Character budget for the assembled diff
+        rules: Parsed .gitattributes rules of the repository
+
+    Returns:
+        Diff text (possibly empty when nothing relevant changed)
+    """
+    excluded: dict[str, list[str]] = {}
+    kept: list[FileDiff] = []
+    for file in files:
+        reason = classify_path(file, rules)
+        if reason:
+            excluded.setdefault(reason, []).append(file.path)
+        else:
+            kept.append(file)
+    kept.sort(key=relevance_score, reverse=True)
+
+    # Reserve room for the summary line so it is never squeezed out
+    budget = max_chars - min(200, max_chars // 10)
+    chosen: dict[int, list[str]] = {}
+    pending: list[tuple[int, list[str]]] = []
+    over_budget: list[str] = []
+    for idx, file in enumerate(kept):
+        header, hunks = split_hunks(file.patch)
+        first = header + (hunks[0] if hunks else "")
+        if len(first) <= budget:
+            chosen[idx] = [first]
+            budget -= len(first)
+            pending.append((idx, hunks[1:]))
+        elif not chosen:
+            # The top file alone is too big: keep whole lines up to the budget
+            chosen[idx] = [_truncate_lines(first, budget), "[... hunk truncated ...]\n"]
+            budget = 0
+        else:
+            over_budget.append(file.path)
+
+    for idx, hunks in pending:
+        for hunk in hunks:
+            if len(hunk) > budget:
+                break
+            chosen[idx].append(hunk)
+            budget -= len(hunk)
+        if len(chosen[idx]) <= len(hunks):
+            chosen[idx].append("[... remaining hunks omitted ...]\n")
+
+    diff = "".join("".join(chosen[idx]) for idx in sorted(chosen))
+    summary = _exclusion_summary(excluded, over_budget)
+    return diff + (f"\n{summary}\n" if summary else "")
@@ -0,0 +1,260 @@
+"""Feature: Low-level git object access through persistent batch processes.
+
+An alternative to GitPython's `Commit`/`Diff` objects for commit_analysis.
+One `git cat-file --batch` process returns raw commit objects, and
+`git diff-tree --stdin` processes return numstat and patch text. The
+processes stay open for the life of the backend. Requests are written in
+chunks and their responses read back in order, so a batch of N commits
+costs no process startups and little Python-side object construction.
+"""
+
+import subprocess
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from docweave.components.handle_cache import HandleCache
+
+# Requests written before reading responses back. Kept small enough that a
+# chunk always fits in the pipe buffer, so the writer can never block while
+# git is blocked writing its output.
+PIPELINE_CHUNK = 32
+# diff-tree echoes lines that are not object names, so this one marks the
+# end of each response. Patch lines always start with a diff prefix
+# (" ", "+", "-", "@", ...), so none can be equal to it.
+_SENTINEL = b"#docweave-end\n"
+# Replaces the rest of a file patch cut short by cap_patch_lines ("\" lines
+# are annotations in the diff format, like "\ No newline at end of file")
+TRUNCATED_LINE = b"\\ Patch truncated to fit the memory budget\n"
+
+
+@dataclass
+class RawCommit:
+    """The parsed header and message of a commit object."""
+
+    sha: str
+    tree: str
+    parents: list[str]
+    author: str  # Name only, as GitPython's `commit.author.name`
+    author_time: int
+    commit_time: int
+    message: str
+
+
+def parse_commit(sha: str, raw: bytes) -> RawCommit:
+    """Parse a raw commit object as printed by `git cat-file`."""
+    header, _, message = raw.partition(b"\n\n")
+    tree, parents = "", []
+    author, author_time, commit_time = "", 0, 0
+    for line in header.split(b"\n"):
+        key, _, value = line.partition(b" ")
+        if key == b"tree":
+            tree = value.decode()
+        elif key == b"parent":
+            parents.append(value.decode())
+        elif key == b"author":
+            name, _, rest = value.decode("utf-8", errors="replace").partition(" <")
+            author = name
+            author_time = int(rest.rsplit(" ", 2)[-2])
+        elif key == b"committer":
+            commit_time = int(value.rsplit(b" ", 2)[-2])
+    return RawCommit(
+        sha=sha,
+        tree=tree,
+        parents=parents,
+        author=author,
+        author_time=author_time,
+        commit_time=commit_time,
+        message=message.decode("utf-8", errors="replace"),
+    )
+
+
+class _GitPipe:
+    """One long-running git process speaking a line-per-request protocol."""
+
+    def __init__(self, repo_path: Path, args: list[str]) -> None:
+        self._proc = subprocess.Popen(
+            ["git", "-C", str(repo_path), *args],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def send(self, lines: list[bytes]) -> None:
+        self._proc.stdin.write(b"".join(lines))
+        self._proc.stdin.flush()
+
+    @property
+    def stdout(self):
+        return self._proc.stdout
+
+    def close(self) -> None:
+        if self._proc.poll() is None:
+            self._proc.stdin.close()
+            try:
+                self._proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+
+
+class GitBatchBackend:
+    """
+    Raw commits, numstats and patches from persistent git processes.
+
+    Thread-safe: requests are serialized per backend. Use batch_backend()
+    to share one backend per repository.
+    """
+
+    def __init__(self, repo_path: Path) -> None:
+        self.repo_path = repo_path
+        self._lock = threading.Lock()
+        self._cat_file: Optional[_GitPipe] = None
+        self._diff_pipes: dict[str, _GitPipe] = {}
+
+    def _diff_pipe(self, mode: str) -> _GitPipe:
+        pipe = self._diff_pipes.get(mode)
+        if pipe is None:
+            args = ["diff-tree", "--stdin", "--root", "--no-commit-id", "-r", "-z"]
+            if mode == "numstat":
+                # As GitPython's commit.stats: renames count as delete + add
+                args += ["--numstat", "--no-renames"]
+            else:
+                args += ["--numstat", "--patch", "-M", "--no-color", "--no-ext-diff"]
+            pipe = self._diff_pipes[mode] = _GitPipe(self.repo_path, args)
+        return pipe
+
+    def read_objects(self, names: list[str]) -> list[Optional[tuple[str, bytes]]]:
+        """
+        Objects named by SHA, short SHA or revision expression.
+
+        Returns:
+            (full object name, contents) in request order; None for missing
+            objects
+        """
+        results: list[Optional[tuple[str, bytes]]] = []
+        with self._lock:
+            if self._cat_file is None:
+                self._cat_file = _GitPipe(self.repo_path, ["cat-file", "--batch"])
+            pipe = self._cat_file
+            for start in range(0, len(names), PIPELINE_CHUNK):
+                chunk = names[start : start + PIPELINE_CHUNK]
+                pipe.send([name.encode() + b"\n" for name in chunk])
+                for _ in chunk:
+                    header = pipe.stdout.readline().split()
+                    if len(header) != 3:
+                        results.append(None)  # "<name> missing" / "ambiguous"
+                        continue
+                    oid, size = header[0].decode(), int(header[2])
+                    results.append((oid, pipe.stdout.read(size)))
+                    pipe.stdout.read(1)  # trailing newline
+        return results
+
+    def read_commits(self, names: list[str]) -> list[RawCommit]:
+        """Parsed commit objects, in request order (missing ones are skipped)."""
+        return [parse_commit(*obj) for obj in self.read_objects(names) if obj is not None]
+
+    def diffs(
+        self, commits: list[RawCommit], mode: str = "patch", max_file_chars: Optional[int] = None
+    ) -> list[str]:
+        """
+        Diff of each commit against its first parent (or the empty tree).
+
+        Args:
+            commits: Commits to diff
+            mode: "numstat" for `--numstat -z --no-renames` output only;
+                "patch" for `--numstat -z -M` records, a NUL, then the patch
+            max_file_chars: Cut each file's patch after this many bytes
+                (see cap_patch_lines); the numstat records stay complete
+
+        Returns:
+            Raw diff-tree output per commit, in request order
+        """
+        results: list[str] = []
+        with self._lock:
+            pipe = self._diff_pipe(mode)
+            for start in range(0, len(commits), PIPELINE_CHUNK):
+                chunk = commits[start : start + PIPELINE_CHUNK]
+                requests: list[bytes] = []
+                for c in chunk:
+                    base = f" {c.parents[0]}" if c.parents else ""
+                    requests += [f"{c.sha}{base}\n".encode(), _SENTINEL]
+                pipe.send(requests)
+                for _ in chunk:
+                    lines = self._response_lines(pipe)
+                    if max_file_chars is not None and mode == "patch":
+                        lines = cap_patch_lines(lines, max_file_chars)
+                    results.append(b"".join(lines).decode("utf-8", errors="replace"))
+        return results
+
+    @staticmethod
+    def _response_lines(pipe: _GitPipe) -> Iterator[bytes]:
+        while True:
+            line = pipe.stdout.readline()
+            if not line:
+                raise RuntimeError("git diff-tree exited unexpectedly")
+            if line == _SENTINEL:
+                return
+            if line.endswith(b"\0" + _SENTINEL):
+                # Output ending in a NUL (numstat only) runs into the sentinel
+                yield line[: -len(_SENTINEL)]
+                return
+            yield line
+
+    def close(self) -> None:
+        """Stop the git processes."""
+        with self._lock:
+            for pipe in [self._cat_file, *self._diff_pipes.values()]:
+                if pipe is not None:
+                    pipe.close()
+            self._cat_file = None
+            self._diff_pipes.clear()
+
+
+def cap_patch_lines(lines: Iterable[bytes], max_file_chars: int) -> Iterator[bytes]:
+    """
+    Lines of patch output with each file's patch cut after max_file_chars.
+
+    The first line and every `diff --git` line start a file. Lines past a
+    file's cap are read and dropped, with TRUNCATED_LINE in their place, so
+    a huge generated file costs no more memory than the cap. The `-z`
+    numstat records of "patch" mode run into the first line; they are kept
+    and not counted against the first file's cap.
+    """
+    size: Optional[int] = None
+    for line in lines:
+        if size is None or line.startswith(b"diff --git "):
+            # Numstat records (up to the last NUL) are not patch text
+            size, truncated = -(line.rfind(b"\0") + 1), False
+        elif size + len(line) > max_file_chars:
+            if not truncated:
+                truncated = True
+                yield TRUNCATED_LINE
+            continue
+        size += len(line)
+        yield line
+
+
+# Shared backends, one per repository; evicted ones are closed, which stops
+# their cat-file and diff-tree processes
+_backends: HandleCache[GitBatchBackend] = HandleCache(
+    GitBatchBackend, GitBatchBackend.close, maxsize=32
+)
+
+
+def batch_backend(repo_path: Path) -> GitBatchBackend:
+    """The shared batch backend of a repository (processes start on first use)."""
+    return _backends.get(repo_path)
+
+
+def close_batch_backends() -> None:
+    """Close every shared batch backend (they restart on next use)."""
+    _backends.clear()
+
+
+def split_patch_output(output: str) -> tuple[str, str]:
+    """Split "patch" mode output into its numstat (`-z`) and patch parts."""
+    numstat, sep, patch = output.partition("\0\0")
+    if not sep:
+        return output, ""
+    return numstat + "\0", patch
@@ -0,0 +1,142 @@
+"""Feature: Reports drawn from the persistent history indexes."""
+
+import sqlite3
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from docweave.components.deadline import Deadline
+from docweave.features.churn_index import ChurnIndex, generate_hotspots_markdown
+from docweave.features.cochange_index import CoChangeIndex, render_cochange_diagram
+from docweave.features.history_stream import head_sha, is_ancestor, update_indexes
+from docweave.types.models import CommitInfo
+
+# Most commit files used to focus the co-change diagram (keeps SQL IN lists small)
+MAX_FOCUS_PATHS = 500
+# Files listed in HOTSPOTS.md
+HOTSPOTS_LIMIT = 25
+# Index updates reading at least this many commits are worth announcing
+# (typically the first run on a repository, which reads its whole history)
+LONG_UPDATE_COMMITS = 1000
+
+
+@dataclass
+class HistoryReports:
+    """Index-backed content for a documentation run."""
+
+    cochange_diagram: Optional[str] = None
+    hotspots_markdown: str = ""
+
+
+def update_history_indexes(
+    repo_path: Path, expired: Optional[Callable[[], bool]] = None
+) -> int:
+    """
+    Update the co-change and churn indexes of a repository.
+
+    Both indexes are fed from the same streamed `git log` pass when they
+    were last updated at the same commit. With `expired`, the update stops
+    once it returns True (see update_indexes).
+
+    Returns:
+        Number of commits streamed
+    """
+    cochange = CoChangeIndex.for_repo(repo_path)
+    churn = ChurnIndex.for_repo(repo_path)
+    try:
+        return update_indexes(repo_path, [cochange, churn], expired)
+    finally:
+        cochange.close()
+        churn.close()
+
+
+def _last_indexed_sha(
+    index_type: type[Union[ChurnIndex, CoChangeIndex]], repo_path: Path
+) -> Optional[str]:
+    """An index's last SHA, read without creating the index (None if there is none)."""
+    try:
+        index = index_type.for_repo(repo_path, read_only=True)
+    except FileNotFoundError:
+        return None
+    try:
+        return index.last_indexed_sha
+    finally:
+        index.close()
+
+
+def pending_index_commits(repo_path: Path) -> int:
+    """
+    Number of commits the next update_history_indexes call will read.
+
+    The whole history when an index was never built (or history was
+    rewritten under it), only the newer commits otherwise. Returns 0 if it
+    cannot be determined. Nothing is created.
+    """
+    try:
+        head = head_sha(repo_path)
+        if head is None:
+            return 0
+        since = {_last_indexed_sha(index, repo_path) for index in (CoChangeIndex, ChurnIndex)}
+    except (sqlite3.Error, OSError, ValueError):
+        return 0
+    if since == {head}:
+        return 0
+    # An index that is behind reads `sha..HEAD`; one without a usable SHA, all of HEAD
+    ranges = {
+        f"{sha}..{head}" if sha and is_ancestor(repo_path, sha, head) else head
+        for sha in since
+        if sha != head
+    }
+    counts = []
+    for rev in ranges:
+        result = subprocess.run(
+            ["git", "-C", str(repo_path), "rev-list", "--count", "--no-merges", rev, "--"],
+            capture_output=True,
+            text=True,
+        )
+        counts.append(int(result.stdout.strip() or 0) if result.returncode == 0 else 0)
+    return max(counts, default=0)
+
+
+def build_history_reports(
+    repo_path: Path,
+    commits: list[CommitInfo],
+    repo_name: str,
+    deadline: Optional[Deadline] = None,
+    reserve: float = 0.0,
+) -> HistoryReports:
+    """
+    Update the history indexes and render the reports for a documentation run.
+
+    The co-change diagram centres on the files of `commits`. Returns empty
+    reports instead of raising if the indexes cannot be built, so the rest
+    of the documentation is still generated.
+
+    With a deadline, nothing is done once only `reserve` seconds are left,
+    and an index update still running then is abandoned; the reports are
+    rendered from the indexes as they were before it.
+    """
+    if deadline and not deadline.remaining(reserve):
+        return HistoryReports()
+    try:
+        update_history_indexes(
+            repo_path, (lambda: not deadline.remaining(reserve)) if deadline else None
+        )
+        cochange = CoChangeIndex.for_repo(repo_path)
+        churn = ChurnIndex.for_repo(repo_path)
+        try:
+            focus = list(dict.fromkeys(p for c in commits for p in c.files_changed))
+            diagram = render_cochange_diagram(cochange, focus_paths=focus[:MAX_FOCUS_PATHS])
+            # Lockfiles and vendored code churn a lot but are not where risk lives
+            hotspots = churn.top_hotspots(HOTSPOTS_LIMIT, exclude_generated=True)
+        finally:
+            cochange.close()
+            churn.close()
+    except (sqlite3.Error, OSError, ValueError):
+        return HistoryReports()
+
+    return HistoryReports(
+        cochange_diagram=diagram,
+        hotspots_markdown=generate_hotspots_markdown(hotspots, repo_name) if hotspots else "",
+    )
@@ -0,0 +1,212 @@
+"""Feature: Stream per-commit file statistics from git history in one pass."""
+
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Protocol
+
+from docweave.features.repo_location import shallow_boundary
+
+# Record and field separators for the `git log --format` header line
+_RS = "\x1e"
+_FS = "\x1f"
+
+
+@dataclass
+class FileChange:
+    """Line counts for one file in one commit (binary files count 0/0)."""
+
+    path: str
+    additions: int
+    deletions: int
+
+
+@dataclass
+class CommitChanges:
+    """One commit from the history stream."""
+
+    sha: str
+    author: str
+    timestamp: int  # Committer time, seconds since the epoch
+    files: list[FileChange]
+
+
+def head_sha(repo_path: Path) -> Optional[str]:
+    """Return the full SHA of HEAD, or None for an empty repository."""
+    result = subprocess.run(
+        ["git", "-C", str(repo_path), "rev-parse", "--verify", "-q", "HEAD"],
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.strip() or None
+
+
+def is_ancestor(repo_path: Path, ancestor: str, descendant: str) -> bool:
+    """Whether `ancestor` is reachable from `descendant`."""
+    result = subprocess.run(
+        ["git", "-C", str(repo_path), "merge-base", "--is-ancestor", ancestor, descendant],
+        capture_output=True,
+    )
+    return result.returncode == 0
+
+
+def iter_commit_changes(
+    repo_path: Path, since_sha: Optional[str] = None, until: str = "HEAD"
+) -> Iterator[CommitChanges]:
+    """
+    Stream non-merge commits with their per-file line counts.
+
+    Runs a single `git log --numstat` process and parses its output line by
+    line, so memory use stays flat however long the history is. Commits are
+    yielded newest first. Renames are reported as a deletion plus an
+    addition. Shallow-clone boundary commits, which git would show as adding
+    their whole tree, are yielded without files.
+
+    Args:
+        repo_path: Path to the git repository
+        since_sha: Only yield commits not reachable from this SHA
+        until: Revision to walk back from
+
+    Yields:
+        CommitChanges per commit
+    """
+    rev = f"{since_sha}..{until}" if since_sha else until
+    boundary = shallow_boundary(repo_path)
+    process = subprocess.Popen(
+        [
+            "git",
+            "-C",
+            str(repo_path),
+            "-c",
+            "core.quotepath=off",
+            "log",
+            "--no-merges",
+            "--no-renames",
+            "--numstat",
+            f"--format={_RS}%H{_FS}%aN{_FS}%ct",
+            rev,
+            "--",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+    current: Optional[CommitChanges] = None
+    try:
+        for line in process.stdout:
+            line = line.rstrip("\n")
+            if line.startswith(_RS):
+                if current:
+                    yield current
+                sha, author, timestamp = line[1:].split(_FS, 2)
+                current = CommitChanges(sha=sha, author=author, timestamp=int(timestamp), files=[])
+            elif line and current and current.sha not in boundary:
+                added, deleted, path = line.split("\t", 2)
+                current.files.append(
+                    FileChange(
+                        path=path,
+                        additions=int(added) if added != "-" else 0,
+                        deletions=int(deleted) if deleted != "-" else 0,
+                    )
+                )
+        if current:
+            yield current
+    finally:
+        process.stdout.close()
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+
+
+class HistoryIndex(Protocol):
+    """An index fed from the commit stream and resumed from its last SHA."""
+
+    def begin(self) -> bool: ...
+
+    def rollback(self) -> None: ...
+
+    @property
+    def last_indexed_sha(self) -> Optional[str]: ...
+
+    def reset(self) -> None: ...
+
+    def ingest(self, change: CommitChanges) -> None: ...
+
+    def flush(self) -> None: ...
+
+    def mark_indexed(self, sha: str) -> None: ...
+
+
+# Commits ingested between flushes, bounding the indexes' in-memory buffers
+FLUSH_EVERY = 2000
+
+
+def update_indexes(
+    repo_path: Path, indexes: list[HistoryIndex], expired: Optional[Callable[[], bool]] = None
+) -> int:
+    """
+    Bring several history indexes up to date with HEAD.
+
+    Indexes that were last updated at the same SHA share a single streamed
+    `git log` pass. An index whose last SHA is no longer an ancestor of HEAD
+    (history was rewritten) is reset and rebuilt.
+
+    Each index is updated in one write transaction, taken before its last
+    SHA is read: concurrent updaters (a hook worker and `analyze`, the web
+    app and `watch`) take turns, and the later one only reads commits the
+    first did not add. An index another updater holds for longer than
+    WRITE_WAIT_SECONDS is skipped.
+
+    Args:
+        repo_path: Path to the git repository
+        indexes: Indexes to update
+        expired: Checked after every commit; once it returns True the update
+            stops, and indexes not yet marked indexed are rolled back to
+            their old state
+
+    Returns:
+        Number of commits streamed (summed over passes)
+    """
+    head = head_sha(repo_path)
+    if head is None:
+        return 0
+
+    groups: dict[Optional[str], list[HistoryIndex]] = {}
+    pending: list[HistoryIndex] = []
+    try:
+        for index in indexes:
+            if not index.begin():
+                continue
+            pending.append(index)
+            since = index.last_indexed_sha
+            if since == head:
+                continue
+            if since and not is_ancestor(repo_path, since, head):
+                index.reset()
+                since = None
+            groups.setdefault(since, []).append(index)
+
+        streamed = 0
+        for since, group in groups.items():
+            for count, change in enumerate(
+                iter_commit_changes(repo_path, since_sha=since, until=head), 1
+            ):
+                for index in group:
+                    index.ingest(change)
+                if count % FLUSH_EVERY == 0:
+                    for index in group:
+                        index.flush()
+                streamed += 1
+                if expired is not None and expired():
+                    return streamed
+            for index in group:
+                index.flush()
+                index.mark_indexed(head)
+                pending.remove(index)
+        return streamed
+    finally:
+        # Up to date already, expired or failed: release the transaction
+        for index in pending:
+            index.rollback()
@@ -0,0 +1,166 @@
+"""Feature: Stream a documentation run as NDJSON records.
+
+One `commit` record is emitted per commit as soon as its analysis is done
+(in completion order, which is not necessarily history order; see
+pipeline_events), followed by a
+single `summary` record with the repository-level narrative, diagrams and
+next steps. Consumers can process commits while the run is still going.
+"""
+
+import json
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from docweave.components.deadline import Deadline
+from docweave.features.analysis_cache import AnalysisCache
+from docweave.features.pipeline import pipeline_events
+from docweave.features.run_journal import RunJournal
+from docweave.types.models import CodeAnalysis, CommitAnalyzed, CommitInfo, DocumentationResult
+
+# Bumped when a record's fields change incompatibly (2: `total` may be null)
+SCHEMA_VERSION = 2
+
+
+def commit_record(
+    index: int,
+    total: Optional[int],
+    commit: CommitInfo,
+    analysis: CodeAnalysis,
+    used_fallback: bool,
+) -> dict:
+    """
+    Record describing one analyzed commit.
+
+    `index` is the commit's 1-based position in history order (newest
+    first); `total` is None until every commit of the run has been read.
+    """
+    return {
+        "type": "commit",
+        "schema": SCHEMA_VERSION,
+        "index": index,
+        "total": total,
+        "sha": commit.sha,
+        "message": commit.message,
+        "author": commit.author,
+        "date": commit.date.isoformat(),
+        "files_changed": commit.files_changed,
+        "additions": commit.additions,
+        "deletions": commit.deletions,
+        "patch_id": commit.patch_id or None,
+        "reverts": commit.reverts,
+        "analysis": {
+            "summary": analysis.summary,
+            "why": analysis.why,
+            "next_steps": analysis.next_steps,
+            "importance": analysis.importance,
+            "source": analysis.source,
+        },
+        "fallback": used_fallback,
+    }
+
+
+def summary_record(
+    repo_name: str,
+    commits_count: int,
+    result: DocumentationResult,
+    output_path: Optional[Path],
+    written: list[Path],
+) -> dict:
+    """Final record with the repository-level documentation."""
+    return {
+        "type": "summary",
+        "schema": SCHEMA_VERSION,
+        "repo": repo_name,
+        "commits": commits_count,
+        "narrative": result.narrative,
+        "diagrams": result.mermaid_diagrams,
+        "next_steps": result.next_steps,
+        "integration_insights": result.integration_insights or None,
+        "hotspots": result.hotspots or None,
+        "output_path": str(output_path) if output_path else None,
+        "written": [str(p) for p in written],
+    }
+
+
+def error_record(message: str) -> dict:
+    """Record reporting that the run failed part-way."""
+    return {"type": "error", "schema": SCHEMA_VERSION, "message": message}
+
+
+def to_ndjson(record: dict) -> str:
+    """Serialize a record as one NDJSON line."""
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+async def stream_documentation(
+    repo_path: Path,
+    limit: int,
+    days_back: Optional[int],
+    copilot_available: bool,
+    copilot_error: Optional[str] = None,
+    output_path: Optional[Path] = None,
+    write_docs: bool = True,
+    cache: Optional[AnalysisCache] = None,
+    deadline: Optional[Deadline] = None,
+    journal: Optional[RunJournal] = None,
+) -> AsyncIterator[dict]:
+    """
+    Run the documentation pipeline, yielding records as results arrive.
+
+    Args:
+        repo_path: Path to the git repository
+        limit: Maximum number of commits to analyze
+        days_back: Optional number of days to look back
+        copilot_available: Whether Copilot CLI can be used
+        copilot_error: Reason Copilot is unavailable
+        output_path: Where to save docs (default: <repo>/DocweaveDocs; required
+            for bare repositories)
+        write_docs: Also write DocweaveDocs/ as `docweave analyze` does
+        cache: Optional persistent analysis cache
+        deadline: Optional deadline the run must finish within
+        journal: Optional run journal, compacted once the run completes
+
+    Yields:
+        `commit` records, then one `summary` record; an `error` record
+        replaces the rest of the stream if the run fails
+    """
+    try:
+        async for event in pipeline_events(
+            repo_path,
+            limit,
+            days_back,
+            copilot_available,
+            copilot_error,
+            output_path=output_path,
+            cache=cache,
+            deadline=deadline,
+            journal=journal,
+            write_docs=write_docs,
+        ):
+            if isinstance(event, CommitAnalyzed):
+                yield commit_record(
+                    event.position + 1,
+                    event.total,
+                    event.commit,
+                    event.analysis,
+                    event.used_fallback,
+                )
+                continue
+            run = event.run
+            if run.documentation is None:
+                # No commits: nothing was generated
+                run.documentation = DocumentationResult("", [], "", [])
+    except ValueError as e:
+        yield error_record(str(e))
+        return
+    except Exception as e:
+        yield error_record(f"Commit analysis failed: {e}")
+        return
+
+    yield summary_record(
+        run.repo_name,
+        len(run.commits),
+        run.documentation,
+        run.output_path if write_docs else None,
+        run.written,
+    )
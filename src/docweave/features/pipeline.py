@@ -0,0 +1,760 @@
+"""Feature: Run the full analyze-and-document pipeline for one repository.
+
+pipeline_events is the one implementation: commit ingestion, diff
+extraction, analysis and documentation run as stages on a single event
+loop, and every entry point (CLI, web app, batch runs, embedders) consumes
+its events or one of the wrappers built on it.
+"""
+
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from pathlib import Path
+from typing import AsyncIterator, Callable, Optional, Sequence, Union
+
+from docweave.components.copilot_integration import (
+    COPILOT_TIMEOUT,
+    DIFF_TOKEN_BUDGET,
+    _create_enhanced_analysis,
+    _create_fallback_analysis,
+    _create_near_duplicate_analysis,
+    _create_revert_analysis,
+    analyze_with_copilot,
+)
+from docweave.components.deadline import Deadline
+from docweave.components.doc_generator import (
+    WRITE_RESERVE_SECONDS,
+    generate_documentation,
+    save_documentation,
+)
+from docweave.components.memory_budget import (
+    HARD_PRESSURE,
+    SOFT_PRESSURE,
+    SpillList,
+    current_memory_stats,
+    max_memory,
+    start_memory_stats,
+)
+from docweave.components.near_duplicates import (
+    ClusterStats,
+    NearDuplicateIndex,
+    diff_shingles,
+    minhash,
+    similarity_threshold,
+)
+from docweave.components.prompt_budget import chars_for_tokens, start_prompt_stats
+from docweave.features.analysis_cache import AnalysisCache
+from docweave.features.commit_analysis import commit_diff, git_backend, iter_recent_commits
+from docweave.features.history_reports import build_history_reports
+from docweave.features.repo_location import (
+    default_output_path,
+    record_docs_path,
+    repo_display_name,
+)
+from docweave.features.run_journal import RunJournal
+from docweave.features.search_index import SearchIndex, open_search_index, search_indexing
+from docweave.types.models import (
+    CodeAnalysis,
+    CommitAnalyzed,
+    CommitInfo,
+    DocumentationResult,
+    DocumentationRun,
+    DocumentationWritten,
+)
+
+# Called after each commit is analyzed:
+# (index, total, commit, analysis, used_fallback, position). Calls come in
+# completion order, not history order: analyses run concurrently, a deadline
+# reorders them, and reverts come last. `index` counts completed commits
+# (1, 2, ... for progress); `position` is the commit's 0-based place in the
+# run, newest first.
+CommitCallback = Callable[[int, int, CommitInfo, CodeAnalysis, bool, int], None]
+
+# Time kept back from commit analysis for the repo-level Copilot calls:
+# this share of the deadline, capped at SYNTHESIS_RESERVE_SECONDS
+SYNTHESIS_RESERVE_SHARE = 0.25
+SYNTHESIS_RESERVE_SECONDS = 30.0
+_IMPORTANCE_RANK = {"high": 0, "medium": 1, "low": 2}
+
+# Commits buffered between pipeline stages. A full queue pauses the stage
+# feeding it, so reading and diffing stay only a few commits ahead of
+# analysis, and analysis ahead of the consumer.
+QUEUE_SIZE = 8
+# Commits analyzed concurrently (each waits on its own Copilot call)
+ANALYSIS_WORKERS = 2
+# With a memory budget, the patch text read per file is capped at this
+# fraction of it (a 512 MiB budget reads at most 8 MiB of any one file)
+PATCH_BUDGET_SHARE = 64
+
+
+def synthesis_reserve(deadline: Deadline, copilot_available: bool) -> float:
+    """Seconds of a deadline to keep free for synthesis and writing the docs."""
+    if not copilot_available:
+        return WRITE_RESERVE_SECONDS
+    return WRITE_RESERVE_SECONDS + min(
+        SYNTHESIS_RESERVE_SECONDS, deadline.seconds * SYNTHESIS_RESERVE_SHARE
+    )
+
+
+def _schedule_key(commit: CommitInfo) -> tuple:
+    """Sort key of a commit in schedule_order."""
+    guess = _create_enhanced_analysis(commit.message, "").importance
+    return (
+        commit.reverts is not None,
+        _IMPORTANCE_RANK.get(guess, 1),
+        -(commit.additions + commit.deletions),
+    )
+
+
+def schedule_order(commits: list[CommitInfo]) -> list[int]:
+    """
+    Order in which to analyze commits when time is limited.
+
+    Commits whose message suggests high importance come first, then the
+    largest changes (by numstat lines), so whatever runs out of time and
+    falls back to heuristics is the least valuable. Reverts stay last, as
+    they reuse the analysis of the commit they revert.
+
+    Returns:
+        Indexes into commits, in analysis order
+    """
+    return sorted(range(len(commits)), key=lambda i: _schedule_key(commits[i]))
+
+
+def _churn(commit: CommitInfo) -> int:
+    """Lines changed by a commit (at least 1, for ratios)."""
+    return max(1, commit.additions + commit.deletions)
+
+
+def git_executor() -> ThreadPoolExecutor:
+    """
+    A new thread for the git work of one pipeline run.
+
+    Keeps the event loop free while commits are read and diffed. One thread
+    per run is enough: git calls are short, and the analysis (Copilot) is
+    what the pipeline waits on. Runs (of the web app, analyze-many or the
+    watch daemon) get their own threads, so one repository's git work never
+    queues behind another's.
+    """
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="docweave-git")
+
+
+def _index_for_search(
+    search: SearchIndex, commit: CommitInfo, analysis: CodeAnalysis
+) -> Optional[SearchIndex]:
+    """Add a commit to the search index; on failure, close it and stop indexing."""
+    try:
+        search.add(commit, analysis)
+        return search
+    except sqlite3.Error:
+        search.close()
+        return None
+
+
+class _AnalysisStages:
+    """
+    The extraction and analysis stages of one pipeline run.
+
+    Positions of ingested commits flow through two bounded queues: the
+    extraction stage answers journal and cache hits and prefetches diffs
+    (on the run's own git thread, `git`), and a pool of analysis workers
+    takes commits in analysis order. Patch-id copies and near-duplicates are
+    settled when a worker takes them, by awaiting the analysis of a commit
+    taken earlier, so waits never form a cycle. Reverts wait until every other commit is
+    done. Results go to a bounded event queue, read by `events`.
+
+    With a memory budget (see components/memory_budget.py), every stage
+    samples RSS and degrades under pressure: smaller diffs and analyses
+    spilled to disk past SOFT_PRESSURE; no prefetching and one analysis at
+    a time past HARD_PRESSURE.
+    """
+
+    def __init__(
+        self,
+        repo_path: Path,
+        copilot_available: bool,
+        copilot_error: Optional[str],
+        cache: Optional[AnalysisCache],
+        deadline: Optional[Deadline],
+        journal: Optional[RunJournal],
+        workers: int,
+    ) -> None:
+        self.repo_path = repo_path
+        self.copilot_available = copilot_available
+        self.copilot_error = copilot_error
+        self.cache = cache
+        self.deadline = deadline
+        self.journal = journal
+        self.workers = max(1, workers)
+        self.reserve = synthesis_reserve(deadline, copilot_available) if deadline else 0.0
+        # Resolved here: the git thread does not see the command's settings
+        self.backend = git_backend()
+        self.budget = max_memory()
+        self.memory = current_memory_stats()
+        threshold = similarity_threshold()
+        # Near-duplicates of a commit sent to Copilot reuse its analysis
+        self.near_duplicates = (
+            NearDuplicateIndex(threshold) if copilot_available and threshold is not None else None
+        )
+        self.cluster_stats = ClusterStats()
+
+        self.commits: list[CommitInfo] = []
+        self.analyses: SpillList[Optional[CodeAnalysis]] = SpillList()
+        self.total: Optional[int] = None
+        self._completed = 0
+        # Patch id -> position of its first commit (None until a worker takes it)
+        self._by_patch: dict[str, Optional[int]] = {}
+        # Analyses in progress, by position; finished ones are read from self.analyses
+        self._pending: dict[int, asyncio.Future] = {}
+        self._position_of: dict[str, int] = {}
+        self._reverts: list[int] = []
+        self._busy = 0
+        self._slots = asyncio.Condition()
+        self._extract: asyncio.Queue = asyncio.Queue(QUEUE_SIZE)
+        # With a deadline, every commit is queued (without its diff) so the
+        # most valuable ones are taken first
+        self._analyze: asyncio.PriorityQueue = asyncio.PriorityQueue(
+            0 if deadline else QUEUE_SIZE
+        )
+        self._events: asyncio.Queue = asyncio.Queue(QUEUE_SIZE)
+        self._search: Optional[SearchIndex] = None
+        self.git = git_executor()
+
+    def _pressure(self, stage: str) -> float:
+        """Sample memory for a stage; the share of the budget in use (0.0 without one)."""
+        rss = self.memory.sample(stage)
+        return rss / self.budget if self.budget else 0.0
+
+    async def events(
+        self, chunks: AsyncIterator[list[CommitInfo]]
+    ) -> AsyncIterator[CommitAnalyzed]:
+        """Run the stages over chunks of commits, yielding each result as it is known."""
+        runner = asyncio.create_task(self._run(chunks))
+        try:
+            while (event := await self._events.get()) is not None:
+                yield event
+            await runner
+        finally:
+            # The consumer may stop early (e.g. an HTTP client disconnecting)
+            if not runner.done():
+                runner.cancel()
+
+    async def _run(self, chunks: AsyncIterator[list[CommitInfo]]) -> None:
+        # Each add commits on its own, so an interrupted run keeps what it indexed
+        self._search = open_search_index(self.repo_path) if search_indexing() else None
+        tasks = [
+            asyncio.create_task(self._ingest(chunks)),
+            asyncio.create_task(self._extract_stage()),
+            *(asyncio.create_task(self._analysis_worker()) for _ in range(self.workers)),
+        ]
+        failure: Optional[Exception] = None
+        try:
+            await asyncio.gather(*tasks)
+            for position in sorted(self._reverts):
+                await self._analyze_revert(position)
+        except Exception as e:
+            failure = e
+        finally:
+            for task in tasks:
+                task.cancel()
+            if self._search is not None:
+                self._search.close()
+            self.git.shutdown(wait=False)
+        if self.near_duplicates is not None:
+            self.cluster_stats.record(self.near_duplicates)
+        await self._events.put(None)
+        if failure is not None:
+            raise failure
+
+    async def _ingest(self, chunks: AsyncIterator[list[CommitInfo]]) -> None:
+        # Each position is queued once the next commit is read, so the total
+        # is known before the last commit can be analyzed
+        pending: Optional[int] = None
+        async for chunk in chunks:
+            for commit in chunk:
+                if pending is not None:
+                    await self._extract.put(pending)
+                self.commits.append(commit)
+                self.analyses.append(None)
+                pending = len(self.commits) - 1
+                self._position_of.setdefault(commit.sha[:7], pending)
+        self.total = len(self.commits)
+        if pending is not None:
+            await self._extract.put(pending)
+        await self._extract.put(None)
+
+    async def _extract_stage(self) -> None:
+        loop = asyncio.get_running_loop()
+        while (position := await self._extract.get()) is not None:
+            commit = self.commits[position]
+            replayed = self.journal.get(commit) if self.journal else None
+            cached = replayed or (
+                self.cache.get(commit, self.copilot_available) if self.cache else None
+            )
+            if cached:
+                if commit.patch_id and self._by_patch.get(commit.patch_id) is None:
+                    self._by_patch[commit.patch_id] = position
+                await self._finish(position, cached, False, "journal" if replayed else "cache")
+                continue
+
+            prepared = None
+            if not (
+                self.deadline
+                or commit.reverts
+                or commit.patch_id in self._by_patch
+                or self._pressure("extract") >= HARD_PRESSURE
+            ):
+                prepared = await loop.run_in_executor(self.git, self._prepare, commit)
+            if commit.patch_id:
+                # Later copies wait for this one rather than fetching a diff
+                self._by_patch.setdefault(commit.patch_id, None)
+            key = (0, _schedule_key(commit) if self.deadline else (), position)
+            await self._analyze.put((key, prepared))
+        for worker in range(self.workers):
+            await self._analyze.put(((1, worker), None))
+
+    def _prepare(self, commit: CommitInfo) -> tuple[str, Optional[tuple[int, ...]]]:
+        """
+        A commit's diff and, when clustering, its MinHash signature (git thread).
+
+        With a memory budget, the patch text read per file is capped, and
+        under memory pressure the diff budget shrinks as well.
+        """
+        max_tokens, max_file_chars = DIFF_TOKEN_BUDGET, None
+        if self.budget:
+            max_file_chars = self.budget // PATCH_BUDGET_SHARE
+            pressure = self._pressure("extract")
+            if pressure >= SOFT_PRESSURE:
+                max_tokens //= 4 if pressure >= HARD_PRESSURE else 2
+                max_file_chars = min(max_file_chars, chars_for_tokens(max_tokens) * 4)
+                self.memory.smaller_diffs += 1
+        diff = commit_diff(
+            self.repo_path, commit.sha, max_tokens, self.backend, max_file_chars
+        )
+        if self.near_duplicates is None:
+            return diff, None
+        return diff, minhash(diff_shingles(diff))
+
+    async def _analysis_of(self, position: int) -> CodeAnalysis:
+        """The analysis of a commit taken earlier, waiting for it if it is in progress."""
+        pending = self._pending.get(position)
+        return await pending if pending is not None else self.analyses[position]
+
+    async def _acquire_slot(self) -> None:
+        """Wait for an analysis slot: any free worker, or the only one under pressure."""
+        async with self._slots:
+            if self._busy and self._pressure("analyze") >= HARD_PRESSURE:
+                self.memory.serialized += 1
+                await self._slots.wait_for(lambda: self._busy == 0)
+            self._busy += 1
+
+    async def _release_slot(self) -> None:
+        async with self._slots:
+            self._busy -= 1
+            self._slots.notify_all()
+
+    async def _analysis_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            key, prepared = await self._analyze.get()
+            if key[0]:
+                return
+            position = key[2]
+            commit = self.commits[position]
+            owner = self._by_patch.get(commit.patch_id) if commit.patch_id else None
+            if owner is not None:
+                # Same patch as an analyzed commit (also covers revert-of-revert)
+                await self._finish(position, await self._analysis_of(owner), False, "patch")
+                continue
+            if commit.reverts:
+                # Possibly linked after extraction (see iter_recent_commits)
+                self._reverts.append(position)
+                continue
+
+            future = loop.create_future()
+            self._pending[position] = future
+            if commit.patch_id:
+                self._by_patch[commit.patch_id] = position
+            await self._acquire_slot()
+            try:
+                if prepared is None:
+                    prepared = await loop.run_in_executor(self.git, self._prepare, commit)
+                analysis, used_fallback, reused = await self._analyze_commit(position, *prepared)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                analysis = _create_fallback_analysis(commit.message, "", str(e))
+                used_fallback, reused = True, None
+            finally:
+                await self._release_slot()
+            future.set_result(analysis)
+            await self._finish(position, analysis, used_fallback, reused)
+
+    async def _analyze_commit(
+        self, position: int, diff: str, signature: Optional[tuple[int, ...]]
+    ) -> tuple[CodeAnalysis, bool, Optional[str]]:
+        """(analysis, used_fallback, reused) of a commit no other analysis covers yet."""
+        commit = self.commits[position]
+        if signature is not None:
+            match = self.near_duplicates.add(position, signature)
+            if match is not None:
+                rep, similarity = match
+                analysis = _create_near_duplicate_analysis(
+                    commit.message,
+                    self.commits[rep].sha,
+                    await self._analysis_of(rep),
+                    similarity,
+                    _churn(commit) / _churn(self.commits[rep]),
+                )
+                return analysis, False, "near-duplicate"
+
+        deadline = self.deadline
+        timeout = deadline.call_timeout(COPILOT_TIMEOUT, self.reserve) if deadline else None
+        if self.copilot_available and deadline is not None and timeout is None:
+            return _create_fallback_analysis(commit.message, diff, "Deadline reached"), True, None
+        if self.copilot_available:
+            analysis = await analyze_with_copilot(diff, commit.message, timeout=timeout)
+            # Heuristic when Copilot failed or its circuit breaker is open
+            return analysis, analysis.source != "copilot", None
+        analysis = _create_fallback_analysis(
+            commit.message, diff, self.copilot_error or "Copilot CLI not available"
+        )
+        return analysis, False, None
+
+    async def _analyze_revert(self, position: int) -> None:
+        commit = self.commits[position]
+        owner = self._by_patch.get(commit.patch_id) if commit.patch_id else None
+        if owner is not None:
+            await self._finish(position, await self._analysis_of(owner), False, "patch")
+            return
+        reverted = self._position_of.get(commit.reverts[:7])
+        analysis = _create_revert_analysis(
+            commit.message,
+            commit.reverts,
+            self.analyses[reverted] if reverted is not None else None,
+        )
+        if commit.patch_id:
+            self._by_patch[commit.patch_id] = position
+        await self._finish(position, analysis, False, "revert")
+
+    async def _finish(
+        self, position: int, analysis: CodeAnalysis, used_fallback: bool, reused: Optional[str]
+    ) -> None:
+        """Record an analysis (cache, journal, search index) and emit its event."""
+        commit = self.commits[position]
+        if self.cache and reused not in ("journal", "cache"):
+            self.cache.put(commit, analysis)
+        # Heuristics standing in for Copilot (deadline, failure, or copied from
+        # such a commit) are not journaled: a resumed run analyzes them again
+        stand_in = used_fallback or (
+            reused in ("patch", "near-duplicate")
+            and self.copilot_available
+            and analysis.source != "copilot"
+        )
+        if self.journal and reused != "journal" and not stand_in:
+            self.journal.append(commit, analysis)
+        if self._search is not None:
+            self._search = _index_for_search(self._search, commit, analysis)
+
+        if not self.analyses.spilled and self._pressure("analyze") >= SOFT_PRESSURE:
+            self.memory.spilled += self.analyses.spill()
+        elif self.analyses.spilled:
+            self.memory.spilled += 1
+        self.analyses[position] = analysis
+        self._pending.pop(position, None)
+        self._completed += 1
+        await self._events.put(
+            CommitAnalyzed(
+                index=self._completed,
+                total=self.total,
+                position=position,
+                commit=commit,
+                analysis=analysis,
+                used_fallback=used_fallback,
+                reused=reused,
+            )
+        )
+
+
+async def _one_chunk(commits: list[CommitInfo]) -> AsyncIterator[list[CommitInfo]]:
+    yield commits
+
+
+async def _read_commits(
+    git: ThreadPoolExecutor,
+    repo_path: Path,
+    limit: int,
+    days_back: Optional[int],
+    revisions: Optional[list[str]],
+    deadline: Optional[Deadline] = None,
+    backend: Optional[str] = None,
+) -> AsyncIterator[list[CommitInfo]]:
+    """
+    Recent commits, read chunk by chunk on a run's git thread.
+
+    Reading stops early once the deadline has passed: commits read by then
+    are documented, later ones are not.
+    """
+    loop = asyncio.get_running_loop()
+    chunks = iter_recent_commits(
+        repo_path, limit=limit, days_back=days_back, backend=backend, revisions=revisions
+    )
+    while (chunk := await loop.run_in_executor(git, next, chunks, None)) is not None:
+        current_memory_stats().sample("ingest")
+        yield chunk
+        if deadline and not deadline.remaining():
+            chunks.close()
+            break
+
+
+async def pipeline_events(
+    repo_path: Path,
+    limit: int,
+    days_back: Optional[int],
+    copilot_available: bool,
+    copilot_error: Optional[str] = None,
+    output_path: Optional[Path] = None,
+    cache: Optional[AnalysisCache] = None,
+    deadline: Optional[Deadline] = None,
+    journal: Optional[RunJournal] = None,
+    write_docs: bool = True,
+    workers: int = ANALYSIS_WORKERS,
+    revisions: Optional[list[str]] = None,
+    documentation: Optional[DocumentationResult] = None,
+) -> AsyncIterator[Union[CommitAnalyzed, DocumentationWritten]]:
+    """
+    Analyze recent commits of a repository and write its documentation,
+    streaming results as they arrive.
+
+    Commits are read in chunks, diffed and analyzed by concurrent stages
+    joined by bounded queues: the first analysis starts while older commits
+    are still being read, and a slow consumer (or Copilot) holds back the
+    stages feeding it instead of letting results pile up. Git work runs on
+    the run's own git thread (see git_executor), and the history reports on
+    another, so one event loop serves every run.
+
+    Args:
+        repo_path: Path to the git repository
+        limit: Maximum number of commits to analyze
+        days_back: Optional number of days to look back
+        copilot_available: Whether Copilot CLI can be used
+        copilot_error: Reason Copilot is unavailable (passed to the fallback)
+        output_path: Where to save docs (default: <repo>/DocweaveDocs; required
+            for bare repositories)
+        cache: Optional persistent cache; hits skip analysis entirely and
+            new analyses are stored in it
+        deadline: Optional run deadline. Commits are then analyzed most
+            valuable first (see schedule_order), Copilot timeouts shrink to
+            the time left (minus the synthesis reserve), and the rest fall
+            back to heuristics. Commits not yet read when it passes are
+            left out, and the history reports give up where the synthesis
+            reserve starts (see build_history_reports).
+        journal: Optional run journal; commits it replays are not analyzed
+            again, every other analysis (except heuristics standing in for
+            Copilot) is appended as it completes, and it is compacted once
+            the run completes
+        write_docs: Write the documentation (otherwise it is only generated)
+        workers: Commits analyzed concurrently
+        revisions: Document these commits (newest first, at most `limit`)
+            instead of the most recent ones of HEAD
+        documentation: Repository-level documentation to reuse (see
+            load_documentation); the history reports and synthesis are then
+            skipped and nothing is written
+
+    Yields:
+        A CommitAnalyzed event per commit, in completion order, then one
+        DocumentationWritten event. When no commits are found, its run has
+        no documentation and nothing is written.
+
+    Raises:
+        ValueError: If repo_path is not a valid git repository
+    """
+    repo_name = repo_display_name(repo_path)
+    if write_docs:
+        output_path = output_path or default_output_path(repo_path)
+    prompt_stats = start_prompt_stats()
+    memory = start_memory_stats()
+
+    stages = _AnalysisStages(
+        repo_path, copilot_available, copilot_error, cache, deadline, journal, workers
+    )
+    chunks = _read_commits(
+        stages.git, repo_path, limit, days_back, revisions, deadline, stages.backend
+    )
+    async for event in stages.events(chunks):
+        yield event
+    commits = stages.commits
+    analyses = stages.analyses if stages.analyses.spilled else list(stages.analyses)
+    if not commits:
+        yield DocumentationWritten(
+            DocumentationRun(
+                repo_name=repo_name,
+                output_path=output_path,
+                prompt_stats=prompt_stats,
+                cluster_stats=stages.cluster_stats,
+                memory_stats=memory,
+            )
+        )
+        return
+
+    if documentation is not None:
+        doc_result, write_docs = documentation, False
+    else:
+        # The index update may take a while; it runs on a thread of its own
+        reports = await asyncio.to_thread(
+            build_history_reports, repo_path, commits, repo_name, deadline, stages.reserve
+        )
+        memory.sample("reports")
+        doc_result = await generate_documentation(
+            commits,
+            analyses,
+            repo_name,
+            copilot_available=copilot_available,
+            cochange_diagram=reports.cochange_diagram,
+            hotspots=reports.hotspots_markdown,
+            deadline=deadline,
+        )
+        memory.sample("generate")
+    written: list[Path] = []
+    if write_docs:
+        written = await save_documentation(doc_result, output_path, repo_name)
+        record_docs_path(repo_path, output_path)
+        memory.sample("save")
+    if journal:
+        journal.complete()
+
+    yield DocumentationWritten(
+        DocumentationRun(
+            repo_name=repo_name,
+            output_path=output_path,
+            commits=commits,
+            analyses=analyses,
+            documentation=doc_result,
+            written=written,
+            prompt_stats=prompt_stats,
+            cluster_stats=stages.cluster_stats,
+            memory_stats=memory,
+        )
+    )
+
+
+async def analyze_commits(
+    repo_path: Path,
+    commits: list[CommitInfo],
+    copilot_available: bool,
+    copilot_error: Optional[str] = None,
+    on_commit: Optional[CommitCallback] = None,
+    cache: Optional[AnalysisCache] = None,
+    deadline: Optional[Deadline] = None,
+    journal: Optional[RunJournal] = None,
+    workers: int = ANALYSIS_WORKERS,
+) -> Sequence[CodeAnalysis]:
+    """
+    Analyze each commit, using Copilot when available and heuristics otherwise.
+
+    Commits sharing a patch id (cherry-picks, backports) are analyzed once
+    and reuse the same CodeAnalysis. When Copilot is used, near-duplicate
+    diffs (see components/near_duplicates.py) are clustered as they are
+    analyzed, and only one commit per cluster goes to Copilot; the others
+    derive their analysis from it. Reverts are annotated from the reverted
+    commit's analysis without a Copilot call, so they are handled after the
+    other commits. This runs the analysis stages of pipeline_events over a
+    given list of commits.
+
+    Args:
+        repo_path: Path to the git repository
+        commits: Commits to analyze
+        copilot_available: Whether Copilot CLI can be used
+        copilot_error: Reason Copilot is unavailable (passed to the fallback)
+        on_commit: Optional progress callback invoked after every commit, in
+            completion order (see CommitCallback)
+        cache: Optional persistent cache; hits skip analysis entirely and
+            new analyses are stored in it
+        deadline: Optional run deadline. Commits are then analyzed in
+            schedule_order, Copilot timeouts shrink to the time left (minus
+            the synthesis reserve), and the rest fall back to heuristics.
+        journal: Optional run journal; commits it replays are not analyzed
+            again, and every other analysis (except heuristics standing in
+            for Copilot) is appended as it completes
+        workers: Commits analyzed concurrently
+
+    Every commit is added to the repository's search index (see
+    features/search_index.py) as soon as its analysis is known.
+
+    Returns:
+        List of CodeAnalysis objects, in the same order as commits
+    """
+    stages = _AnalysisStages(
+        repo_path, copilot_available, copilot_error, cache, deadline, journal, workers
+    )
+    async for event in stages.events(_one_chunk(commits)):
+        if on_commit:
+            on_commit(
+                event.index,
+                len(commits),
+                event.commit,
+                event.analysis,
+                event.used_fallback,
+                event.position,
+            )
+    return stages.analyses if stages.analyses.spilled else list(stages.analyses)
+
+
+async def run_documentation(
+    repo_path: Path,
+    limit: int,
+    days_back: Optional[int],
+    copilot_available: bool,
+    copilot_error: Optional[str] = None,
+    output_path: Optional[Path] = None,
+    on_commit: Optional[CommitCallback] = None,
+    cache: Optional[AnalysisCache] = None,
+    deadline: Optional[Deadline] = None,
+    journal: Optional[RunJournal] = None,
+    revisions: Optional[list[str]] = None,
+    documentation: Optional[DocumentationResult] = None,
+) -> DocumentationRun:
+    """
+    Analyze recent commits of a repository and write its documentation.
+
+    Consumes pipeline_events; see there for the arguments.
+
+    Args:
+        on_commit: Optional per-commit progress callback, in completion
+            order (see CommitCallback); `total` is the limit until every
+            commit has been read
+
+    Returns:
+        DocumentationRun describing what was analyzed and written. When no
+        commits are found, documentation is None and nothing is written.
+    """
+    events = pipeline_events(
+        repo_path,
+        limit,
+        days_back,
+        copilot_available,
+        copilot_error,
+        output_path=output_path,
+        cache=cache,
+        deadline=deadline,
+        journal=journal,
+        revisions=revisions,
+        documentation=documentation,
+    )
+    # Closed on return, rather than left for the garbage collector
+    async with aclosing(events):
+        async for event in events:
+            if isinstance(event, DocumentationWritten):
+                return event.run
+            if on_commit:
+                on_commit(
+                    event.index,
+                    event.total or limit,
+                    event.commit,
+                    event.analysis,
+                    event.used_fallback,
+                    event.position,
+                )
+    raise RuntimeError("pipeline ended without documentation")
@@ -0,0 +1,122 @@
+"""Feature: Locate repositories (work trees, bare mirrors, shallow clones).
+
+Only git plumbing is used here (no GitPython), so the CLI can resolve
+repositories before it imports anything heavy.
+"""
+
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+from docweave.components.index_storage import state_dir
+
+DOCS_DIRNAME = "DocweaveDocs"
+# File in a repository's state directory naming where its docs were last written
+DOCS_PATH_FILE = "docs_path"
+
+
+def _rev_parse(repo_path: Path, *args: str) -> Optional[list[str]]:
+    result = subprocess.run(
+        ["git", "-C", str(repo_path), "rev-parse", *args],
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.splitlines() if result.returncode == 0 else None
+
+
+def find_repo_root(path: Path) -> Optional[Path]:
+    """
+    The repository containing path.
+
+    Returns:
+        The top level of the work tree, or the repository directory itself
+        for a bare repository (e.g. a `--mirror` clone); None if path is
+        not inside a git repository
+    """
+    info = _rev_parse(path, "--is-bare-repository", "--absolute-git-dir")
+    if not info or len(info) < 2:
+        return None
+    if info[0] == "true":
+        return Path(info[1])
+    top = _rev_parse(path, "--show-toplevel")
+    return Path(top[0]) if top else None
+
+
+def is_bare_repository(repo_path: Path) -> bool:
+    """Whether the repository has no working tree."""
+    return _rev_parse(repo_path, "--is-bare-repository") == ["true"]
+
+
+def looks_like_repository(path: Path) -> bool:
+    """Cheap check, without running git: a work tree or a bare repository directory."""
+    return (path / ".git").exists() or (
+        (path / "HEAD").is_file() and (path / "objects").is_dir() and (path / "refs").is_dir()
+    )
+
+
+def repo_display_name(repo_path: Path) -> str:
+    """Name used in generated docs: the directory name without a `.git` suffix."""
+    name = repo_path.name
+    if name.endswith(".git") and len(name) > 4:
+        name = name[:-4]
+    return name or "repository"
+
+
+def default_output_path(repo_path: Path) -> Path:
+    """
+    Where documentation goes when no output directory is given.
+
+    Raises:
+        ValueError: For a bare repository, which has no working tree to hold
+            DocweaveDocs/
+    """
+    if is_bare_repository(repo_path):
+        raise ValueError(
+            f"{repo_path} is a bare repository; give an output directory for its documentation"
+        )
+    return repo_path / DOCS_DIRNAME
+
+
+def record_docs_path(repo_path: Path, docs_path: Path) -> None:
+    """Remember where a run wrote the repository's documentation (see docs_location)."""
+    (state_dir(repo_path) / DOCS_PATH_FILE).write_text(f"{docs_path.resolve()}\n")
+
+
+def docs_location(repo_path: Path) -> Path:
+    """
+    Where the documentation of a repository is read from.
+
+    That is the directory its last documentation run wrote to (so docs of a
+    bare repository, or written with an output directory, are found), else
+    default_output_path. Nothing is created.
+
+    Raises:
+        ValueError: For a bare repository whose documentation was never written
+    """
+    try:
+        recorded = (state_dir(repo_path, create=False) / DOCS_PATH_FILE).read_text().strip()
+    except (OSError, ValueError):
+        recorded = ""
+    return Path(recorded) if recorded else default_output_path(repo_path)
+
+
+def shallow_boundary(repo_path: Path) -> frozenset[str]:
+    """
+    Commits at the boundary of a shallow clone.
+
+    Their parents were not fetched, so git shows them as root commits. They
+    must not be diffed, or every file in the tree would look newly added.
+
+    Returns:
+        Full SHAs of the boundary commits (empty for a complete clone)
+    """
+    info = _rev_parse(repo_path, "--git-common-dir")
+    if not info:
+        return frozenset()
+    common_dir = Path(info[0])
+    if not common_dir.is_absolute():
+        common_dir = repo_path / common_dir
+    try:
+        return frozenset((common_dir / "shallow").read_text().split())
+    except FileNotFoundError:
+        return frozenset()
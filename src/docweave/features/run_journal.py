@@ -0,0 +1,131 @@
+"""Feature: Append-only journal of per-commit analyses for resumable runs."""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from docweave.components.index_storage import state_dir
+from docweave.types.models import CodeAnalysis, CommitInfo
+
+JOURNAL_FILE = "run-journal.ndjson"
+# fsync after this many records or this many seconds, whichever comes first
+FSYNC_EVERY = 8
+FSYNC_INTERVAL_SECONDS = 1.0
+
+
+class RunJournal:
+    """
+    Records each completed commit analysis as one NDJSON line.
+
+    Lines are flushed as they are written, so they survive the process
+    being killed; fsync is batched (every FSYNC_EVERY records or
+    FSYNC_INTERVAL_SECONDS) to also survive a machine crash without paying
+    for a sync per commit. A torn final line from a crash is ignored on
+    replay, and ended so that records appended after it load. Entries are
+    matched on SHA and patch id, so a rewritten commit is analyzed again,
+    and the order they were written in (completion order, reverts last)
+    does not matter.
+    """
+
+    def __init__(self, path: Path, replay: bool = False) -> None:
+        """
+        Open the journal for appending.
+
+        Args:
+            path: Journal file
+            replay: Load entries left by an interrupted run so get() can
+                return them (and keep them, in case this run is interrupted
+                as well); otherwise the journal starts empty
+        """
+        self.path = path
+        self.replayed: dict[str, tuple[str, CodeAnalysis]] = self._load() if replay else {}
+        self._file = open(path, "a" if replay else "w", encoding="utf-8")
+        if replay and self._file.tell() and not self._ends_line():
+            # End a line torn by a crash, so the next record is not glued to it
+            self._file.write("\n")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    @classmethod
+    def for_repo(cls, repo_path: Path, replay: bool = False) -> "RunJournal":
+        """Open the journal stored in the repository's DocWeave state directory."""
+        return cls(state_dir(repo_path) / JOURNAL_FILE, replay=replay)
+
+    def _load(self) -> dict[str, tuple[str, CodeAnalysis]]:
+        entries: dict[str, tuple[str, CodeAnalysis]] = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        entries[record["sha"]] = (
+                            record.get("patch_id", ""),
+                            CodeAnalysis(**record["analysis"]),
+                        )
+                    except (ValueError, KeyError, TypeError):
+                        continue  # torn or foreign line
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _ends_line(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def get(self, commit: CommitInfo) -> Optional[CodeAnalysis]:
+        """The replayed analysis of a commit, if the interrupted run finished it."""
+        entry = self.replayed.get(commit.sha)
+        if entry is None or entry[0] != commit.patch_id:
+            return None
+        return entry[1]
+
+    def append(self, commit: CommitInfo, analysis: CodeAnalysis) -> None:
+        """Record a completed analysis (callers leave out stand-in heuristics)."""
+        record = {
+            "sha": commit.sha,
+            "patch_id": commit.patch_id,
+            "analysis": {
+                "summary": analysis.summary,
+                "why": analysis.why,
+                "next_steps": analysis.next_steps,
+                "importance": analysis.importance,
+                "source": analysis.source,
+            },
+        }
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._unsynced += 1
+        if (
+            self._unsynced >= FSYNC_EVERY
+            or time.monotonic() - self._last_sync >= FSYNC_INTERVAL_SECONDS
+        ):
+            self.sync()
+
+    def sync(self) -> None:
+        """Force written records to disk."""
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        """Sync and close; the journal stays on disk for --resume."""
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def complete(self) -> None:
+        """
+        Compact the journal after a successful run.
+
+        The analyses are in the written documentation by then, so nothing
+        needs replaying: the file is removed.
+        """
+        self.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
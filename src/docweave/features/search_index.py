@@ -0,0 +1,295 @@
+"""Feature: Persistent full-text search over analyzed commits.
+
+Every analysis the pipeline produces (or reuses from the cache or a run
+journal) is indexed with its commit: message, summary, why, next steps,
+changed paths and author go into an SQLite FTS5 table, and the filterable
+columns (date, author, importance, paths) into ordinary indexed tables.
+Queries are ranked with bm25 and filtered in the same statement.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from docweave.components.index_storage import (
+    open_index_db,
+    open_index_db_read_only,
+    state_dir,
+)
+from docweave.components.run_settings import current_settings
+from docweave.types.models import CodeAnalysis, CommitInfo
+
+SEARCH_INDEX_ENV = "DOCWEAVE_SEARCH_INDEX"
+INDEX_FILE = "search.sqlite"
+DEFAULT_LIMIT = 20
+# bm25 weights of the FTS columns: message, summary, why, next_steps, paths, author
+_WEIGHTS = (4.0, 3.0, 1.5, 1.0, 2.0, 1.0)
+# Sorts after any path sharing a prefix (range scans for path prefixes)
+_MAX_CHAR = "\U0010ffff"
+# Quoted phrases, or runs of non-space characters
+_TOKEN_RE = re.compile(r'"[^"]*"?|\S+')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    sha TEXT NOT NULL UNIQUE,
+    digest TEXT NOT NULL,
+    date INTEGER NOT NULL,
+    author TEXT NOT NULL,
+    importance TEXT NOT NULL,
+    title TEXT NOT NULL,
+    summary TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_by_date ON docs (date);
+CREATE INDEX IF NOT EXISTS docs_by_author ON docs (author COLLATE NOCASE, date);
+CREATE TABLE IF NOT EXISTS doc_paths (
+    path TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    PRIMARY KEY (path, id)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+    message, summary, why, next_steps, paths, author,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+def _epoch(moment: datetime) -> int:
+    """Seconds since the epoch, reading a naive datetime as UTC like the hit dates."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+@dataclass
+class SearchHit:
+    """One matching commit."""
+
+    sha: str
+    date: datetime
+    author: str
+    importance: str
+    title: str
+    summary: str
+    snippet: str  # Best matching fragment, matches in [brackets] ("" without a query)
+    score: float  # bm25 relevance, higher is better (0.0 without a query)
+
+
+def to_match_query(text: str) -> str:
+    """
+    Turn free text into an FTS5 query that cannot be a syntax error.
+
+    Words (and "quoted phrases") must all match; `word*` matches a prefix
+    and a bare `OR` between terms matches either.
+    """
+    terms: list[str] = []
+    for token in _TOKEN_RE.findall(text):
+        if token == "OR":
+            if terms and terms[-1] != "OR":
+                terms.append(token)
+            continue
+        prefix = token.endswith("*") and not token.startswith('"')
+        body = token.strip('"').rstrip("*") if prefix else token.strip('"')
+        if body.strip():
+            terms.append('"' + body.replace('"', '""') + '"' + ("*" if prefix else ""))
+    if terms and terms[-1] == "OR":
+        terms.pop()
+    return " ".join(terms)
+
+
+def search_indexing(enabled: Optional[bool] = None) -> bool:
+    """
+    Whether documentation runs add the commits they analyze to the index.
+
+    Args:
+        enabled: Explicit choice; defaults to --search-index/--no-search-index,
+            then $DOCWEAVE_SEARCH_INDEX ("off" turns indexing off), then on
+    """
+    if enabled is None:
+        enabled = current_settings().search_index
+    if enabled is None:
+        enabled = os.environ.get(SEARCH_INDEX_ENV, "").lower() not in ("off", "0", "false")
+    return enabled
+
+
+class SearchIndex:
+    """
+    Ranked, filterable full-text search over commit analyses.
+
+    Updated one commit at a time as analyses are produced; a commit whose
+    message, analysis and files did not change is not rewritten.
+    """
+
+    def __init__(self, db_path: Path, read_only: bool = False) -> None:
+        """
+        Args:
+            db_path: Index database, created unless read_only
+            read_only: Only search an existing index
+
+        Raises:
+            FileNotFoundError: If read_only and there is no index yet
+        """
+        self.db_path = db_path
+        if read_only:
+            self.conn = open_index_db_read_only(db_path)
+        else:
+            self.conn = open_index_db(db_path)
+            self.conn.executescript(_SCHEMA)
+
+    @classmethod
+    def for_repo(cls, repo_path: Path, read_only: bool = False) -> "SearchIndex":
+        """
+        Open the index stored in the repository's DocWeave state directory.
+
+        With read_only, nothing is created (see __init__).
+        """
+        directory = state_dir(repo_path, create=not read_only)
+        return cls(directory / INDEX_FILE, read_only)
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        self.conn.close()
+
+    def count(self) -> int:
+        """Number of indexed commits."""
+        return self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def add(self, commit: CommitInfo, analysis: CodeAnalysis) -> bool:
+        """
+        Index (or re-index) a commit and its analysis.
+
+        Returns:
+            True if the index changed
+        """
+        fields = {
+            "message": commit.message,
+            "summary": analysis.summary,
+            "why": analysis.why,
+            "next_steps": "\n".join(analysis.next_steps),
+            "paths": "\n".join(commit.files_changed),
+            "author": commit.author,
+            "importance": analysis.importance,
+            "date": int(commit.date.timestamp()),
+        }
+        digest = hashlib.sha1(json.dumps(fields, sort_keys=True).encode()).hexdigest()
+        row = self.conn.execute("SELECT id, digest FROM docs WHERE sha = ?", (commit.sha,))
+        existing = row.fetchone()
+        if existing and existing[1] == digest:
+            return False
+
+        with self.conn:
+            if existing:
+                doc_id = existing[0]
+                self.conn.execute("DELETE FROM docs_fts WHERE rowid = ?", (doc_id,))
+                self.conn.execute("DELETE FROM doc_paths WHERE id = ?", (doc_id,))
+                self.conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+            cur = self.conn.execute(
+                "INSERT INTO docs (sha, digest, date, author, importance, title, summary) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    commit.sha,
+                    digest,
+                    fields["date"],
+                    commit.author,
+                    analysis.importance,
+                    commit.message.split("\n")[0],
+                    analysis.summary,
+                ),
+            )
+            doc_id = cur.lastrowid
+            self.conn.execute(
+                "INSERT INTO docs_fts (rowid, message, summary, why, next_steps, paths, author) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    doc_id,
+                    *(fields[k] for k in ("message", "summary", "why", "next_steps")),
+                    fields["paths"],
+                    fields["author"],
+                ),
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO doc_paths (path, id) VALUES (?, ?)",
+                ((path, doc_id) for path in commit.files_changed),
+            )
+        return True
+
+    def search(
+        self,
+        query: str = "",
+        importance: Optional[list[str]] = None,
+        author: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        path_prefix: Optional[str] = None,
+        limit: int = DEFAULT_LIMIT,
+    ) -> list[SearchHit]:
+        """
+        Find commits matching a query and filters.
+
+        Args:
+            query: Free text (see to_match_query); empty lists the filtered
+                commits newest first
+            importance: Only these importance levels
+            author: Only this author (case-insensitive)
+            since: Only commits at or after this time (UTC if naive)
+            until: Only commits before this time (UTC if naive)
+            path_prefix: Only commits touching a path starting with this
+            limit: Maximum hits
+
+        Returns:
+            Hits, best match first (newest first without a query), dated in UTC
+        """
+        where: list[str] = []
+        params: list = []
+        if importance:
+            where.append(f"d.importance IN ({', '.join('?' * len(importance))})")
+            params += importance
+        if author:
+            where.append("d.author = ? COLLATE NOCASE")
+            params.append(author)
+        if since:
+            where.append("d.date >= ?")
+            params.append(_epoch(since))
+        if until:
+            where.append("d.date < ?")
+            params.append(_epoch(until))
+        if path_prefix:
+            where.append("d.id IN (SELECT id FROM doc_paths WHERE path >= ? AND path < ?)")
+            params += [path_prefix, path_prefix + _MAX_CHAR]
+
+        columns = "d.sha, d.date, d.author, d.importance, d.title, d.summary"
+        match = to_match_query(query)
+        if match:
+            rank = f"bm25(docs_fts, {', '.join(map(str, _WEIGHTS))})"
+            sql = (
+                f"SELECT {columns}, snippet(docs_fts, -1, '[', ']', '...', 12), -{rank} "
+                "FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid "
+                f"WHERE docs_fts MATCH ? {''.join(' AND ' + w for w in where)} "
+                f"ORDER BY {rank} LIMIT ?"
+            )
+            params = [match, *params]
+        else:
+            sql = (
+                f"SELECT {columns}, '', 0.0 FROM docs d "
+                f"{'WHERE ' + ' AND '.join(where) if where else ''} "
+                "ORDER BY d.date DESC LIMIT ?"
+            )
+        rows = self.conn.execute(sql, (*params, limit)).fetchall()
+        return [
+            SearchHit(sha, datetime.fromtimestamp(date, timezone.utc), *rest)
+            for sha, date, *rest in rows
+        ]
+
+
+def open_search_index(repo_path: Path) -> Optional[SearchIndex]:
+    """The repository's search index, or None if it cannot be opened."""
+    try:
+        return SearchIndex.for_repo(repo_path)
+    except (sqlite3.Error, OSError, ValueError):
+        return None
@@ -0,0 +1,80 @@
+"""Feature: Coalesce identical concurrent analysis requests."""
+
+import asyncio
+from pathlib import Path
+from typing import Awaitable, Callable, Hashable, Optional, TypeVar
+
+from docweave.features.history_stream import head_sha
+
+T = TypeVar("T")
+
+
+def analysis_key(
+    repo_path: Path, limit: int, days_back: Optional[int], output_path: Optional[Path] = None
+) -> tuple:
+    """
+    Identity of an analysis request.
+
+    Two requests with the same key produce the same documentation in the
+    same place: same repository (by resolved path), same HEAD commit, same
+    commit selection (limit and days_back; the API has no revision-range
+    option) and same output directory. Pass the repository root (see
+    repo_location.find_repo_root), so that requests naming a directory
+    inside the repository get the same key.
+    """
+    repo_path = repo_path.resolve()
+    output = str(output_path.resolve()) if output_path else None
+    return (str(repo_path), head_sha(repo_path), limit, days_back, output)
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers share it.
+
+    The first caller for a key starts the work and later callers await the
+    same result (or exception) instead of repeating it. Once the call
+    finishes the key is forgotten, so the next request runs afresh.
+    Coalescing is per process (per event loop); cross-process writers are
+    serialized separately by the documentation write lock.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        # Callers still awaiting each running call
+        self._waiters: dict[asyncio.Task, int] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Whether a call for key is currently running."""
+        return key in self._inflight
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """
+        Run fn for key, or join the call already running for it.
+
+        The call runs in a task of its own, which every caller awaits
+        shielded: a cancelled caller (e.g. a disconnected client), even the
+        one that started it, leaves it running for the others. It is
+        cancelled only once no caller is left waiting for it.
+
+        Returns:
+            (result, shared): shared is True when this caller joined an
+            existing call rather than starting one
+        """
+        task = self._inflight.get(key)
+        shared = task is not None
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._forget(key, done))
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task), shared
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    task.cancel()
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
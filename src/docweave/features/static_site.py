@@ -0,0 +1,363 @@
+"""Feature: Static HTML documentation site, rebuilt incrementally.
+
+Pages:
+- index.html: narrative, next steps, commits, author and directory tables
+- diagrams.html
+- commits/<sha>.html
+- authors/<slug>.html
+- dirs/<slug>.html
+
+Each page's inputs are hashed, and the hashes kept in .site-manifest.json.
+A rebuild renders and writes only the pages whose inputs changed, and
+deletes pages that no longer exist. One new commit therefore touches its
+own page, the index, and its author and directory pages.
+
+Mermaid diagrams are rendered to SVG with mermaid-cli (`mmdc`) when it is
+installed. Each SVG is stored under its content hash, so it is rendered
+once rather than on every page view. Without mmdc, the diagrams page falls
+back to client-side rendering.
+"""
+
+import hashlib
+import html
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from dataclasses import asdict, dataclass, field, is_dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from docweave.components.activity_rollups import RollupRow, compute_rollups, top_directory
+from docweave.types.models import CodeAnalysis, CommitInfo, DocumentationRun
+
+# Bump when page templates change: every page is rebuilt once
+SITE_VERSION = 1
+MANIFEST_FILE = ".site-manifest.json"
+MERMAID_JS = "https://cdn.jsdelivr.net/npm/mermaid@10/dist/mermaid.min.js"
+# Seconds allowed for one `mmdc` render
+MMDC_TIMEOUT = 60
+_MERMAID_RE = re.compile(r"```mermaid\n(.*?)```", re.S)
+
+_CSS = """\
+body { font: 15px/1.5 system-ui, sans-serif; max-width: 960px; margin: 2em auto; }
+body { padding: 0 1em; color: #222; }
+a { color: #0b5cad; text-decoration: none; } a:hover { text-decoration: underline; }
+nav { margin-bottom: 1.5em; } nav a { margin-right: 1em; }
+table { border-collapse: collapse; width: 100%; margin: 1em 0; }
+th, td { text-align: left; padding: .3em .6em; border-bottom: 1px solid #ddd; }
+td.num { text-align: right; } code, .sha { font-family: ui-monospace, monospace; }
+.importance-high { color: #b00020; font-weight: 600; } .importance-low { color: #777; }
+.diagram { max-width: 100%; margin: 1em 0; }
+"""
+
+
+@dataclass
+class SiteBuild:
+    """Outcome of a site build."""
+
+    site_dir: Path
+    written: list[Path] = field(default_factory=list)
+    removed: list[Path] = field(default_factory=list)
+    unchanged: int = 0
+
+
+@dataclass
+class _Page:
+    """A page to build: its path, what it depends on and how to render it."""
+
+    path: str  # Relative to the site directory
+    inputs: Any  # JSON-serializable or dataclasses; the page is rebuilt when its hash changes
+    render: Callable[[], str]
+
+
+def _slug(text: str) -> str:
+    """File-name-safe, collision-free name for an author or directory."""
+    base = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:40] or "x"
+    return f"{base}-{hashlib.sha1(text.encode()).hexdigest()[:6]}"
+
+
+def _jsonable(value: Any) -> Any:
+    """JSON form of page inputs: dataclasses by their fields, anything else (dates) as text."""
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    return str(value)
+
+
+def _digest(inputs: Any) -> str:
+    payload = json.dumps([SITE_VERSION, inputs], sort_keys=True, default=_jsonable)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _esc(value: Any) -> str:
+    return html.escape(str(value))
+
+
+def _layout(repo_name: str, title: str, body: str, depth: int, mermaid: bool = False) -> str:
+    """Wrap page content; depth is the page's directory depth below the site root."""
+    up = "../" * depth
+    script = (
+        f'<script src="{MERMAID_JS}"></script>'
+        "<script>mermaid.initialize({startOnLoad: true});</script>"
+        if mermaid
+        else ""
+    )
+    return (
+        "<!DOCTYPE html>\n<html lang=\"en\"><head><meta charset=\"utf-8\">"
+        f"<title>{_esc(title)} - {_esc(repo_name)}</title>"
+        f'<link rel="stylesheet" href="{up}site.css"></head><body>'
+        f'<nav><a href="{up}index.html">{_esc(repo_name)}</a>'
+        f'<a href="{up}diagrams.html">Diagrams</a></nav>'
+        f"<h1>{_esc(title)}</h1>\n{body}\n{script}</body></html>\n"
+    )
+
+
+def _paragraphs(text: str) -> str:
+    return "".join(
+        f"<p>{_esc(p.strip())}</p>" for p in re.split(r"\n\s*\n", text) if p.strip()
+    )
+
+
+def _row(commit: CommitInfo, analysis: CodeAnalysis) -> dict:
+    """The fields of a commit shown in lists (and hashed for list pages)."""
+    return {
+        "sha": commit.sha,
+        "title": commit.message.split("\n")[0][:100],
+        "date": commit.date.strftime("%Y-%m-%d"),
+        "author": commit.author,
+        "importance": analysis.importance,
+    }
+
+
+def _commit_table(rows: list[dict], depth: int) -> str:
+    up = "../" * depth
+    lines = [
+        "<table><tr><th>Commit</th><th>Date</th><th>Author</th>"
+        "<th>Importance</th><th>Title</th></tr>"
+    ]
+    for r in rows:
+        lines.append(
+            f'<tr><td class="sha"><a href="{up}commits/{_esc(r["sha"])}.html">{_esc(r["sha"])}</a>'
+            f'</td><td>{_esc(r["date"])}</td>'
+            f'<td><a href="{up}authors/{_slug(r["author"])}.html">{_esc(r["author"])}</a></td>'
+            f'<td class="importance-{_esc(r["importance"])}">{_esc(r["importance"])}</td>'
+            f'<td>{_esc(r["title"])}</td></tr>'
+        )
+    lines.append("</table>")
+    return "\n".join(lines)
+
+
+def _rollup_table(rows: list[RollupRow], kind: str, label: str) -> str:
+    lines = [
+        f"<table><tr><th>{label}</th><th>Commits</th><th>+Lines</th><th>-Lines</th>"
+        "<th>High/Medium/Low</th></tr>"
+    ]
+    for r in rows:
+        lines.append(
+            f'<tr><td><a href="{kind}/{_slug(r.key)}.html">{_esc(r.key)}</a></td>'
+            f'<td class="num">{r.commits}</td><td class="num">{r.additions}</td>'
+            f'<td class="num">{r.deletions}</td><td>{r.high}/{r.medium}/{r.low}</td></tr>'
+        )
+    lines.append("</table>")
+    return "\n".join(lines)
+
+
+def _commit_page(repo_name: str, commit: CommitInfo, analysis: CodeAnalysis) -> str:
+    title = commit.message.split("\n")[0][:100]
+    dirs = dict.fromkeys(top_directory(p) for p in commit.files_changed)
+    files = "".join(f"<li><code>{_esc(p)}</code></li>" for p in commit.files_changed)
+    steps = "".join(f"<li>{_esc(s)}</li>" for s in analysis.next_steps)
+    body = [
+        f'<p><span class="sha">{_esc(commit.sha)}</span> · {commit.date:%Y-%m-%d %H:%M} · '
+        f'<a href="../authors/{_slug(commit.author)}.html">{_esc(commit.author)}</a> · '
+        f'<span class="importance-{_esc(analysis.importance)}">{_esc(analysis.importance)}</span>'
+        f" · +{commit.additions}/-{commit.deletions}</p>",
+        f"<pre>{_esc(commit.message)}</pre>",
+        f"<h2>Summary</h2>{_paragraphs(analysis.summary)}",
+        f"<h2>Why</h2>{_paragraphs(analysis.why)}",
+    ]
+    if commit.reverts:
+        body.append(f'<p>Reverts <span class="sha">{_esc(commit.reverts)}</span>.</p>')
+    if steps:
+        body.append(f"<h2>Next steps</h2><ul>{steps}</ul>")
+    if dirs:
+        links = ", ".join(f'<a href="../dirs/{_slug(d)}.html">{_esc(d)}</a>' for d in dirs)
+        body.append(f"<h2>Files</h2><p>{links}</p><ul>{files}</ul>")
+    body.append(f"<p><small>Analysis: {_esc(analysis.source)}</small></p>")
+    return _layout(repo_name, title, "\n".join(body), depth=1)
+
+
+def find_mmdc() -> Optional[str]:
+    """Path of mermaid-cli's `mmdc`, if installed."""
+    return shutil.which("mmdc")
+
+
+def _render_svg(mmdc: str, source: str, target: Path) -> bool:
+    """Render one Mermaid diagram to an SVG file; False if mmdc failed."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "diagram.mmd"
+        src.write_text(source)
+        try:
+            result = subprocess.run(
+                [mmdc, "-i", str(src), "-o", str(target), "--quiet"],
+                capture_output=True,
+                timeout=MMDC_TIMEOUT,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+    return result.returncode == 0 and target.exists()
+
+
+def build_site(
+    run: DocumentationRun, site_dir: Path, mmdc: Optional[str] = None
+) -> SiteBuild:
+    """
+    Build or update the static site for a documentation run.
+
+    Args:
+        run: A finished documentation run (commits, analyses and the
+            repository-level documentation)
+        site_dir: Directory holding the site
+        mmdc: Path of mermaid-cli to pre-render diagrams with (None to use
+            client-side rendering)
+
+    Returns:
+        SiteBuild listing the files written and removed
+    """
+    build = SiteBuild(site_dir=site_dir)
+    repo_name = run.repo_name
+    doc = run.documentation
+    pairs = list(zip(run.commits, run.analyses))
+    rows = [_row(c, a) for c, a in pairs]
+    rollups = compute_rollups(run.commits, run.analyses)
+
+    by_author: dict[str, list[dict]] = {}
+    by_dir: dict[str, list[dict]] = {}
+    for (commit, _), row in zip(pairs, rows):
+        by_author.setdefault(commit.author, []).append(row)
+        for d in dict.fromkeys(top_directory(p) for p in commit.files_changed):
+            by_dir.setdefault(d, []).append(row)
+
+    narrative = doc.narrative if doc else ""
+    next_steps = doc.next_steps if doc else []
+    diagrams = [
+        m.group(1) for d in (doc.mermaid_diagrams if doc else []) for m in _MERMAID_RE.finditer(d)
+    ]
+
+    def index() -> str:
+        steps = "".join(f"<li>{_esc(s)}</li>" for s in next_steps)
+        body = [
+            _paragraphs(narrative),
+            f"<h2>Next steps</h2><ol>{steps}</ol>" if steps else "",
+            f"<h2>Commits</h2>{_commit_table(rows, 0)}",
+            f"<h2>Authors</h2>{_rollup_table(rollups.by_author, 'authors', 'Author')}",
+            f"<h2>Directories</h2>{_rollup_table(rollups.by_directory, 'dirs', 'Directory')}",
+        ]
+        return _layout(repo_name, "Development overview", "\n".join(body), depth=0)
+
+    def diagrams_page() -> str:
+        blocks, client_side = [], False
+        for source in diagrams:
+            name = f"diagrams/{hashlib.sha1(source.encode()).hexdigest()[:16]}.svg"
+            target = site_dir / name
+            if mmdc and target.exists():
+                blocks.append(f'<img class="diagram" src="{name}" alt="diagram">')
+            elif mmdc and _render_svg(mmdc, source, target):
+                build.written.append(target)
+                blocks.append(f'<img class="diagram" src="{name}" alt="diagram">')
+            else:
+                client_side = True
+                blocks.append(f'<pre class="mermaid">{_esc(source)}</pre>')
+        return _layout(repo_name, "Diagrams", "\n".join(blocks), depth=0, mermaid=client_side)
+
+    def group_page(
+        title: str, group_rows: list[dict], totals: Optional[RollupRow]
+    ) -> Callable[[], str]:
+        def render() -> str:
+            summary = ""
+            if totals:
+                summary = (
+                    f"<p>{totals.commits} commit(s), +{totals.additions}/-{totals.deletions} "
+                    f"lines, importance {totals.high}/{totals.medium}/{totals.low} "
+                    "(high/medium/low)</p>"
+                )
+            return _layout(repo_name, title, summary + _commit_table(group_rows, 1), depth=1)
+
+        return render
+
+    def commit_page(commit: CommitInfo, analysis: CodeAnalysis) -> Callable[[], str]:
+        return lambda: _commit_page(repo_name, commit, analysis)
+
+    author_rows = {r.key: r for r in rollups.by_author}
+    dir_rows = {r.key: r for r in rollups.by_directory}
+    pages = [
+        _Page("site.css", _CSS, lambda: _CSS),
+        _Page(
+            "index.html",
+            [repo_name, narrative, next_steps, rows, rollups.by_author, rollups.by_directory],
+            index,
+        ),
+        _Page("diagrams.html", [repo_name, diagrams, bool(mmdc)], diagrams_page),
+    ]
+    for commit, analysis in pairs:
+        pages.append(
+            _Page(
+                f"commits/{commit.sha}.html",
+                [repo_name, commit, analysis],
+                commit_page(commit, analysis),
+            )
+        )
+    for author, group in by_author.items():
+        pages.append(
+            _Page(
+                f"authors/{_slug(author)}.html",
+                [repo_name, author, group, author_rows.get(author)],
+                group_page(f"Commits by {author}", group, author_rows.get(author)),
+            )
+        )
+    for directory, group in by_dir.items():
+        pages.append(
+            _Page(
+                f"dirs/{_slug(directory)}.html",
+                [repo_name, directory, group, dir_rows.get(directory)],
+                group_page(f"Commits in {directory}", group, dir_rows.get(directory)),
+            )
+        )
+
+    manifest_path = site_dir / MANIFEST_FILE
+    try:
+        previous: dict[str, str] = json.loads(manifest_path.read_text())["pages"]
+    except (FileNotFoundError, ValueError, KeyError, TypeError):
+        previous = {}
+
+    current: dict[str, str] = {}
+    for page in pages:
+        digest = current[page.path] = _digest(page.inputs)
+        target = site_dir / page.path
+        if previous.get(page.path) == digest and target.exists():
+            build.unchanged += 1
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(page.render())
+        build.written.append(target)
+
+    for stale in sorted(set(previous) - set(current)):
+        target = site_dir / stale
+        if target.exists():
+            target.unlink()
+            build.removed.append(target)
+    # Pre-rendered diagrams are named by content; drop those no longer used
+    used = {f"{hashlib.sha1(s.encode()).hexdigest()[:16]}.svg" for s in diagrams}
+    for svg in (site_dir / "diagrams").glob("*.svg"):
+        if svg.name not in used:
+            svg.unlink()
+            build.removed.append(svg)
+
+    # Written last and atomically: after a crash, pages are rebuilt, never skipped
+    tmp = manifest_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"version": SITE_VERSION, "pages": current}, indent=0))
+    os.replace(tmp, manifest_path)
+    return build
@@ -0,0 +1,403 @@
+"""Feature: Long-running watch mode that regenerates docs when HEAD moves."""
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import re
+import select
+import struct
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Optional, Protocol
+
+from docweave.features.history_stream import head_sha
+from docweave.types.models import DocumentationRun
+
+# Quiet period that ends a burst of ref updates (rebase, pull, `git am`)
+DEBOUNCE_SECONDS = 2.0
+# Never hold a burst back longer than this, even if refs keep changing
+MAX_COALESCE_SECONDS = 30.0
+# How often the polling fallback re-reads HEAD
+POLL_INTERVAL_SECONDS = 2.0
+# How long a Copilot availability check is trusted before probing again
+COPILOT_RECHECK_SECONDS = 600.0
+
+_SHA_RE = re.compile(r"^[0-9a-f]{40}([0-9a-f]{24})?$")
+
+# inotify(7) constants
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = (
+    _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def git_dirs(repo_path: Path) -> tuple[Path, Path]:
+    """
+    Locate a repository's git directories.
+
+    Returns:
+        (git_dir, common_dir): the per-worktree directory holding HEAD, and
+        the shared directory holding refs/ and packed-refs
+
+    Raises:
+        ValueError: If repo_path is not inside a git repository
+    """
+    result = subprocess.run(
+        ["git", "-C", str(repo_path), "rev-parse", "--absolute-git-dir", "--git-common-dir"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise ValueError(f"{repo_path} is not a git repository")
+    git_dir, common_dir = (Path(line) for line in result.stdout.splitlines()[:2])
+    if not common_dir.is_absolute():
+        common_dir = (repo_path / common_dir).resolve()
+    return git_dir, common_dir
+
+
+def _packed_ref(common_dir: Path, ref: str) -> Optional[str]:
+    """Look a ref up in packed-refs."""
+    try:
+        with open(common_dir / "packed-refs") as f:
+            for line in f:
+                sha, _, name = line.rstrip("\n").partition(" ")
+                if name == ref:
+                    return sha
+    except FileNotFoundError:
+        pass
+    return None
+
+
+def read_head_sha(git_dir: Path, common_dir: Path) -> Optional[str]:
+    """
+    Resolve HEAD by reading the ref files directly, without running git.
+
+    Returns:
+        The SHA HEAD points to, or None if it cannot be resolved from files
+        (unborn branch, reftable storage, or a ref being rewritten)
+    """
+    try:
+        value = (git_dir / "HEAD").read_text().strip()
+    except OSError:
+        return None
+    for _ in range(5):  # symbolic refs may chain
+        if not value.startswith("ref: "):
+            break
+        ref = value[5:].strip()
+        try:
+            value = (common_dir / ref).read_text().strip()
+        except FileNotFoundError:
+            value = _packed_ref(common_dir, ref) or ""
+        except OSError:
+            return None
+    return value if _SHA_RE.match(value) else None
+
+
+class RefWatcher(Protocol):
+    """Blocks until HEAD or a ref may have changed."""
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        """Wait up to `timeout` seconds (forever if None); True if refs changed."""
+        ...
+
+    def close(self) -> None:
+        """Release the watcher's resources."""
+        ...
+
+
+class InotifyRefWatcher:
+    """
+    Watches HEAD, packed-refs and every directory under refs/ with inotify.
+
+    The process sleeps in select() between events, so an idle watcher costs
+    no CPU. Git writes `<ref>.lock` and renames it into place; lock files
+    themselves are ignored and the rename is what wakes the watcher.
+    """
+
+    def __init__(self, git_dir: Path, common_dir: Path) -> None:
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: dict[int, Path] = {}
+        self._top_level = {git_dir, common_dir}
+        self._refs_root = common_dir / "refs"
+        for directory in self._top_level:
+            self._add_watch(directory)
+        self._add_tree(self._refs_root)
+
+    def _add_watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(directory), _WATCH_MASK | _IN_ONLYDIR
+        )
+        if wd >= 0:
+            self._dirs[wd] = directory
+
+    def _add_tree(self, root: Path) -> None:
+        for directory, _, _ in os.walk(root):
+            self._add_watch(Path(directory))
+
+    def _relevant(self, directory: Path, name: str, mask: int) -> bool:
+        """Whether an event can affect what HEAD resolves to."""
+        if mask & _IN_Q_OVERFLOW:
+            return True
+        if name.endswith(".lock"):
+            return False
+        if directory in self._top_level:
+            # Only HEAD and packed-refs matter here, not index/ORIG_HEAD/...
+            return name in ("HEAD", "packed-refs") or (name == "refs" and bool(mask & _IN_ISDIR))
+        return True
+
+    def _drain(self) -> bool:
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset : offset + length].rstrip(b"\0").decode(errors="replace")
+                offset += length
+                directory = self._dirs.get(wd)
+                if mask & _IN_Q_OVERFLOW:
+                    changed = True
+                    continue
+                if directory is None:
+                    continue
+                if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                    new_dir = directory / name
+                    if new_dir == self._refs_root or self._refs_root in new_dir.parents:
+                        self._add_tree(new_dir)
+                if self._relevant(directory, name, mask):
+                    changed = True
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        """Block in select() until a relevant event arrives or the timeout expires."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready:
+                return False
+            if self._drain():
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+    def close(self) -> None:
+        """Close the inotify descriptor."""
+        os.close(self._fd)
+
+
+class PollingRefWatcher:
+    """Fallback watcher that re-reads HEAD every few seconds."""
+
+    def __init__(
+        self, git_dir: Path, common_dir: Path, interval: float = POLL_INTERVAL_SECONDS
+    ) -> None:
+        self._git_dir = git_dir
+        self._common_dir = common_dir
+        self._interval = interval
+        self._last = self._snapshot()
+
+    def _snapshot(self) -> tuple:
+        head = read_head_sha(self._git_dir, self._common_dir)
+        if head:
+            return (head,)
+        # Not resolvable from files (e.g. reftable): fall back to mtimes
+        stamps = []
+        candidates = (
+            self._git_dir / "HEAD",
+            self._common_dir / "packed-refs",
+            self._common_dir / "reftable",
+        )
+        for path in candidates:
+            try:
+                stamps.append(path.stat().st_mtime_ns)
+            except FileNotFoundError:
+                stamps.append(0)
+        return tuple(stamps)
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        """Poll until HEAD changes or the timeout expires."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = self._interval if deadline is None else deadline - time.monotonic()
+            time.sleep(max(0.0, min(self._interval, remaining)))
+            snapshot = self._snapshot()
+            if snapshot != self._last:
+                self._last = snapshot
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+def open_ref_watcher(
+    repo_path: Path, use_inotify: bool = True, poll_interval: float = POLL_INTERVAL_SECONDS
+) -> RefWatcher:
+    """
+    Create the best available watcher for a repository.
+
+    Uses inotify on Linux and falls back to polling elsewhere or when
+    inotify cannot be initialized (e.g. the watch limit is exhausted).
+    """
+    git_dir, common_dir = git_dirs(repo_path)
+    if use_inotify and sys.platform.startswith("linux"):
+        try:
+            return InotifyRefWatcher(git_dir, common_dir)
+        except (OSError, AttributeError):
+            pass
+    return PollingRefWatcher(git_dir, common_dir, poll_interval)
+
+
+class WatchDaemon:
+    """
+    Keeps DocweaveDocs/ in sync with a repository's HEAD.
+
+    Everything expensive to set up stays warm between regenerations: the
+    event loop, the GitPython repository handle, the analysis cache (with
+    its in-memory copy) and the Copilot availability check. A regeneration
+    therefore only sends new commits to Copilot and only rewrites outputs
+    whose content changed.
+    """
+
+    def __init__(
+        self,
+        repo_path: Path,
+        limit: int = 5,
+        days_back: Optional[int] = None,
+        output_path: Optional[Path] = None,
+        debounce: float = DEBOUNCE_SECONDS,
+        use_inotify: bool = True,
+        poll_interval: float = POLL_INTERVAL_SECONDS,
+    ) -> None:
+        self.repo_path = repo_path
+        self.limit = limit
+        self.days_back = days_back
+        self.output_path = output_path
+        self.debounce = debounce
+        self.git_dir, self.common_dir = git_dirs(repo_path)
+        self.watcher = open_ref_watcher(repo_path, use_inotify, poll_interval)
+        self.last_sha: Optional[str] = None
+        self._copilot: Optional[tuple[bool, Optional[str]]] = None
+        self._copilot_checked_at = 0.0
+        self._loop = asyncio.new_event_loop()
+        self._cache = None
+
+    @property
+    def uses_inotify(self) -> bool:
+        """Whether changes are detected with inotify rather than polling."""
+        return isinstance(self.watcher, InotifyRefWatcher)
+
+    def current_head(self) -> Optional[str]:
+        """SHA of HEAD, read from ref files when possible."""
+        return read_head_sha(self.git_dir, self.common_dir) or head_sha(self.repo_path)
+
+    async def _copilot_state(self) -> tuple[bool, Optional[str]]:
+        """Copilot availability, re-probed at most every COPILOT_RECHECK_SECONDS."""
+        from docweave.lib.copilot_check import check_copilot_cli_installed
+
+        now = time.monotonic()
+        if self._copilot is None or now - self._copilot_checked_at > COPILOT_RECHECK_SECONDS:
+            self._copilot = await check_copilot_cli_installed()
+            self._copilot_checked_at = now
+        return self._copilot
+
+    async def _regenerate(self) -> DocumentationRun:
+        from docweave.features.analysis_cache import AnalysisCache
+        from docweave.features.pipeline import run_documentation
+
+        if self._cache is None:
+            self._cache = AnalysisCache.for_repo(self.repo_path)
+        copilot_available, copilot_error = await self._copilot_state()
+        return await run_documentation(
+            self.repo_path,
+            limit=self.limit,
+            days_back=self.days_back,
+            copilot_available=copilot_available,
+            copilot_error=copilot_error,
+            output_path=self.output_path,
+            cache=self._cache,
+        )
+
+    def regenerate(self) -> Optional[DocumentationRun]:
+        """
+        Regenerate documentation if HEAD moved since the last run.
+
+        Returns:
+            The DocumentationRun, or None if HEAD is unchanged or unborn
+        """
+        sha = self.current_head()
+        if sha is None or sha == self.last_sha:
+            return None
+        run = self._loop.run_until_complete(self._regenerate())
+        self.last_sha = sha
+        return run
+
+    def _wait_for_quiet(self) -> None:
+        """Absorb a burst of ref updates until refs stay quiet for `debounce`."""
+        started = time.monotonic()
+        while time.monotonic() - started < MAX_COALESCE_SECONDS:
+            if not self.watcher.wait(self.debounce):
+                return
+
+    def run(
+        self,
+        on_run: Optional[Callable[[DocumentationRun], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ) -> None:
+        """
+        Document the current HEAD, then block and regenerate on every change.
+
+        Runs until interrupted (KeyboardInterrupt propagates to the caller).
+
+        Args:
+            on_run: Called after each regeneration
+            on_error: Called when a regeneration fails; the daemon keeps running
+        """
+
+        def attempt() -> None:
+            try:
+                run = self.regenerate()
+            except Exception as e:  # keep watching; the next change retries
+                if on_error:
+                    on_error(e)
+                return
+            if run is not None and on_run:
+                on_run(run)
+
+        attempt()
+        while True:
+            if not self.watcher.wait(None):
+                continue
+            self._wait_for_quiet()
+            attempt()
+
+    def close(self) -> None:
+        """Release the watcher, cache, repository handles and event loop."""
+        from docweave.features.commit_analysis import close_repo_handles
+
+        self.watcher.close()
+        if self._cache is not None:
+            self._cache.close()
+        close_repo_handles()
+        self._loop.close()
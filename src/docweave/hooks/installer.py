@@ -0,0 +1,97 @@
+"""Install and remove DocWeave's git hooks."""
+
+import stat
+import subprocess
+import sys
+from pathlib import Path
+
+# Hooks that fire after new commits land: commit, merge/pull, rebase/amend
+HOOK_NAMES = ("post-commit", "post-merge", "post-rewrite")
+HOOK_MARKER = "# docweave-hook"
+
+# Appends HEAD to the queue and starts a detached worker, then exits; it
+# never waits for analysis. The worker exits at once if one is already running.
+_HOOK_TEMPLATE = """#!/bin/sh
+{marker} (installed by `docweave hooks install`; remove with `docweave hooks uninstall`)
+state_dir="$(git rev-parse --git-common-dir)/docweave" || exit 0
+mkdir -p "$state_dir" && git rev-parse HEAD >> "$state_dir/queue" 2>/dev/null
+( "{python}" -m docweave.cli hooks drain --background --path "$(pwd)" </dev/null >/dev/null 2>&1 & )
+exit 0
+"""
+
+
+def hooks_dir(repo_path: Path) -> Path:
+    """Directory git runs hooks from (honours core.hooksPath)."""
+    result = subprocess.run(
+        ["git", "-C", str(repo_path), "rev-parse", "--git-path", "hooks"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise ValueError(f"{repo_path} is not a git repository")
+    path = Path(result.stdout.strip())
+    return path if path.is_absolute() else (repo_path / path).resolve()
+
+
+def _is_docweave_hook(path: Path) -> bool:
+    """Whether an existing hook file was written by DocWeave."""
+    try:
+        return HOOK_MARKER in path.read_text(errors="ignore")
+    except FileNotFoundError:
+        return False
+
+
+def install_hooks(repo_path: Path, force: bool = False) -> list[Path]:
+    """
+    Install the enqueue-only hooks into a repository.
+
+    Args:
+        repo_path: Path to the git repository
+        force: Replace existing non-DocWeave hooks (they are kept as
+            `<hook>.docweave-backup`)
+
+    Returns:
+        Paths of the installed hook files
+
+    Raises:
+        ValueError: If a foreign hook exists and force is False
+    """
+    directory = hooks_dir(repo_path)
+    directory.mkdir(parents=True, exist_ok=True)
+    targets = [directory / name for name in HOOK_NAMES]
+
+    foreign = [p for p in targets if p.exists() and not _is_docweave_hook(p)]
+    if foreign and not force:
+        names = ", ".join(p.name for p in foreign)
+        raise ValueError(
+            f"Existing hooks would be replaced: {names}. "
+            "Re-run with --force to back them up and install anyway."
+        )
+
+    script = _HOOK_TEMPLATE.format(marker=HOOK_MARKER, python=sys.executable)
+    for path in targets:
+        if path in foreign:
+            path.rename(path.with_name(path.name + ".docweave-backup"))
+        path.write_text(script)
+        path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return targets
+
+
+def uninstall_hooks(repo_path: Path) -> list[Path]:
+    """
+    Remove DocWeave's hooks, restoring any backed-up originals.
+
+    Returns:
+        Paths of the removed hook files
+    """
+    directory = hooks_dir(repo_path)
+    removed = []
+    for name in HOOK_NAMES:
+        path = directory / name
+        if _is_docweave_hook(path):
+            path.unlink()
+            removed.append(path)
+            backup = path.with_name(name + ".docweave-backup")
+            if backup.exists():
+                backup.rename(path)
+    return removed
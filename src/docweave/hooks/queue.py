@@ -0,0 +1,108 @@
+"""Commit queue shared by the git hooks and the background worker.
+
+The hook side only appends a SHA to `.git/docweave/queue`; everything else
+happens in the worker. The worker claims the whole queue at once by renaming
+it, so SHAs appended while a batch is being processed land in a fresh file
+and are picked up by the next batch.
+"""
+
+import os
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from docweave.components.index_storage import state_dir
+
+QUEUE_FILE = "queue"
+LOCK_FILE = "worker.lock"
+LOG_FILE = "worker.log"
+
+
+def queue_path(repo_path: Path) -> Path:
+    """Path of the repository's pending-commit queue."""
+    return state_dir(repo_path) / QUEUE_FILE
+
+
+def enqueue(repo_path: Path, sha: str) -> None:
+    """Append a commit SHA to the queue (what the hook script does in shell)."""
+    with open(queue_path(repo_path), "a") as f:
+        f.write(sha.strip() + "\n")
+
+
+def pending_count(repo_path: Path) -> int:
+    """Number of SHAs waiting in the queue."""
+    try:
+        return sum(1 for line in queue_path(repo_path).read_text().splitlines() if line.strip())
+    except FileNotFoundError:
+        return 0
+
+
+def queue_size(repo_path: Path) -> int:
+    """Size of the queue file in bytes (0 if absent); cheap change detection."""
+    try:
+        return queue_path(repo_path).stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def take_batch(repo_path: Path) -> list[str]:
+    """
+    Atomically claim every queued SHA.
+
+    Returns:
+        Unique SHAs in the order they were queued (empty if none)
+    """
+    queue = queue_path(repo_path)
+    claimed = queue.with_name(QUEUE_FILE + ".processing")
+    try:
+        os.replace(queue, claimed)
+    except FileNotFoundError:
+        return []
+    shas = [line.strip() for line in claimed.read_text().splitlines() if line.strip()]
+    claimed.unlink()
+    return list(dict.fromkeys(shas))
+
+
+class WorkerLock:
+    """
+    Non-blocking exclusive lock ensuring one drain worker per repository.
+
+    Uses flock, so the lock is released automatically if the worker dies.
+    On platforms without fcntl the lock always succeeds.
+    """
+
+    def __init__(self, repo_path: Path) -> None:
+        self.path = state_dir(repo_path) / LOCK_FILE
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> bool:
+        """Try to take the lock; returns False if another worker holds it."""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return False
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        """Release the lock if held."""
+        if self._fd is not None:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+    @property
+    def held_elsewhere(self) -> bool:
+        """Whether another process currently holds the lock."""
+        if self.acquire():
+            self.release()
+            return False
+        return True
@@ -0,0 +1,124 @@
+"""Background worker that drains the hook queue and updates DocweaveDocs/."""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+from docweave.components.index_storage import state_dir
+from docweave.hooks.queue import LOG_FILE, WorkerLock, queue_size, take_batch
+
+# Wait until the queue has been quiet this long before processing, so a
+# rebase or `git am` that fires the hook many times becomes one batch
+DEBOUNCE_SECONDS = 2.0
+# Never hold a batch back longer than this, even if commits keep arriving
+MAX_COALESCE_SECONDS = 30.0
+
+
+def _log(repo_path: Path, message: str) -> None:
+    """Append a line to the worker log (the worker has no terminal)."""
+    with open(state_dir(repo_path) / LOG_FILE, "a") as f:
+        f.write(f"{datetime.now().isoformat(timespec='seconds')} {message}\n")
+
+
+def _wait_for_quiet(repo_path: Path, debounce: float) -> None:
+    """Sleep until the queue stops growing for `debounce` seconds."""
+    started = time.monotonic()
+    size = queue_size(repo_path)
+    while time.monotonic() - started < MAX_COALESCE_SECONDS:
+        time.sleep(debounce)
+        new_size = queue_size(repo_path)
+        if new_size == size:
+            return
+        size = new_size
+
+
+async def _process_batch(repo_path: Path, shas: list[str]) -> None:
+    """
+    Document the commits of a batch, adding them to the existing docs.
+
+    The queued SHAs are documented, not the newest commits of HEAD, which
+    may have moved on (or to another branch) since they were queued.
+    Commits that no longer exist, e.g. rewritten by a rebase and already
+    garbage-collected, are skipped. The docs go where the last run wrote
+    them. In the single layout, CHANGES.md is rewritten whole, so the
+    commits it already documents are documented again after the batch; in
+    the sharded layout, earlier shards and index lines are kept as they are.
+    """
+    from docweave.components.commit_index import docs_layout
+    from docweave.components.doc_generator import documented_commits
+    from docweave.features.analysis_cache import AnalysisCache
+    from docweave.features.pipeline import run_documentation
+    from docweave.features.repo_location import docs_location
+    from docweave.lib.copilot_check import check_copilot_cli_installed
+
+    output_path = docs_location(repo_path)
+    revisions = shas[::-1]  # queued oldest first; documented newest first
+    if docs_layout() == "single":
+        # Abbreviated SHAs; commits also in the batch are dropped as duplicates
+        revisions += documented_commits(output_path)
+
+    copilot_available, copilot_error = await check_copilot_cli_installed()
+    cache = AnalysisCache.for_repo(repo_path)
+    try:
+        # Commits documented (or queued) before come from the cache
+        run = await run_documentation(
+            repo_path,
+            limit=len(revisions),
+            days_back=None,
+            copilot_available=copilot_available,
+            copilot_error=copilot_error,
+            output_path=output_path,
+            cache=cache,
+            revisions=revisions,
+        )
+    finally:
+        cache.close()
+    _log(repo_path, f"documented {len(run.commits)} commit(s) for batch of {len(shas)}")
+
+
+def drain_queue(repo_path: Path, debounce: float = DEBOUNCE_SECONDS) -> int:
+    """
+    Process queued commits until the queue is empty.
+
+    Exits immediately if another worker holds the lock; that worker will
+    pick up anything queued in the meantime.
+
+    Args:
+        repo_path: Path to the git repository
+        debounce: Quiet period that ends a burst of queued commits
+
+    Returns:
+        Number of batches processed
+    """
+    lock = WorkerLock(repo_path)
+    batches = 0
+    while lock.acquire():
+        try:
+            while queue_size(repo_path):
+                _wait_for_quiet(repo_path, debounce)
+                shas = take_batch(repo_path)
+                if not shas:
+                    continue
+                try:
+                    asyncio.run(_process_batch(repo_path, shas))
+                except Exception as e:
+                    _log(repo_path, f"batch of {len(shas)} failed: {e}")
+                batches += 1
+        finally:
+            lock.release()
+        # A hook may have queued a SHA and found the lock taken just before
+        # we released it; go round again rather than leave it stranded
+        if not queue_size(repo_path):
+            break
+    return batches
+
+
+def detach() -> None:
+    """Start a new session so the worker outlives the terminal that ran git."""
+    if hasattr(os, "setsid"):
+        try:
+            os.setsid()
+        except OSError:
+            pass
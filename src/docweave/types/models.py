@@ -1,8 +1,14 @@
 """Type definitions for DocWeave."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Sequence
+
+if TYPE_CHECKING:
+    from docweave.components.memory_budget import MemoryStats
+    from docweave.components.near_duplicates import ClusterStats
+    from docweave.components.prompt_budget import PromptStats
 
 
 @dataclass
@@ -16,6 +22,20 @@ class CommitInfo:
     files_changed: list[str]
     additions: int
     deletions: int
+    patch_id: str = ""  # Stable patch identity (`git patch-id --stable`)
+    reverts: Optional[str] = None  # Short SHA of the commit this one reverts
+
+
+@dataclass
+class FileDiff:
+    """Patch and line counts for one file changed by a commit."""
+
+    path: str
+    patch: str
+    additions: int
+    deletions: int
+    binary: bool = False
+    old_path: Optional[str] = None  # Set when the file was renamed
 
 
 @dataclass
@@ -26,6 +46,7 @@ class CodeAnalysis:
     why: str
     next_steps: list[str]
     importance: str
+    source: str = "copilot"  # "copilot" or "heuristic"
 
 
 @dataclass
@@ -37,6 +58,23 @@ class DocumentationResult:
     narrative: str
     next_steps: list[str]
     integration_insights: str = ""  # Copilot-generated: where integrations live, login approach
+    hotspots: str = ""  # HOTSPOTS.md content from the churn index
+    # "sharded" layout only: commits/<sha>.md content by SHA, and their index lines
+    commit_documents: dict[str, str] = field(default_factory=dict)
+    commit_index: list[str] = field(default_factory=list)
+
+
+@dataclass
+class FileChurn:
+    """Churn statistics of one file over the indexed history."""
+
+    path: str
+    commits: int
+    additions: int
+    deletions: int
+    authors: int
+    last_touched: datetime
+    score: float
 
 
 @dataclass
@@ -46,3 +84,72 @@ class AnalysisProgress:
     stage: str
     message: str
     progress: float  # 0.0 to 1.0
+
+
+@dataclass
+class JobState:
+    """Status of a background analysis job, as kept in the state store."""
+
+    job_id: str
+    status: str  # "queued", "running", "succeeded" or "failed"
+    stage: str = ""
+    message: str = ""
+    progress: float = 0.0  # 0.0 to 1.0
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    updated_at: float = 0.0  # Also refreshed by the running worker's heartbeat
+    owner: str = ""  # Worker running the job ("<host>:<pid>")
+
+
+@dataclass
+class DocumentationRun:
+    """Outcome of analyzing and documenting a single repository."""
+
+    repo_name: str
+    output_path: Path
+    commits: list[CommitInfo] = field(default_factory=list)
+    analyses: Sequence[CodeAnalysis] = field(default_factory=list)
+    documentation: Optional[DocumentationResult] = None
+    # Output files whose content changed (and were rewritten) in this run
+    written: list[Path] = field(default_factory=list)
+    # Sizes of the prompts this run sent to Copilot
+    prompt_stats: Optional["PromptStats"] = None
+    # Near-duplicate commits that reused an analysis in this run
+    cluster_stats: Optional["ClusterStats"] = None
+    # Memory sampled while this run's stages ran
+    memory_stats: Optional["MemoryStats"] = None
+
+
+@dataclass
+class CommitAnalyzed:
+    """Pipeline event: the analysis of one commit is known."""
+
+    index: int  # 1-based, in completion order
+    total: Optional[int]  # Commits in the run; None while commits are still being read
+    position: int  # 0-based position of the commit in the run (newest first)
+    commit: CommitInfo
+    analysis: CodeAnalysis
+    used_fallback: bool
+    # Where an analysis not made for this commit came from: "journal",
+    # "cache", "patch", "near-duplicate" or "revert" (None if it was made for it)
+    reused: Optional[str] = None
+
+
+@dataclass
+class DocumentationWritten:
+    """Pipeline event: the run is complete (always the last event)."""
+
+    run: DocumentationRun
+
+
+@dataclass
+class RepoRunResult:
+    """Per-repository entry of a multi-repository batch run."""
+
+    repo_path: str
+    success: bool
+    duration_seconds: float
+    commits_count: int = 0
+    output_path: Optional[str] = None
+    error: Optional[str] = None
@@ -0,0 +1,50 @@
+"""Shared fixtures: throwaway git repositories, documented without Copilot."""
+
+import importlib
+import subprocess
+from pathlib import Path
+
+import pytest
+
+
+class GitRepo:
+    """A work tree in a temporary directory."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        subprocess.run(["git", "init", "-q", str(path)], check=True)
+
+    def git(self, *args: str) -> str:
+        result = subprocess.run(
+            ["git", "-C", str(self.path), *args], check=True, capture_output=True, text=True
+        )
+        return result.stdout.strip()
+
+    def commit(self, name: str, content: str, message: str) -> str:
+        """Write a file, commit it and return the commit's full SHA."""
+        target = self.path / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content)
+        self.git("add", name)
+        self.git("commit", "-q", "-m", message)
+        return self.git("rev-parse", "HEAD")
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Commit as a fixed identity, keep job state in memory and treat Copilot as missing."""
+    for kind in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{kind}_NAME", "Dev")
+        monkeypatch.setenv(f"GIT_{kind}_EMAIL", "dev@example.com")
+    monkeypatch.setenv("DOCWEAVE_STATE_URL", "memory://")
+
+    async def unavailable() -> tuple[bool, str]:
+        return False, "not used in tests"
+
+    copilot_check = importlib.import_module("docweave.lib.copilot_check")
+    monkeypatch.setattr(copilot_check, "check_copilot_cli_installed", unavailable)
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> GitRepo:
+    return GitRepo(tmp_path / "repo")
@@ -0,0 +1,19 @@
+"""Output directories of analyze-many."""
+
+from pathlib import Path
+
+from docweave.features.batch_analysis import output_dirs
+
+
+def test_distinct_names_keep_plain_directories(tmp_path: Path) -> None:
+    repos = [tmp_path / "a" / "api", tmp_path / "b" / "web.git"]
+    dirs = output_dirs(repos, tmp_path / "docs")
+    assert dirs == {repos[0]: tmp_path / "docs" / "api", repos[1]: tmp_path / "docs" / "web"}
+
+
+def test_same_names_get_distinct_directories(tmp_path: Path) -> None:
+    repos = [tmp_path / "a" / "service.git", tmp_path / "b" / "service", tmp_path / "c" / "Service"]
+    dirs = output_dirs(repos, tmp_path / "docs")
+    assert len({str(path).casefold() for path in dirs.values()}) == 3
+    assert all(path.name.casefold().startswith("service-") for path in dirs.values())
+    assert dirs == output_dirs(list(reversed(repos)), tmp_path / "docs")
@@ -0,0 +1,27 @@
+"""Option handling of `docweave analyze`."""
+
+import importlib
+
+from click.testing import CliRunner
+
+from docweave.cli import cli
+from docweave.components.memory_budget import max_memory
+
+
+def test_ndjson_file_requires_ndjson_format(repo) -> None:
+    result = CliRunner().invoke(cli, ["analyze", "-p", str(repo.path), "--ndjson-file", "out.json"])
+    assert result.exit_code == 2
+    assert "--ndjson-file requires --format ndjson" in result.output
+
+
+def test_max_memory_accepted_after_analyze(repo, monkeypatch) -> None:
+    budgets = []
+    cli_module = importlib.import_module("docweave.cli")
+    monkeypatch.setattr(cli_module, "_analyze_ndjson", lambda *a: budgets.append(max_memory()))
+    runner = CliRunner()
+    args = ["-p", str(repo.path), "--format", "ndjson"]
+
+    assert runner.invoke(cli, ["analyze", "--max-memory", "512M", *args]).exit_code == 0
+    assert runner.invoke(cli, ["--max-memory", "256M", "analyze", *args]).exit_code == 0
+    assert budgets == [512 * 2**20, 256 * 2**20]
+    assert max_memory() is None
@@ -0,0 +1,33 @@
+"""Merging the commit index of the sharded docs layout."""
+
+from docweave.components.commit_index import INDEX_HEADER, IndexEntry, merge_index
+
+
+def line(sha: str, date: str, title: str = "Change") -> str:
+    return IndexEntry(sha, date, "Jane", "medium", title).to_line()
+
+
+def shas(index: str) -> list[str]:
+    assert index.splitlines()[0] == INDEX_HEADER
+    return [row.split("\t")[0] for row in index.splitlines()[1:]]
+
+
+def test_merge_replaces_and_orders_newest_first() -> None:
+    existing = merge_index(
+        "",
+        [line("ccc", "2024-03-03T00:00:00Z"), line("aaa", "2024-03-01T00:00:00Z", "Old title")],
+    )
+    merged = merge_index(
+        existing,
+        [line("ddd", "2024-03-04T00:00:00Z"), line("aaa", "2024-03-01T00:00:00Z", "New title")],
+    )
+    assert shas(merged) == ["ddd", "ccc", "aaa"]
+    assert "New title" in merged and "Old title" not in merged
+
+
+def test_same_second_keeps_walk_order_fresh_first() -> None:
+    second = "2024-03-01T12:00:00Z"
+    existing = merge_index("", [line("old2", second), line("old1", second)])
+    fresh = [line("new2", second), line("new1", second)]
+    merged = merge_index(existing + "malformed line\n", fresh)
+    assert shas(merged) == ["new2", "new1", "old2", "old1"]
@@ -0,0 +1,52 @@
+"""The docs API serves documentation wherever `docweave analyze` wrote it."""
+
+import asyncio
+import subprocess
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from docweave.app import app
+from docweave.features.pipeline import run_documentation
+
+
+def make_bare_repo(repo, tmp_path: Path) -> Path:
+    """A bare clone of a two-commit repository."""
+    for n in range(2):
+        repo.commit(f"mod{n}.py", f"value = {n}\n", f"Add mod{n}")
+    bare = tmp_path / "service.git"
+    subprocess.run(["git", "clone", "-q", "--bare", str(repo.path), str(bare)], check=True)
+    return bare
+
+
+def test_serves_docs_of_bare_repository(repo, tmp_path: Path) -> None:
+    bare = make_bare_repo(repo, tmp_path)
+    client = TestClient(app)
+    assert client.get("/api/docs", params={"repo_path": str(bare)}).status_code == 404
+
+    output = tmp_path / "docs"
+    asyncio.run(run_documentation(bare, 2, None, False, "test", output_path=output))
+
+    listing = client.get("/api/docs", params={"repo_path": str(bare)})
+    assert listing.status_code == 200
+    assert listing.json()["docs_path"] == str(output.resolve())
+    names = {d["name"] for d in listing.json()["documents"]}
+    assert "NARRATIVE.md" in names
+
+    doc = client.get("/api/docs/NARRATIVE.md", params={"repo_path": str(bare)})
+    assert doc.status_code == 200
+    assert doc.text == (output / "NARRATIVE.md").read_text()
+
+
+def test_output_path_overrides_recorded_location(repo, tmp_path: Path) -> None:
+    bare = make_bare_repo(repo, tmp_path)
+    asyncio.run(run_documentation(bare, 2, None, False, "test", output_path=tmp_path / "docs"))
+
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "NARRATIVE.md").write_text("# Other\n")
+    doc = TestClient(app).get(
+        "/api/docs/NARRATIVE.md", params={"repo_path": str(bare), "output_path": str(other)}
+    )
+    assert doc.status_code == 200
+    assert doc.text == "# Other\n"
@@ -0,0 +1,95 @@
+"""Incremental and concurrent updates of the churn and co-change indexes."""
+
+import threading
+
+from docweave.features.churn_index import ChurnIndex
+from docweave.features.cochange_index import CoChangeIndex
+from docweave.features.history_reports import update_history_indexes
+
+
+def make_history(repo, commits: int) -> None:
+    """Commits each touching src/a.py, and src/b.py every other one."""
+    for n in range(commits):
+        if n % 2:
+            (repo.path / "src").mkdir(exist_ok=True)
+            (repo.path / "src" / "b.py").write_text(f"b = {n}\n")
+            repo.git("add", "src/b.py")
+        repo.commit("src/a.py", f"a = {n}\n", f"Change a {n}")
+
+
+def churn_of(repo, path: str) -> tuple[int, int]:
+    index = ChurnIndex.for_repo(repo.path)
+    try:
+        churn = index.file_churn(path)
+        return churn.commits, churn.additions
+    finally:
+        index.close()
+
+
+def dir_commits(repo) -> dict[str, int]:
+    index = CoChangeIndex.for_repo(repo.path)
+    try:
+        return dict(index.top_dirs(10))
+    finally:
+        index.close()
+
+
+def test_update_reads_only_new_commits(repo) -> None:
+    make_history(repo, 4)
+    assert update_history_indexes(repo.path) == 4
+    make_history(repo, 2)
+    assert update_history_indexes(repo.path) == 2
+    assert update_history_indexes(repo.path) == 0
+
+    assert churn_of(repo, "src/a.py") == (6, 6)
+    assert churn_of(repo, "src/b.py") == (3, 3)
+    assert dir_commits(repo) == {"src": 6}
+
+
+def test_concurrent_updates_count_each_commit_once(repo) -> None:
+    make_history(repo, 30)
+    start = threading.Barrier(4)
+
+    def update() -> None:
+        start.wait()
+        update_history_indexes(repo.path)
+
+    threads = [threading.Thread(target=update) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert churn_of(repo, "src/a.py") == (30, 30)
+    assert churn_of(repo, "src/b.py") == (15, 15)
+    assert dir_commits(repo) == {"src": 30}
+
+
+def test_expired_update_leaves_index_unchanged(repo) -> None:
+    make_history(repo, 3)
+    update_history_indexes(repo.path, expired=lambda: True)
+
+    index = ChurnIndex.for_repo(repo.path)
+    try:
+        assert index.last_indexed_sha is None
+        assert index.file_churn("src/a.py") is None
+    finally:
+        index.close()
+    assert update_history_indexes(repo.path) == 3
+    assert churn_of(repo, "src/a.py") == (3, 3)
+
+
+def test_reads_do_not_create_indexes(repo) -> None:
+    from fastapi.testclient import TestClient
+
+    from docweave.app import app
+    from docweave.features.history_reports import pending_index_commits
+
+    make_history(repo, 3)
+    assert pending_index_commits(repo.path) == 3
+    hotspots = TestClient(app).get("/api/hotspots", params={"repo_path": str(repo.path)})
+    assert hotspots.json() == {"indexed": False, "indexed_sha": None, "hotspots": []}
+    assert not (repo.path / ".git" / "docweave").exists()
+
+    update_history_indexes(repo.path)
+    assert pending_index_commits(repo.path) == 0
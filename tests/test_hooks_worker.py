@@ -0,0 +1,46 @@
+"""The hook worker adds queued commits to the existing documentation."""
+
+from docweave.components.commit_index import COMMITS_DIRNAME, INDEX_NAME
+from docweave.components.doc_generator import documented_commits
+from docweave.components.run_settings import RunSettings, use_settings
+from docweave.hooks.queue import enqueue
+from docweave.hooks.worker import drain_queue
+
+
+def commit_and_drain(repo, name: str) -> str:
+    """Commit, queue and document the commit as the hooks do; return its short SHA."""
+    sha = repo.commit(f"{name}.py", f"{name} = 1\n", f"Add {name}")
+    enqueue(repo.path, sha)
+    assert drain_queue(repo.path, debounce=0) == 1
+    return sha[:7]
+
+
+def test_batches_keep_earlier_commits(repo) -> None:
+    first = commit_and_drain(repo, "first")
+    second = commit_and_drain(repo, "second")
+
+    assert documented_commits(repo.path / "DocweaveDocs") == [second, first]
+
+
+def test_batch_keeps_history_documented_by_analyze(repo) -> None:
+    import asyncio
+
+    from docweave.features.pipeline import run_documentation
+
+    earlier = [repo.commit(f"mod{n}.py", f"n = {n}\n", f"Add mod{n}") for n in range(3)]
+    asyncio.run(run_documentation(repo.path, 3, None, False, "test"))
+    latest = commit_and_drain(repo, "latest")
+
+    expected = [latest, *(sha[:7] for sha in reversed(earlier))]
+    assert documented_commits(repo.path / "DocweaveDocs") == expected
+
+
+def test_sharded_batches_keep_earlier_shards(repo) -> None:
+    with use_settings(RunSettings(docs_layout="sharded")):
+        first = commit_and_drain(repo, "first")
+        second = commit_and_drain(repo, "second")
+
+    docs = repo.path / "DocweaveDocs"
+    index = (docs / COMMITS_DIRNAME / INDEX_NAME).read_text().splitlines()[1:]
+    assert [line.split("\t")[0] for line in index] == [second, first]
+    assert (docs / COMMITS_DIRNAME / f"{first}.md").is_file()
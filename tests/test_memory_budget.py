@@ -0,0 +1,22 @@
+"""SpillList keeps behaving as a list once its items are on disk."""
+
+from docweave.components.memory_budget import SpillList
+
+
+def test_items_survive_spilling() -> None:
+    items: SpillList[dict] = SpillList()
+    for n in range(3):
+        items.append({"n": n})
+    assert not items.spilled
+
+    assert items.spill() == 3
+    assert items.spilled
+    items.append({"n": 3})
+    items[1] = {"n": 10}
+    items[2] = None
+
+    assert len(items) == 4
+    assert list(items) == [{"n": 0}, {"n": 10}, None, {"n": 3}]
+    assert items[-1] == {"n": 3}
+    assert items[1:] == [{"n": 10}, None, {"n": 3}]
+    assert items.spill() == 0
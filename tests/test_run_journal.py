@@ -0,0 +1,52 @@
+"""Replaying the run journal on --resume."""
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+from docweave.features.run_journal import RunJournal
+from docweave.types.models import CodeAnalysis, CommitInfo
+
+DATE = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+
+def commit(sha: str, patch_id: str = "p1") -> CommitInfo:
+    return CommitInfo(sha, "Fix login", "Jane", DATE, ["src/a.py"], 1, 0, patch_id)
+
+
+def analysis(summary: str) -> CodeAnalysis:
+    return CodeAnalysis(summary, "Users were logged out", ["Add a test"], "high")
+
+
+def test_resume_replays_finished_commits(tmp_path: Path) -> None:
+    path = tmp_path / "journal.ndjson"
+    journal = RunJournal(path)
+    journal.append(commit("aaaaaaa"), analysis("first"))
+    journal.append(commit("bbbbbbb"), analysis("second"))
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"sha": "ccccccc", "analy')  # torn by a crash
+
+    resumed = RunJournal(path, replay=True)
+    assert resumed.get(commit("aaaaaaa")) == analysis("first")
+    assert resumed.get(commit("bbbbbbb")) == analysis("second")
+    assert resumed.get(commit("ccccccc")) is None
+    # A rewritten commit (same SHA, other patch) is analyzed again
+    assert resumed.get(commit("aaaaaaa", patch_id="p2")) is None
+
+    # Entries survive a second interruption
+    resumed.append(commit("ddddddd"), analysis("third"))
+    resumed.close()
+    again = RunJournal(path, replay=True)
+    assert {*again.replayed} == {"aaaaaaa", "bbbbbbb", "ddddddd"}
+    again.complete()
+    assert not path.exists()
+
+
+def test_fresh_run_discards_old_entries(tmp_path: Path) -> None:
+    path = tmp_path / "journal.ndjson"
+    journal = RunJournal(path)
+    journal.append(commit("aaaaaaa"), analysis("first"))
+    journal.close()
+
+    RunJournal(path).close()
+    assert RunJournal(path, replay=True).get(commit("aaaaaaa")) is None
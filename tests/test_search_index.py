@@ -0,0 +1,80 @@
+"""Indexing and searching commit analyses."""
+
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from docweave.features.search_index import SearchIndex
+from docweave.types.models import CodeAnalysis, CommitInfo
+
+
+@pytest.fixture
+def index(tmp_path: Path):
+    index = SearchIndex(tmp_path / "search.sqlite")
+    yield index
+    index.close()
+
+
+@pytest.fixture
+def local_time_west_of_utc(monkeypatch):
+    """Run with a local time zone where local and UTC dates differ in the evening."""
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def commit(
+    sha: str,
+    date: datetime,
+    message: str = "Fix login",
+    author: str = "Jane",
+    files: tuple[str, ...] = ("src/a.py",),
+) -> CommitInfo:
+    return CommitInfo(sha, message, author, date, list(files), 1, 0)
+
+
+def analysis(summary: str = "Fixes the login flow", importance: str = "high") -> CodeAnalysis:
+    return CodeAnalysis(summary, "Users were logged out", [], importance)
+
+
+def test_hit_dates_and_date_filters_are_utc(index, local_time_west_of_utc) -> None:
+    late = datetime(2024, 3, 1, 23, 30, tzinfo=timezone(timedelta(hours=-5)))
+    index.add(commit("aaaaaaa", late), analysis())
+
+    (hit,) = index.search("login")
+    assert hit.date == datetime(2024, 3, 2, 4, 30, tzinfo=timezone.utc)
+    assert index.search(since=datetime(2024, 3, 2))
+    assert not index.search(until=datetime(2024, 3, 2))
+
+
+def test_search_ranks_and_filters(index) -> None:
+    day = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    index.add(commit("aaaaaaa", day, "Fix login token refresh"), analysis("Refreshes tokens"))
+    index.add(
+        commit("bbbbbbb", day + timedelta(days=1), "Tidy docs", author="Ann", files=("docs/a.md",)),
+        analysis("Mentions the login page once", importance="low"),
+    )
+    index.add(commit("ccccccc", day + timedelta(days=2), "Add cache"), analysis("Caches reads"))
+
+    assert [hit.sha for hit in index.search("login")] == ["aaaaaaa", "bbbbbbb"]
+    assert [hit.sha for hit in index.search("login", importance=["low"])] == ["bbbbbbb"]
+    assert [hit.sha for hit in index.search(author="ann")] == ["bbbbbbb"]
+    assert [hit.sha for hit in index.search(path_prefix="src/")] == ["ccccccc", "aaaaaaa"]
+    assert [hit.sha for hit in index.search(since=day + timedelta(days=1))] == [
+        "ccccccc",
+        "bbbbbbb",
+    ]
+
+
+def test_unchanged_commit_is_not_rewritten(index) -> None:
+    date = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    assert index.add(commit("aaaaaaa", date), analysis())
+    assert not index.add(commit("aaaaaaa", date), analysis())
+    assert index.add(commit("aaaaaaa", date), analysis("Fixes the logout flow"))
+    assert index.count() == 1
+    assert [hit.summary for hit in index.search("logout")] == ["Fixes the logout flow"]
+    assert [hit.summary for hit in index.search()] == ["Fixes the logout flow"]
@@ -0,0 +1,48 @@
+"""SingleFlight shares one call between concurrent callers."""
+
+import asyncio
+
+from docweave.features.single_flight import SingleFlight
+
+
+def test_cancelled_leader_leaves_call_to_joiners() -> None:
+    async def scenario() -> tuple:
+        flights, calls = SingleFlight(), []
+
+        async def work() -> str:
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "done"
+
+        leader = asyncio.create_task(flights.run("key", work))
+        await asyncio.sleep(0)
+        joiner = asyncio.create_task(flights.run("key", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await joiner, leader.cancelled(), len(calls), flights.in_flight("key")
+
+    assert asyncio.run(scenario()) == (("done", True), True, 1, False)
+
+
+def test_call_is_cancelled_once_every_caller_is() -> None:
+    async def scenario() -> list:
+        flights, cancelled = SingleFlight(), []
+
+        async def work() -> None:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append("work")
+                raise
+
+        callers = [asyncio.create_task(flights.run("key", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        callers[0].cancel()
+        await asyncio.sleep(0.01)
+        cancelled.append("one caller")
+        callers[1].cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        return cancelled
+
+    assert asyncio.run(scenario()) == ["one caller", "work"]